@@ -105,6 +105,14 @@ if getattr(sys, 'frozen', None):
 #:     this option is enabled if ``__debug__`` is (i.e., if Python was not run
 #:     with the -O option).  It is disabled by default when pyglet is "frozen"
 #:     within a py2exe or py2app library archive.
+#: graphics_allocator
+#:     The algorithm used to allocate vertices within the buffers of a
+#:     `pyglet.graphics.vertexdomain.VertexDomain`.  ``"list"`` (the default)
+#:     scans the allocated regions on every allocation; ``"freelist"``
+#:     maintains an indexed list of free blocks, and is faster when many
+#:     vertex lists are created and deleted within one domain.
+#:
+#:     **Since:** pyglet 1.2
 #: shadow_window
 #:     By default, pyglet creates a hidden window with a GL context when
 #:     pyglet.gl is imported.  This allows resources to be loaded before
@@ -153,6 +161,7 @@ options = {
     'debug_trace_flush': True,
     'debug_win32': False,
     'debug_x11': False,
+    'graphics_allocator': 'list',
     'graphics_vbo': True,
     'shadow_window': True,
     'vsync': None,
@@ -178,6 +187,7 @@ _option_types = {
     'debug_trace_flush': bool,
     'debug_win32': bool,
     'debug_x11': bool,
+    'graphics_allocator': str,
     'graphics_vbo': bool,
     'shadow_window': bool,
     'vsync': bool,
@@ -214,6 +224,8 @@ def _read_environment():
                 options[key] = value in ('true', 'TRUE', 'True', '1')
             elif _option_types[key] is int:
                 options[key] = int(value)
+            elif _option_types[key] is str:
+                options[key] = value
         except KeyError:
             pass
 _read_environment()
@@ -178,34 +178,10 @@ class EventLoop(event.EventDispatcher):
 
     @staticmethod
     def _least_squares(gradient=1, offset=0):
-        X = 0
-        Y = 0
-        XX = 0
-        XY = 0
-        n = 0
-
-        x, y = yield gradient, offset
-        X += x
-        Y += y
-        XX += x * x
-        XY += x * y
-        n += 1
-
+        fit = clock._LeastSquares(gradient, offset)
         while True:
-            x, y = yield gradient, offset
-            X += x
-            Y += y
-            XX += x * x
-            XY += x * y
-            n += 1
-
-            try:
-                gradient = (n * XY - X * Y) / (n * XX - X * X)
-                offset = (Y - gradient * X) / n
-            except ZeroDivisionError:
-                # Can happen in pathalogical case; keep current
-                # gradient/offset for now.
-                pass
+            x, y = yield fit.gradient, fit.offset
+            fit.add(x, y)
 
     def _legacy_setup(self):
         # Disable event queuing for dispatch_events
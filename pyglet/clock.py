@@ -69,6 +69,15 @@ The implementation uses platform-dependent high-resolution sleep functions
 to achieve better accuracy with busy-waiting than would be possible using
 just the `time` module.  
 
+Sleeps often overshoot by an amount that depends on the machine, so frames
+can be uneven even with a limit set.  Frame pacing learns how long sleeps
+actually take, sleeps to within a small margin of each frame's deadline and
+spins for the rest, counting the deadlines it misses::
+
+    pacer = clock.get_default().enable_pacing(margin=0.002)
+    ...
+    print '%d of %d frames late' % (pacer.missed_deadlines, pacer.frames)
+
 Scheduling
 ==========
 
@@ -102,6 +111,66 @@ You can cancel a function scheduled with any of these methods using
 
     clock.unschedule(animate)
 
+Each of these methods also returns a handle to the scheduled function, which
+can cancel just that schedule, whatever other schedules there are of the same
+function::
+
+    handle = clock.schedule_interval(callback, .5)
+    ...
+    handle.cancel()
+
+Schedules can also be grouped by giving them a tag, which is not passed on to
+the function, and removed together with `unschedule_tag`::
+
+    clock.schedule_interval(patrol, 2, guard, tag='level3')
+    clock.schedule_once(explode, 10, tag='level3')
+    ...
+    clock.unschedule_tag('level3')
+
+Removing schedules, by any of these means, takes time proportional to the
+number of schedules removed, not to the number of schedules of the clock.
+
+Fixed timestep
+==============
+
+Simulations such as physics are only deterministic when stepped by a constant
+``dt``.  The `schedule_fixed` method calls a function once for every `step`
+seconds elapsed, always passing `step` as ``dt``, however irregular the clock
+ticks are.  The time not yet simulated is exposed as a fraction of a step by
+the handle's ``alpha`` attribute, to interpolate between the last two states
+when rendering::
+
+    def simulate(dt):
+        world.previous = world.current
+        world.current = world.step(dt)
+
+    physics = clock.schedule_fixed(simulate, 1 / 120., max_catchup=4)
+
+    @window.event
+    def on_draw():
+        world.draw(world.previous, world.current, physics.alpha)
+
+At most `max_catchup` steps are run on each tick.  Any remaining steps are run
+on following ticks, but never more than `max_catchup` steps are kept
+outstanding; further time is dropped, so that a simulation too slow for its
+step cannot fall ever further behind.
+
+Frame time statistics
+=====================
+
+For tuning, a clock can record how long each frame took, how much of it was
+spent in each scheduled function and how long it slept::
+
+    clk = clock.get_default()
+    clk.enable_stats()
+    ...
+    print clk.stats
+    p50, p95, p99 = clk.stats.get_percentiles()
+
+Statistics are kept for a rolling window of recent frames; nothing is
+recorded, and there is no overhead beyond checking the ``stats`` attribute,
+while they are disabled.
+
 Displaying FPS
 ==============
 
@@ -141,6 +210,8 @@ of the system clock.
 __docformat__ = 'restructuredtext'
 __version__ = '$Id$'
 
+import heapq
+import math
 import time
 import sys
 import ctypes
@@ -175,22 +246,347 @@ else:
     _default_time_function = time.time
 
 class _ScheduledItem(object):
-    __slots__ = ['func', 'args', 'kwargs']
-    def __init__(self, func, args, kwargs):
+    '''Function called every frame; the handle returned by `Clock.schedule`.
+    '''
+    __slots__ = ['func', 'args', 'kwargs', 'clock', 'tag']
+    def __init__(self, func, args, kwargs, clock, tag):
         self.func = func
         self.args = args
         self.kwargs = kwargs
+        self.clock = clock
+        self.tag = tag
+
+    def cancel(self):
+        '''Remove the function from the schedule.
+
+        Other schedules of the same function are not affected.  No error is
+        raised if the function has already been removed.
+        '''
+        if self.func is not _dummy_schedule_func:
+            self.clock._cancel_item(self)
+            self.clock._check_dead_interval_items()
 
 class _ScheduledIntervalItem(object):
-    __slots__ = ['func', 'interval', 'last_ts', 'next_ts', 
-                 'args', 'kwargs']
-    def __init__(self, func, interval, last_ts, next_ts, args, kwargs):
+    '''Function called after a delay or at intervals; the handle returned by
+    `Clock.schedule_interval`, `Clock.schedule_interval_soft` and
+    `Clock.schedule_once`.
+    '''
+    __slots__ = ['func', 'interval', 'last_ts', 'next_ts',
+                 'args', 'kwargs', 'clock', 'tag']
+    def __init__(self, func, interval, last_ts, next_ts, args, kwargs, clock,
+                 tag):
         self.func = func
         self.interval = interval
         self.last_ts = last_ts
         self.next_ts = next_ts
         self.args = args
         self.kwargs = kwargs
+        self.clock = clock
+        self.tag = tag
+
+    def cancel(self):
+        '''Remove the function from the schedule.
+
+        Other schedules of the same function are not affected.  No error is
+        raised if the function has already been removed, or was scheduled
+        once and has been called.
+        '''
+        if self.func is not _dummy_schedule_func:
+            self.clock._cancel_item(self)
+            self.clock._check_dead_interval_items()
+
+class _ScheduledFixedItem(_ScheduledItem):
+    '''Function called every `step` seconds of elapsed time, with a constant
+    ``dt``; the handle returned by `Clock.schedule_fixed`.
+
+    The ``alpha`` attribute gives the time elapsed since the last step, as a
+    fraction of `step` between 0 and 1.
+    '''
+    __slots__ = ['step', 'max_catchup', 'last_ts', 'accumulator', 'alpha']
+    def __init__(self, func, step, max_catchup, last_ts, args, kwargs, clock,
+                 tag):
+        super(_ScheduledFixedItem, self).__init__(func, args, kwargs, clock,
+                                                  tag)
+        self.step = step
+        self.max_catchup = max_catchup
+        self.last_ts = last_ts
+        self.accumulator = 0.
+        self.alpha = 0.
+
+class _LeastSquares(object):
+    '''Online least-squares linear fit of ``y = gradient * x + offset``.
+
+    With a `decay` below 1, the weight of each sample is multiplied by
+    `decay` as every later sample is added, so that the fit follows changes
+    in the relationship.  While the samples of `x` barely vary, only the
+    offset is fitted.
+    '''
+    #: Variance of `x` below which the gradient is not fitted.
+    MIN_VARIANCE = 1e-10
+
+    def __init__(self, gradient=1., offset=0., decay=1.):
+        self.gradient = gradient
+        self.offset = offset
+        self.decay = decay
+        self._n = self._x = self._y = self._xx = self._xy = 0.
+
+    def add(self, x, y):
+        '''Add a sample and update `gradient` and `offset`.
+        '''
+        decay = self.decay
+        self._n = n = self._n * decay + 1
+        self._x = X = self._x * decay + x
+        self._y = Y = self._y * decay + y
+        self._xx = XX = self._xx * decay + x * x
+        self._xy = XY = self._xy * decay + x * y
+
+        denominator = n * XX - X * X
+        if denominator > self.MIN_VARIANCE * n * n:
+            self.gradient = (n * XY - X * Y) / denominator
+        self.offset = (Y - self.gradient * X) / n
+
+    def predict(self, x):
+        '''Return the fitted value of `y` for `x`.
+        '''
+        return self.gradient * x + self.offset
+
+class FramePacer(object):
+    '''Frame pacing for `Clock.tick`; see `Clock.enable_pacing`.
+
+    Each frame, the pacer sleeps until `margin` seconds before the frame's
+    deadline, then spins until the deadline.  The time requested from each
+    sleep is corrected by a least-squares fit of the requested against the
+    actual duration of previous sleeps, learning how much the machine's
+    sleeps overshoot.
+
+    :Ivariables:
+        `margin` : float
+            Seconds before the deadline to stop sleeping and start spinning.
+        `tolerance` : float
+            Seconds after its deadline that a frame counts as missed.
+        `spin_yield` : bool
+            If True, the processor is yielded to other threads while
+            spinning.
+        `frames` : int
+            Number of frames paced.
+        `missed_deadlines` : int
+            Number of frames that started more than `tolerance` seconds
+            after their deadline.
+        `lateness` : float
+            Seconds the last frame started after its deadline; negative
+            if it was early.
+
+    :since: pyglet 1.2
+    '''
+    def __init__(self, margin=0.002, tolerance=0.001, spin_yield=True,
+                 decay=0.99):
+        self.margin = margin
+        self.tolerance = tolerance
+        self.spin_yield = spin_yield
+        self.frames = 0
+        self.missed_deadlines = 0
+        self.lateness = 0.
+        self._sleep_fit = _LeastSquares(decay=decay)
+
+    def get_sleep_request(self, duration):
+        '''Get the time to request from a sleep for it to last `duration`
+        seconds, as learned from previous sleeps.
+
+        :rtype: float
+        '''
+        return max(self._sleep_fit.predict(duration), 0.)
+
+    def _wait(self, clock, deadline):
+        # Sleep then spin until deadline, on the clock's time function.
+        now = clock.time
+        remaining = deadline - now()
+        while remaining > self.margin:
+            request = min(self.get_sleep_request(remaining - self.margin),
+                          remaining)
+            if request <= 0:
+                break
+            start = now()
+            clock.sleep(1000000 * request)
+            end = now()
+            self._sleep_fit.add(end - start, request)
+            remaining = deadline - end
+
+        while remaining > 0:
+            if self.spin_yield:
+                time.sleep(0)
+            remaining = deadline - now()
+
+        self.frames += 1
+        self.lateness = -remaining
+        if self.lateness > self.tolerance:
+            self.missed_deadlines += 1
+
+def _get_func_name(func):
+    '''Return the qualified name of a function or method, used to bucket
+    callback times in `ClockStats`.
+    '''
+    name = getattr(func, '__qualname__', None)
+    if name is not None:
+        return name
+    name = getattr(func, '__name__', None)
+    if name is None:
+        return func.__class__.__name__
+    cls = getattr(func, 'im_class', None)
+    if cls is not None:
+        return '%s.%s' % (cls.__name__, name)
+    return name
+
+class ClockStats(object):
+    '''Frame time statistics recorded by a clock; see `Clock.enable_stats`.
+
+    A frame is the time between two calls to `Clock.update_time` (made by
+    `Clock.tick`, or by the `pyglet.app` event loop).  The duration of each
+    frame, and the time spent during it in scheduled functions, sleeping in
+    `Clock.tick` for the framerate limit and idle as requested by
+    `Clock.get_sleep_time`, are kept for the last `window_size` frames in
+    ring buffers.  Callback times are also totalled by function name over
+    all frames since the statistics were reset.
+
+    :Ivariables:
+        `window_size` : int
+            Number of recent frames kept.
+        `frames` : int
+            Number of frames recorded since the statistics were reset.
+        `callbacks` : dict
+            Mapping of function name to a list of the number of calls, the
+            total time and the longest time, in seconds, of its calls.
+
+    :since: pyglet 1.2
+    '''
+    def __init__(self, window_size=300):
+        self.window_size = window_size
+        self.reset()
+
+    def reset(self):
+        '''Discard all recorded statistics.
+        '''
+        n = self.window_size
+        self.frames = 0
+        self.callbacks = {}
+        self._frame_times = [0.] * n
+        self._callback_times = [0.] * n
+        self._sleep_times = [0.] * n
+        self._idle_times = [0.] * n
+
+        # Times of the frame in progress.
+        self._callback_time = 0.
+        self._sleep_time = 0.
+        self._idle_time = 0.
+
+    def _add_frame(self, frame_time):
+        i = self.frames % self.window_size
+        self._frame_times[i] = frame_time
+        self._callback_times[i] = self._callback_time
+        self._sleep_times[i] = self._sleep_time
+        self._idle_times[i] = self._idle_time
+        self._callback_time = self._sleep_time = self._idle_time = 0.
+        self.frames += 1
+
+    def _add_call(self, func, duration):
+        self._callback_time += duration
+        name = _get_func_name(func)
+        bucket = self.callbacks.get(name)
+        if bucket is None:
+            self.callbacks[name] = [1, duration, duration]
+        else:
+            bucket[0] += 1
+            bucket[1] += duration
+            if duration > bucket[2]:
+                bucket[2] = duration
+
+    def _get_window(self, ring):
+        # Recorded values of a ring buffer, oldest first.
+        if self.frames <= self.window_size:
+            return ring[:self.frames]
+        i = self.frames % self.window_size
+        return ring[i:] + ring[:i]
+
+    def get_frame_times(self):
+        '''Get the duration of each recent frame, oldest first.
+
+        :rtype: list of float
+        '''
+        return self._get_window(self._frame_times)
+
+    def get_callback_times(self):
+        '''Get the time spent in scheduled functions during each recent
+        frame, oldest first.
+
+        :rtype: list of float
+        '''
+        return self._get_window(self._callback_times)
+
+    def get_sleep_times(self):
+        '''Get the time slept for the framerate limit during each recent
+        frame, oldest first.
+
+        :rtype: list of float
+        '''
+        return self._get_window(self._sleep_times)
+
+    def get_idle_times(self):
+        '''Get the idle time requested from `Clock.get_sleep_time` during
+        each recent frame, oldest first.
+
+        :rtype: list of float
+        '''
+        return self._get_window(self._idle_times)
+
+    def get_average_frame_time(self):
+        '''Get the average duration of recent frames.
+
+        :rtype: float
+        :return: The average in seconds, or 0 if no frames were recorded.
+        '''
+        times = self.get_frame_times()
+        if not times:
+            return 0.
+        return sum(times) / len(times)
+
+    def get_percentiles(self, percents=(50, 95, 99)):
+        '''Get percentiles of the duration of recent frames.
+
+        :Parameters:
+            `percents` : sequence of float
+                The percentiles to get, between 0 and 100.
+
+        :rtype: tuple of float
+        :return: The duration in seconds that each percentage of recent
+            frames did not exceed, using the nearest rank; 0 if no frames
+            were recorded.
+        '''
+        times = sorted(self.get_frame_times())
+        if not times:
+            return tuple(0. for percent in percents)
+        n = len(times)
+        ranks = [int(math.ceil(percent * n / 100.)) for percent in percents]
+        return tuple(times[min(max(rank - 1, 0), n - 1)] for rank in ranks)
+
+    def __repr__(self):
+        return '%s(frames=%d)' % (self.__class__.__name__, self.frames)
+
+    def __str__(self):
+        n = len(self.get_frame_times()) or 1
+        p50, p95, p99 = self.get_percentiles()
+        lines = [
+            '%d frames: average %.2fms, p50 %.2fms, p95 %.2fms, p99 %.2fms' % (
+                self.frames, self.get_average_frame_time() * 1000,
+                p50 * 1000, p95 * 1000, p99 * 1000),
+            'per frame: callbacks %.2fms, sleep %.2fms, idle %.2fms' % (
+                sum(self.get_callback_times()) * 1000 / n,
+                sum(self.get_sleep_times()) * 1000 / n,
+                sum(self.get_idle_times()) * 1000 / n)]
+        callbacks = sorted(self.callbacks.items(),
+                           key=lambda item: item[1][1], reverse=True)
+        for name, (calls, total, longest) in callbacks:
+            lines.append('  %s: %d calls, %.2fms total, %.2fms max' % (
+                name, calls, total * 1000, longest * 1000))
+        return '\n'.join(lines)
 
 def _dummy_schedule_func(*args, **kwargs):
     '''Dummy function that does nothing, placed onto zombie scheduled items
@@ -218,12 +614,49 @@ class Clock(_ClockBase):
     # List of functions to call every tick.
     _schedule_items = None
 
-    # List of schedule interval items kept in sort order.
+    # Number of items in _schedule_items that have been cancelled or
+    # unscheduled, which are removed on the next tick.
+    _dead_items = 0
+
+    # List of functions to call every fixed step of elapsed time.  Cancelled
+    # items are counted by _dead_items along with those of _schedule_items.
+    _schedule_fixed_items = None
+
+    # Heap of (next_ts, seq, item) entries for schedule interval items, where
+    # seq orders items due at the same time by when they were scheduled.
+    # An item's next_ts is None while it is not in the heap.
     _schedule_interval_items = None
 
+    # Sequence number of the next entry pushed onto the heap.
+    _schedule_seq = 0
+
+    # Number of heap entries whose item has been cancelled or unscheduled.
+    # They are skipped when they reach the top of the heap, or removed
+    # together when they make up half the heap.
+    _dead_interval_items = 0
+
+    # Sets of the scheduled items of each function and of each tag, for
+    # unscheduling.  Items of functions that cannot be hashed are kept in a
+    # list instead.
+    _func_items = None
+    _tag_items = None
+    _unhashable_func_items = None
+
     # If True, a sleep(0) is inserted on every tick.   
     _force_sleep = False
 
+    #: Frame time statistics, or None if they are not being recorded.  See
+    #: `enable_stats`.
+    #:
+    #: :type: `ClockStats`
+    stats = None
+
+    #: Frame pacing used to limit the framerate, or None to use `MIN_SLEEP`
+    #: and `SLEEP_UNDERSHOOT`.  See `enable_pacing`.
+    #:
+    #: :type: `FramePacer`
+    pacer = None
+
     def __init__(self, fps_limit=None, time_function=_default_time_function):
         '''Initialise a Clock, with optional framerate limit and custom
         time function.
@@ -249,7 +682,11 @@ class Clock(_ClockBase):
         self.cumulative_time = 0
 
         self._schedule_items = []
+        self._schedule_fixed_items = []
         self._schedule_interval_items = []
+        self._func_items = {}
+        self._tag_items = {}
+        self._unhashable_func_items = []
 
     def update_time(self):
         '''Get the elapsed time since the last call to `update_time`.
@@ -271,6 +708,8 @@ class Clock(_ClockBase):
             self.times.insert(0, delta_t)
             if len(self.times) > self.window_size:
                 self.cumulative_time -= self.times.pop()
+            if self.stats is not None:
+                self.stats._add_frame(delta_t)
         self.cumulative_time += delta_t
         self.last_ts = ts
 
@@ -292,21 +731,73 @@ class Clock(_ClockBase):
         '''
         ts = self.last_ts
         result = False
+        stats = self.stats
 
-        # Call functions scheduled for every frame  
+        # Call functions scheduled for every frame
+        if self._dead_items:
+            self._remove_dead_items()
         # Dupe list just in case one of the items unchedules itself
         for item in list(self._schedule_items):
             result = True
-            item.func(dt, *item.args, **item.kwargs)
+            if stats is None:
+                item.func(dt, *item.args, **item.kwargs)
+            else:
+                self._call_timed(stats, item, dt)
 
-        # Call all scheduled interval functions and reschedule for future.
-        need_resort = False
-        # Dupe list just in case one of the items unchedules itself
-        for item in list(self._schedule_interval_items):
-            if item.next_ts > ts:
-                break
+        # Call fixed step functions once for each step elapsed, up to
+        # max_catchup times.
+        for item in list(self._schedule_fixed_items):
             result = True
-            item.func(ts - item.last_ts, *item.args, **item.kwargs)
+            item.accumulator += ts - item.last_ts
+            item.last_ts = ts
+            step = item.step
+            steps = 0
+            while item.accumulator >= step and steps < item.max_catchup:
+                if stats is None:
+                    item.func(step, *item.args, **item.kwargs)
+                else:
+                    self._call_timed(stats, item, step)
+                item.accumulator -= step
+                steps += 1
+                if item.func is _dummy_schedule_func:
+                    # Unscheduled itself
+                    break
+
+            # Leave up to max_catchup steps for the following ticks; drop
+            # the rest, so a slow function cannot fall ever further behind.
+            backlog = item.max_catchup * step
+            if item.accumulator > backlog:
+                item.accumulator = backlog
+            item.alpha = min(item.accumulator / step, 1.)
+
+        # Call all scheduled interval functions that are due, in order, and
+        # reschedule for future.  Items scheduled by these functions wait
+        # for the next tick, even if they are already due.
+        heap = self._schedule_interval_items
+        first_new_seq = self._schedule_seq
+        new_entries = []
+        while heap and heap[0][0] <= ts:
+            entry = heapq.heappop(heap)
+            item = entry[2]
+            if item.func is _dummy_schedule_func:
+                self._dead_interval_items -= 1
+                continue
+            if entry[1] >= first_new_seq:
+                # Not in the heap until it is pushed back after the loop.
+                item.next_ts = None
+                new_entries.append(entry)
+                continue
+
+            result = True
+            # The item is no longer in the heap while it is called.
+            item.next_ts = None
+            if stats is None:
+                item.func(ts - item.last_ts, *item.args, **item.kwargs)
+            else:
+                self._call_timed(stats, item, ts - item.last_ts)
+            if item.func is _dummy_schedule_func:
+                # Unscheduled itself
+                continue
             if item.interval:
                 # Try to keep timing regular, even if overslept this time;
                 # but don't schedule in the past (which could lead to
@@ -325,21 +816,167 @@ class Clock(_ClockBase):
                         # future.  Unfortunately means the next reported dt is
                         # incorrect (looks like interval but actually isn't).
                         item.last_ts = item.next_ts - item.interval
-                need_resort = True
+                self._push_interval_item(item)
             else:
-                item.next_ts = None
-
-        # Remove finished one-shots.
-        self._schedule_interval_items = \
-            [item for item in self._schedule_interval_items \
-             if item.next_ts is not None]
+                self._unindex_item(item)
 
-        if need_resort:
-            # TODO bubble up changed items might be faster
-            self._schedule_interval_items.sort(key=lambda a: a.next_ts)
+        for entry in new_entries:
+            item = entry[2]
+            if item.func is not _dummy_schedule_func:
+                item.next_ts = entry[0]
+                heapq.heappush(heap, entry)
 
         return result
 
+    def _call_timed(self, stats, item, dt):
+        # Call a scheduled item's function, recording the time taken.
+        func = item.func
+        start = self.time()
+        func(dt, *item.args, **item.kwargs)
+        stats._add_call(func, self.time() - start)
+
+    def enable_stats(self, window_size=300):
+        '''Start recording frame time statistics in `stats`.
+
+        Any statistics already recorded are discarded.
+
+        :Parameters:
+            `window_size` : int
+                Number of recent frames to keep statistics for.
+
+        :rtype: `ClockStats`
+        :return: The new `stats`.
+
+        :since: pyglet 1.2
+        '''
+        self.stats = ClockStats(window_size)
+        return self.stats
+
+    def disable_stats(self):
+        '''Stop recording frame time statistics, and set `stats` to None.
+
+        :since: pyglet 1.2
+        '''
+        self.stats = None
+
+    def enable_pacing(self, margin=0.002, tolerance=0.001, spin_yield=True):
+        '''Use a `FramePacer` to limit the framerate.
+
+        Rather than sleeping until `SLEEP_UNDERSHOOT` seconds before each
+        frame, the pacer learns how much this machine's sleeps overshoot,
+        sleeps until `margin` seconds before the frame and spins for the
+        rest.  This only has an effect when a framerate limit is set with
+        `set_fps_limit`.
+
+        :Parameters:
+            `margin` : float
+                Seconds before each frame to stop sleeping and start
+                spinning.  Larger margins use more CPU, but miss fewer
+                deadlines when sleeps are irregular.
+            `tolerance` : float
+                Seconds after its deadline that a frame counts as missed.
+            `spin_yield` : bool
+                If True, yield the processor to other threads while
+                spinning.
+
+        :rtype: `FramePacer`
+        :return: The new `pacer`, which counts missed deadlines.
+
+        :since: pyglet 1.2
+        '''
+        self.pacer = FramePacer(margin, tolerance, spin_yield)
+        return self.pacer
+
+    def disable_pacing(self):
+        '''Stop frame pacing, and set `pacer` to None.
+
+        :since: pyglet 1.2
+        '''
+        self.pacer = None
+
+    def _push_interval_item(self, item):
+        heapq.heappush(self._schedule_interval_items,
+                       (item.next_ts, self._schedule_seq, item))
+        self._schedule_seq += 1
+
+    def _remove_dead_items(self):
+        self._schedule_items = [item for item in self._schedule_items
+                                if item.func is not _dummy_schedule_func]
+        if self._schedule_fixed_items:
+            self._schedule_fixed_items = [
+                item for item in self._schedule_fixed_items
+                if item.func is not _dummy_schedule_func]
+        self._dead_items = 0
+
+    def _index_item(self, item):
+        try:
+            items = self._func_items.get(item.func)
+        except TypeError:
+            self._unhashable_func_items.append(item)
+        else:
+            if items is None:
+                items = self._func_items[item.func] = set()
+            items.add(item)
+
+        if item.tag is not None:
+            try:
+                self._tag_items[item.tag].add(item)
+            except KeyError:
+                self._tag_items[item.tag] = set([item])
+
+    def _unindex_item(self, item):
+        try:
+            items = self._func_items.get(item.func)
+        except TypeError:
+            if item in self._unhashable_func_items:
+                self._unhashable_func_items.remove(item)
+        else:
+            if items is not None:
+                items.discard(item)
+                if not items:
+                    del self._func_items[item.func]
+
+        if item.tag is not None:
+            items = self._tag_items.get(item.tag)
+            if items is not None:
+                items.discard(item)
+                if not items:
+                    del self._tag_items[item.tag]
+
+    def _cancel_item(self, item):
+        # Mark a scheduled item as dead, to be removed from its schedule list
+        # later.  Call _check_dead_interval_items after cancelling items.
+        self._unindex_item(item)
+        item.func = _dummy_schedule_func
+        if isinstance(item, _ScheduledItem):
+            self._dead_items += 1
+        elif item.next_ts is not None:
+            self._dead_interval_items += 1
+
+    def _check_dead_interval_items(self):
+        if (self._dead_interval_items and
+            self._dead_interval_items * 2 >= len(self._schedule_interval_items)):
+            self._remove_dead_interval_items()
+
+    def _remove_dead_interval_items(self):
+        # The heap is modified in place, as call_scheduled_functions may be
+        # iterating over it.
+        heap = self._schedule_interval_items
+        heap[:] = [entry for entry in heap
+                   if entry[2].func is not _dummy_schedule_func]
+        heapq.heapify(heap)
+        self._dead_interval_items = 0
+
+    def _get_next_interval_ts(self):
+        # Time the first live schedule interval item is due, or None.
+        heap = self._schedule_interval_items
+        while heap and heap[0][2].func is _dummy_schedule_func:
+            heapq.heappop(heap)
+            self._dead_interval_items -= 1
+        if heap:
+            return heap[0][0]
+        return None
+
     def tick(self, poll=False):
         '''Signify that one frame has passed.
 
@@ -380,16 +1017,23 @@ class Clock(_ClockBase):
         sleep or busy-wait (or both).
         '''
         ts = self.time()
-        # Sleep to just before the desired time
-        sleeptime = self.get_sleep_time(False)
-        while sleeptime - self.SLEEP_UNDERSHOOT > self.MIN_SLEEP:
-            self.sleep(1000000 * (sleeptime - self.SLEEP_UNDERSHOOT))
+        if self.pacer is not None:
+            self.pacer._wait(self, self.next_ts)
+            sleeptime = self.next_ts - self.time()
+        else:
+            # Sleep to just before the desired time
             sleeptime = self.get_sleep_time(False)
+            while sleeptime - self.SLEEP_UNDERSHOOT > self.MIN_SLEEP:
+                self.sleep(1000000 * (sleeptime - self.SLEEP_UNDERSHOOT))
+                sleeptime = self.get_sleep_time(False)
 
-        # Busy-loop CPU to get closest to the mark
-        sleeptime = self.next_ts - self.time()
-        while sleeptime > 0:
+            # Busy-loop CPU to get closest to the mark
             sleeptime = self.next_ts - self.time()
+            while sleeptime > 0:
+                sleeptime = self.next_ts - self.time()
+
+        if self.stats is not None:
+            self.stats._sleep_time += self.time() - ts
 
         if sleeptime < -2 * self.period_limit:
             # Missed the time by a long shot, let's reset the clock
@@ -429,21 +1073,28 @@ class Clock(_ClockBase):
 
         :since: pyglet 1.1
         '''
-        if self._schedule_items or not sleep_idle:
+        if self._dead_items:
+            self._remove_dead_items()
+        next_interval_ts = self._get_next_interval_ts()
+
+        if (self._schedule_items or self._schedule_fixed_items or
+            not sleep_idle):
             if not self.period_limit:
-                return 0.
+                sleep_time = 0.
             else:
                 wake_time = self.next_ts
-                if self._schedule_interval_items:
-                    wake_time = min(wake_time,
-                                    self._schedule_interval_items[0].next_ts)
-                return max(wake_time - self.time(), 0.)
-
-        if self._schedule_interval_items:
-            return max(self._schedule_interval_items[0].next_ts - self.time(),
-                       0)
-            
-        return None
+                if next_interval_ts is not None:
+                    wake_time = min(wake_time, next_interval_ts)
+                sleep_time = max(wake_time - self.time(), 0.)
+        elif next_interval_ts is not None:
+            sleep_time = max(next_interval_ts - self.time(), 0)
+        else:
+            return None
+
+        if sleep_idle and self.stats is not None:
+            # The application intends to sleep for this time.
+            self.stats._idle_time += sleep_time
+        return sleep_time
 
     def set_fps_limit(self, fps_limit):
         '''Set the framerate limit.
@@ -504,21 +1155,84 @@ class Clock(_ClockBase):
         :Parameters:
             `func` : function
                 The function to call each frame.
+            `tag` : object
+                Optional hashable tag, such as a string, grouping this
+                schedule with others to remove with `unschedule_tag`.  It
+                is passed as a keyword argument, but not passed on to the
+                function.
+
+        :return: A handle to the scheduled function, whose ``cancel``
+            method removes it from the schedule.
         '''
-        item = _ScheduledItem(func, args, kwargs)
+        tag = kwargs.pop('tag', None)
+        item = _ScheduledItem(func, args, kwargs, self, tag)
         self._schedule_items.append(item)
+        self._index_item(item)
+        return item
+
+    def schedule_fixed(self, func, step, *args, **kwargs):
+        '''Schedule a function to be called once for every `step` seconds
+        of elapsed time, with a constant ``dt``.
+
+        Unlike `schedule_interval`, the function is always passed `step` as
+        its ``dt`` argument, and is called as many times on a tick as there
+        are whole steps elapsed since it was last called, up to
+        `max_catchup`.  Steps beyond `max_catchup` are run on the following
+        ticks, but no more than `max_catchup` steps are kept outstanding;
+        time beyond that is dropped.
+
+        The time elapsed since the last step, as a fraction of `step`, is
+        available on every tick from the ``alpha`` attribute of the returned
+        handle, to interpolate the state of the simulation when rendering.
+
+        As with `schedule`, the clock is considered busy while the function
+        is scheduled, so that it is ticked at the maximum framerate allowed.
+
+        The callback function prototype is the same as for `schedule`.
+
+        :Parameters:
+            `func` : function
+                The function to call each step.
+            `step` : float
+                The number of seconds of elapsed time per call.
+            `max_catchup` : int
+                Maximum number of calls on each tick.  It is passed as a
+                keyword argument, but not passed on to the function.
+                Defaults to 5.
+            `tag` : object
+                Optional hashable tag, such as a string, grouping this
+                schedule with others to remove with `unschedule_tag`.  It
+                is passed as a keyword argument, but not passed on to the
+                function.
+
+        :return: A handle to the scheduled function, whose ``cancel``
+            method removes it from the schedule, and whose ``alpha``
+            attribute gives the interpolation fraction.
+
+        :since: pyglet 1.2
+        '''
+        tag = kwargs.pop('tag', None)
+        max_catchup = kwargs.pop('max_catchup', 5)
+
+        # See schedule_interval
+        last_ts = self.last_ts or self.next_ts
+        ts = self.time()
+        if ts - last_ts > 0.2:
+            last_ts = ts
+
+        item = _ScheduledFixedItem(func, step, max_catchup, last_ts,
+                                   args, kwargs, self, tag)
+        self._schedule_fixed_items.append(item)
+        self._index_item(item)
+        return item
 
     def _schedule_item(self, func, last_ts, next_ts, interval, *args, **kwargs):
+        tag = kwargs.pop('tag', None)
         item = _ScheduledIntervalItem(
-            func, interval, last_ts, next_ts, args, kwargs)
-
-        # Insert in sort order
-        for i, other in enumerate(self._schedule_interval_items):
-            if other.next_ts is not None and other.next_ts > next_ts:
-                self._schedule_interval_items.insert(i, item)
-                break
-        else:
-            self._schedule_interval_items.append(item)
+            func, interval, last_ts, next_ts, args, kwargs, self, tag)
+        self._push_interval_item(item)
+        self._index_item(item)
+        return item
 
     def schedule_interval(self, func, interval, *args, **kwargs):
         '''Schedule a function to be called every `interval` seconds.
@@ -533,7 +1247,14 @@ class Clock(_ClockBase):
                 The function to call when the timer lapses.
             `interval` : float
                 The number of seconds to wait between each call.
-
+            `tag` : object
+                Optional hashable tag, such as a string, grouping this
+                schedule with others to remove with `unschedule_tag`.  It
+                is passed as a keyword argument, but not passed on to the
+                function.
+
+        :return: A handle to the scheduled function, whose ``cancel``
+            method removes it from the schedule.
         '''
         last_ts = self.last_ts or self.next_ts
 
@@ -548,7 +1269,8 @@ class Clock(_ClockBase):
             last_ts = ts
 
         next_ts = last_ts + interval
-        self._schedule_item(func, last_ts, next_ts, interval, *args, **kwargs)
+        return self._schedule_item(func, last_ts, next_ts, interval,
+                                   *args, **kwargs)
 
     def schedule_interval_soft(self, func, interval, *args, **kwargs):
         '''Schedule a function to be called every `interval` seconds,
@@ -579,7 +1301,14 @@ class Clock(_ClockBase):
                 The function to call when the timer lapses.
             `interval` : float
                 The number of seconds to wait between each call.
-
+            `tag` : object
+                Optional hashable tag, such as a string, grouping this
+                schedule with others to remove with `unschedule_tag`.  It
+                is passed as a keyword argument, but not passed on to the
+                function.
+
+        :return: A handle to the scheduled function, whose ``cancel``
+            method removes it from the schedule.
         '''
         last_ts = self.last_ts or self.next_ts
 
@@ -590,20 +1319,19 @@ class Clock(_ClockBase):
 
         next_ts = self._get_soft_next_ts(last_ts, interval)
         last_ts = next_ts - interval
-        self._schedule_item(func, last_ts, next_ts, interval, *args, **kwargs)
+        return self._schedule_item(func, last_ts, next_ts, interval,
+                                   *args, **kwargs)
 
     def _get_soft_next_ts(self, last_ts, interval):
         def taken(ts, e):
             '''Return True if the given time has already got an item
             scheduled nearby.
             '''
-            for item in self._schedule_interval_items:
-                if item.next_ts is None:
-                    pass
-                elif abs(item.next_ts - ts) <= e:
+            # The heap is not sorted, so every entry must be checked.
+            for next_ts, _, item in self._schedule_interval_items:
+                if (abs(next_ts - ts) <= e and
+                    item.func is not _dummy_schedule_func):
                     return True
-                elif item.next_ts > ts + e:
-                    return False
             return False
 
         # Binary division over interval:
@@ -650,6 +1378,14 @@ class Clock(_ClockBase):
                 The function to call when the timer lapses.
             `delay` : float
                 The number of seconds to wait before the timer lapses.
+            `tag` : object
+                Optional hashable tag, such as a string, grouping this
+                schedule with others to remove with `unschedule_tag`.  It
+                is passed as a keyword argument, but not passed on to the
+                function.
+
+        :return: A handle to the scheduled function, whose ``cancel``
+            method removes it from the schedule.
         '''
         last_ts = self.last_ts or self.next_ts
 
@@ -659,7 +1395,7 @@ class Clock(_ClockBase):
             last_ts = ts
 
         next_ts = last_ts + delay
-        self._schedule_item(func, last_ts, next_ts, 0, *args, **kwargs)
+        return self._schedule_item(func, last_ts, next_ts, 0, *args, **kwargs)
 
     def unschedule(self, func):
         '''Remove a function from the schedule.  
@@ -672,25 +1408,50 @@ class Clock(_ClockBase):
                 The function to remove from the schedule.
 
         '''
-        # First replace zombie items' func with a dummy func that does
-        # nothing, in case the list has already been cloned inside tick().
-        # (Fixes issue 326).
-        for item in self._schedule_items:
-            if item.func == func:
-                item.func = _dummy_schedule_func
+        self._unschedule(func)
+        self._check_dead_interval_items()
+
+    def _unschedule(self, func):
+        # The items' func is replaced with a dummy func that does nothing,
+        # in case the list has already been cloned inside tick() (fixes
+        # issue 326); they are removed from the schedule lists later.
+        try:
+            items = self._func_items.get(func, ())
+        except TypeError:
+            items = [item for item in self._unhashable_func_items
+                     if item.func == func]
+        for item in list(items):
+            self._cancel_item(item)
+
+    def unschedule_many(self, funcs):
+        '''Remove several functions from the schedule.
+
+        This is equivalent to calling `unschedule` for each function.
 
-        for item in self._schedule_interval_items:
-            if item.func == func:
-                item.func = _dummy_schedule_func
-    
-        # Now remove matching items from both schedule lists.
-        self._schedule_items = \
-            [item for item in self._schedule_items \
-                  if item.func is not _dummy_schedule_func]
+        :Parameters:
+            `funcs` : iterable of function
+                The functions to remove from the schedule.
+
+        :since: pyglet 1.2
+        '''
+        for func in funcs:
+            self._unschedule(func)
+        self._check_dead_interval_items()
 
-        self._schedule_interval_items = \
-            [item for item in self._schedule_interval_items \
-                  if item.func is not _dummy_schedule_func]
+    def unschedule_tag(self, tag):
+        '''Remove all functions scheduled with a tag from the schedule.
+
+        No error is raised if nothing is scheduled with the tag.
+
+        :Parameters:
+            `tag` : object
+                The tag given when scheduling the functions.
+
+        :since: pyglet 1.2
+        '''
+        for item in list(self._tag_items.get(tag, ())):
+            self._cancel_item(item)
+        self._check_dead_interval_items()
 
 # Default clock.
 _default = Clock()
@@ -793,8 +1554,15 @@ def schedule(func, *args, **kwargs):
     :Parameters:
         `func` : function
             The function to call each frame.
+        `tag` : object
+            Optional hashable tag grouping this schedule with others to
+            remove with `unschedule_tag`.  It is not passed on to the
+            function.
+
+    :return: A handle to the scheduled function, whose ``cancel`` method
+        removes it from the schedule.
     '''
-    _default.schedule(func, *args, **kwargs)
+    return _default.schedule(func, *args, **kwargs)
 
 def schedule_interval(func, interval, *args, **kwargs):
     '''Schedule 'func' to be called every 'interval' seconds on the default
@@ -808,9 +1576,15 @@ def schedule_interval(func, interval, *args, **kwargs):
             The function to call when the timer lapses.
         `interval` : float
             The number of seconds to wait between each call.
+        `tag` : object
+            Optional hashable tag grouping this schedule with others to
+            remove with `unschedule_tag`.  It is not passed on to the
+            function.
 
+    :return: A handle to the scheduled function, whose ``cancel`` method
+        removes it from the schedule.
     '''
-    _default.schedule_interval(func, interval, *args, **kwargs)
+    return _default.schedule_interval(func, interval, *args, **kwargs)
 
 def schedule_interval_soft(func, interval, *args, **kwargs):
     '''Schedule 'func' to be called every 'interval' seconds on the default
@@ -829,9 +1603,15 @@ def schedule_interval_soft(func, interval, *args, **kwargs):
             The function to call when the timer lapses.
         `interval` : float
             The number of seconds to wait between each call.
+        `tag` : object
+            Optional hashable tag grouping this schedule with others to
+            remove with `unschedule_tag`.  It is not passed on to the
+            function.
 
+    :return: A handle to the scheduled function, whose ``cancel`` method
+        removes it from the schedule.
     '''
-    _default.schedule_interval_soft(func, interval, *args, **kwargs)
+    return _default.schedule_interval_soft(func, interval, *args, **kwargs)
 
 def schedule_once(func, delay, *args, **kwargs):
     '''Schedule 'func' to be called once after 'delay' seconds (can be
@@ -847,9 +1627,42 @@ def schedule_once(func, delay, *args, **kwargs):
             The function to call when the timer lapses.
         `delay` : float
             The number of seconds to wait before the timer lapses.
- 
-    ''' 
-    _default.schedule_once(func, delay, *args, **kwargs)
+        `tag` : object
+            Optional hashable tag grouping this schedule with others to
+            remove with `unschedule_tag`.  It is not passed on to the
+            function.
+
+    :return: A handle to the scheduled function, whose ``cancel`` method
+        removes it from the schedule.
+    '''
+    return _default.schedule_once(func, delay, *args, **kwargs)
+
+def schedule_fixed(func, step, *args, **kwargs):
+    '''Schedule a function to be called once for every `step` seconds of
+    elapsed time, with a constant ``dt``.
+
+    :see: `Clock.schedule_fixed`
+
+    :Parameters:
+        `func` : function
+            The function to call each step.
+        `step` : float
+            The number of seconds of elapsed time per call.
+        `max_catchup` : int
+            Maximum number of calls on each tick.  It is not passed on to
+            the function.  Defaults to 5.
+        `tag` : object
+            Optional hashable tag grouping this schedule with others to
+            remove with `unschedule_tag`.  It is not passed on to the
+            function.
+
+    :return: A handle to the scheduled function, whose ``cancel`` method
+        removes it from the schedule, and whose ``alpha`` attribute gives the
+        interpolation fraction.
+
+    :since: pyglet 1.2
+    '''
+    return _default.schedule_fixed(func, step, *args, **kwargs)
 
 def unschedule(func):
     '''Remove 'func' from the default clock's schedule.  No error
@@ -862,6 +1675,33 @@ def unschedule(func):
     '''
     _default.unschedule(func)
 
+def unschedule_many(funcs):
+    '''Remove several functions from the default clock's schedule.
+
+    :see: `Clock.unschedule_many`
+
+    :Parameters:
+        `funcs` : iterable of function
+            The functions to remove from the schedule.
+
+    :since: pyglet 1.2
+    '''
+    _default.unschedule_many(funcs)
+
+def unschedule_tag(tag):
+    '''Remove all functions scheduled with a tag from the default clock's
+    schedule.
+
+    :see: `Clock.unschedule_tag`
+
+    :Parameters:
+        `tag` : object
+            The tag given when scheduling the functions.
+
+    :since: pyglet 1.2
+    '''
+    _default.unschedule_tag(tag)
+
 class ClockDisplay(object):
     '''Display current clock values, such as FPS.
 
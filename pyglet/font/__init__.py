@@ -231,8 +231,15 @@ class GlyphString(object):
         if to_index is None:
             to_index = len(self.text)
 
+        # Draw the glyph quads as triangles, indexed by the shared quad
+        # index buffer.
+        indices = pyglet.graphics.vertexdomain.get_quad_index_buffer()
+        indices.reserve(len(self.array) // 8)
+        index_size = indices.element_size * 6
+
         glPushClientAttrib(GL_CLIENT_VERTEX_ARRAY_BIT)
         glInterleavedArrays(GL_T4F_V4F, 0, self.array)
+        indices.buffer.bind()
         for state_from, state_length, texture in self.states:
             if state_from + state_length < from_index:
                 continue
@@ -241,7 +248,9 @@ class GlyphString(object):
             if state_length <= 0:
                 break
             glBindTexture(GL_TEXTURE_2D, texture.id)
-            glDrawArrays(GL_QUADS, state_from * 4, state_length * 4)
+            glDrawElements(GL_TRIANGLES, state_length * 6, indices.gl_type,
+                           indices.buffer.ptr + state_from * index_size)
+        indices.buffer.unbind()
         glPopClientAttrib()
 
         if from_index:
@@ -91,6 +91,17 @@ possible.  If the drawing of sprites or text objects need to be interleaved
 with other drawing that does not use the graphics API, multiple batches will
 be required.
 
+Groups may also declare the OpenGL state they set with `Group.get_state`;
+`TextureGroup` and `pyglet.sprite.SpriteGroup` do so.  If a batch's
+`Batch.diff_group_state` attribute is set, sibling groups declaring their
+state are sorted to bring groups with the same state together, and only the
+difference between consecutive groups' states is applied::
+
+    batch = pyglet.graphics.Batch()
+    batch.diff_group_state = True
+
+The number of state changes made when drawing is counted by `state_counters`.
+
 Data item parameters
 ====================
 
@@ -124,6 +135,17 @@ a tuple, for example::
                                               ('v2f', (0.0, 1.0, 1.0, 0.0)),
                                               ('c4B', (255, 255, 255, 255) * 2))
 
+Alternatively, the format strings can be compiled once into a
+`pyglet.graphics.vertexdomain.VertexFormat`, which avoids parsing them for
+every vertex list.  In this case the data parameters are the vertex format
+followed by the initial data (or ``None``) for each of its attributes, in
+order::
+
+    format = pyglet.graphics.vertexdomain.VertexFormat('v2f', 'c4B')
+    vertex_list = pyglet.graphics.vertex_list(2, format,
+                                              (0.0, 1.0, 1.0, 0.0),
+                                              (255, 255, 255, 255) * 2)
+
 Drawing modes
 =============
 
@@ -167,9 +189,203 @@ import pyglet
 from pyglet.gl import *
 from pyglet import gl
 from pyglet.graphics import vertexbuffer, vertexattribute, vertexdomain
+from pyglet.graphics import spatialhash
 
 _debug_graphics_batch = pyglet.options['debug_graphics_batch']
 
+class StateCounters(object):
+    '''Running totals of group state changes made by batches.
+
+    :Ivariables:
+        `changes` : int
+            Number of calls to `Group.set_state` and `Group.unset_state`,
+            and of state changes applied between groups with declared state.
+        `elided` : int
+            Number of calls to `Group.set_state` and `Group.unset_state`
+            avoided by applying the difference between declared states
+            instead.
+
+    '''
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        '''Reset the counters to zero; for example, at the start of each
+        frame.'''
+        self.changes = 0
+        self.elided = 0
+
+    def __repr__(self):
+        return '%s(changes=%d, elided=%d)' % (
+            self.__class__.__name__, self.changes, self.elided)
+
+#: Counters of group state changes made by all batches.
+#:
+#: :type: `StateCounters`
+state_counters = StateCounters()
+
+class BatchReport(object):
+    '''Summary of the groups and domains in a batch, returned by
+    `Batch.get_report`.
+
+    Vertex lists are only drawn together when they share a group and
+    format, so a large number of groups or domains relative to the number
+    of vertex lists indicates that batching is ineffective; for example,
+    when sprites use images from many separate textures instead of an
+    atlas.
+
+    :Ivariables:
+        `groups` : int
+            Number of groups with vertex lists, not counting parent groups
+            that have no vertex lists of their own.
+        `domains` : int
+            Number of vertex domains, each drawn with one command.
+        `vertex_lists` : int
+            Number of vertex lists.
+        `group_classes` : dict
+            Mapping of group class name to the number of groups of that
+            class counted in `groups`.
+
+    '''
+    def __init__(self):
+        self.groups = 0
+        self.domains = 0
+        self.vertex_lists = 0
+        self.group_classes = {}
+
+    def __repr__(self):
+        return '%s(groups=%d, domains=%d, vertex_lists=%d)' % (
+            self.__class__.__name__,
+            self.groups, self.domains, self.vertex_lists)
+
+    def __str__(self):
+        lines = ['%d vertex lists in %d domains of %d groups' % (
+            self.vertex_lists, self.domains, self.groups)]
+        for name, count in sorted(self.group_classes.items()):
+            lines.append('  %s: %d' % (name, count))
+        return '\n'.join(lines)
+
+def _set_texture(texture):
+    glEnable(texture[0])
+    glBindTexture(*texture)
+
+def _unset_texture(texture):
+    glDisable(texture[0])
+
+def _switch_texture(old, new):
+    if old[0] != new[0]:
+        glDisable(old[0])
+        glEnable(new[0])
+    glBindTexture(*new)
+
+def _set_blend(blend):
+    glEnable(GL_BLEND)
+    glBlendFunc(*blend)
+
+def _unset_blend(blend):
+    glDisable(GL_BLEND)
+
+def _switch_blend(old, new):
+    glBlendFunc(*new)
+
+def _set_program(program):
+    glUseProgram(program)
+
+def _unset_program(program):
+    glUseProgram(0)
+
+# State that groups can declare in `Group.get_state`, in decreasing order of
+# the cost of changing it: (key, set, unset, switch) where each function
+# takes the state value(s) and applies the change.
+_group_states = [
+    ('program', _set_program, _unset_program, _set_program),
+    ('texture', _set_texture, _unset_texture, _switch_texture),
+    ('blend', _set_blend, _unset_blend, _switch_blend),
+]
+
+def _get_state_transition(old_group, new_group):
+    '''Get the functions that change the OpenGL state declared by
+    `old_group` to that declared by `new_group`, or None if the groups are of
+    different classes or either does not declare its state.
+    '''
+    if old_group.__class__ is not new_group.__class__:
+        return None
+    old_state = old_group.get_state()
+    new_state = new_group.get_state()
+    if old_state is None or new_state is None:
+        return None
+
+    funcs = []
+    for key, set_func, unset_func, switch_func in _group_states:
+        old = old_state.get(key)
+        new = new_state.get(key)
+        if old == new:
+            continue
+        elif new is None:
+            funcs.append((lambda f, v: lambda: f(v))(unset_func, old))
+        elif old is None:
+            funcs.append((lambda f, v: lambda: f(v))(set_func, new))
+        else:
+            funcs.append(
+                (lambda f, o, n: lambda: f(o, n))(switch_func, old, new))
+    return funcs
+
+def _join_siblings(group_lists, diff, counts, transitions):
+    '''Concatenate the draw lists of sibling groups, given as a list of
+    ``(group, draw_list)`` in drawing order, where each draw list begins with
+    ``group.set_state`` and ends with ``group.unset_state``.
+
+    If `diff` is True, the ``unset_state`` and ``set_state`` between
+    consecutive groups with declared state are replaced by the difference
+    between their states.  The state transitions are cached in the
+    `transitions` dict, keyed by pair of groups.  ``counts[0]`` and
+    ``counts[1]`` are updated with the number of state changes added and
+    elided.
+    '''
+    draw_list = []
+    previous = None
+    for group, group_list in group_lists:
+        if diff and previous is not None:
+            key = (previous, group)
+            try:
+                transition = transitions[key]
+            except KeyError:
+                transition = transitions[key] = \
+                    _get_state_transition(previous, group)
+            if transition is not None:
+                # Replace previous.unset_state and group.set_state with the
+                # difference.
+                del draw_list[-1]
+                draw_list.extend(transition)
+                draw_list.extend(group_list[1:])
+                counts[0] += len(transition) - 2
+                counts[1] += 2
+                previous = group
+                continue
+        draw_list.extend(group_list)
+        previous = group
+    return draw_list
+
+def _get_state_key(group):
+    state = group.get_state()
+    if state is None:
+        return (group.__class__.__name__,)
+    return (group.__class__.__name__,) + \
+        tuple(state.get(key) for key, _, _, _ in _group_states)
+
+def _sort_by_state(groups):
+    '''Sort runs of adjacent groups in an already sorted list by their
+    declared state, leaving groups that define their own order in place.
+    '''
+    i = 0
+    while i < len(groups):
+        j = i
+        while j < len(groups) and type(groups[j]).__lt__ == Group.__lt__:
+            j += 1
+        if j - i > 1:
+            groups[i:j] = sorted(groups[i:j], key=_get_state_key)
+        i = j + 1
+
 def draw(size, mode, *data):
     '''Draw a primitive immediately.
 
@@ -186,9 +402,13 @@ def draw(size, mode, *data):
     '''
     glPushClientAttrib(GL_CLIENT_VERTEX_ARRAY_BIT)
 
+    # The compiled attributes are only read here, so the cached format's
+    # prototypes can be used directly.
+    vertex_format = vertexdomain.get_vertex_format(
+        tuple(format for format, array in data))
+
     buffers = []
-    for format, array in data:
-        attribute = vertexattribute.create_attribute(format)
+    for attribute, (format, array) in zip(vertex_format.attributes, data):
         assert size == len(array) // attribute.count, \
             'Data for %s is incorrect length' % format
         buffer = vertexbuffer.create_mappable_buffer(
@@ -220,9 +440,13 @@ def draw_indexed(size, mode, indices, *data):
     '''
     glPushClientAttrib(GL_CLIENT_VERTEX_ARRAY_BIT)
 
+    # The compiled attributes are only read here, so the cached format's
+    # prototypes can be used directly.
+    vertex_format = vertexdomain.get_vertex_format(
+        tuple(format for format, array in data))
+
     buffers = []
-    for format, array in data:
-        attribute = vertexattribute.create_attribute(format)
+    for attribute, (format, array) in zip(vertex_format.attributes, data):
         assert size == len(array) // attribute.count, \
             'Data for %s is incorrect length' % format
         buffer = vertexbuffer.create_mappable_buffer(
@@ -253,6 +477,13 @@ def _parse_data(data):
     '''Given a list of data items, returns (formats, initial_arrays).'''
     assert data, 'No attribute formats given'
 
+    vertex_format = data[0]
+    if isinstance(vertex_format, vertexdomain.VertexFormat):
+        # Precompiled format followed by optional initial arrays.
+        initial_arrays = [(i, array) for i, array in enumerate(data[1:])
+                          if array is not None]
+        return vertex_format.formats, initial_arrays
+
     # Return tuple (formats, initial_arrays).
     formats = []
     initial_arrays = []
@@ -316,7 +547,61 @@ class Batch(object):
     sent to the graphics card in a single operation.
 
     Call `VertexList.delete` to remove a vertex list from the batch.
+
+    Deleting vertex lists leaves unused space in the batch's buffers, which
+    is reused by subsequently added vertex lists but never released.  Call
+    `compact` to relocate the vertex lists and shrink the buffers, or set
+    `compact_threshold` to have the batch do this automatically when drawn.
     '''
+
+    #: Fragmentation of free space (between 0 and 1) above which a domain is
+    #: automatically compacted when the batch is drawn, or ``None`` to
+    #: disable automatic compaction (the default).  Domains using less than
+    #: a quarter of their capacity are also compacted.  Only domains from
+    #: which vertex lists have been deleted, resized or migrated since the
+    #: last draw are examined.
+    #:
+    #: :type: float
+    compact_threshold = None
+
+    #: If True, sibling groups that declare their state with
+    #: `Group.get_state` are sorted by class and state, and only the
+    #: difference between the states of consecutive groups of the same class
+    #: is applied, instead of calling `Group.unset_state` and
+    #: `Group.set_state`.  Siblings that define their own order, such as
+    #: `OrderedGroup`, are not reordered.
+    #: Changes to this attribute take effect when a vertex list or group is
+    #: next added to or removed from the batch.
+    #:
+    #: :type: bool
+    diff_group_state = False
+
+    #: If True, objects in the batch that support it, such as
+    #: `pyglet.sprite.Sprite`, do not update their vertices as soon as their
+    #: properties change, but register an update with `defer_update`, which
+    #: is made once before the batch is next drawn.
+    #:
+    #: :type: bool
+    defer_updates = False
+
+    #: The `pyglet.graphics.spatialhash.SpatialHash` of vertex list bounds
+    #: used to cull vertex lists outside the viewport given to `draw`, or
+    #: ``None`` if culling is not enabled.  See `enable_culling`.
+    #:
+    #: :type: `pyglet.graphics.spatialhash.SpatialHash`
+    spatial_hash = None
+
+    #: If True, vertex lists added with the ``GL_QUADS`` mode (and without
+    #: indices) are drawn as ``GL_TRIANGLES``, indexed by a buffer shared by
+    #: all batches, rather than with ``GL_QUADS``, which is not available in
+    #: core OpenGL profiles.  The number of vertices of such vertex lists
+    #: must be a multiple of 4.  Sprites and text layouts use ``GL_QUADS``.
+    #: Changes to this attribute only affect vertex lists added to groups
+    #: and formats not already in the batch.
+    #:
+    #: :type: bool
+    quads_as_triangles = False
+
     def __init__(self):
         '''Create a graphics batch.'''
         # Mapping to find domain.  
@@ -332,6 +617,22 @@ class Batch(object):
         self._draw_list = []
         self._draw_list_dirty = False
 
+        # State transitions between sibling groups, keyed by pair of groups;
+        # rebuilt with the draw list.
+        self._transitions = {}
+
+        # Number of state changes made by, and elided from, the draw list.
+        self._state_changes = 0
+        self._state_elided = 0
+
+        # Functions registered with defer_update.
+        self._deferred_updates = set()
+
+        # Vertex lists with bounds in spatial_hash, and the number of them in
+        # each domain.
+        self._bounded_lists = {}
+        self._bounded_domains = {}
+
     def add(self, count, mode, group, *data):
         '''Add a vertex list to the batch.
 
@@ -360,6 +661,49 @@ class Batch(object):
 
         return vlist
 
+    def add_many(self, count, n, mode, group, *data):
+        '''Add several vertex lists of the same size to the batch.
+
+        This is equivalent to calling `add` `n` times, but is considerably
+        faster: the vertex lists are allocated as one contiguous region and
+        each attribute's initial data is set in a single operation.
+
+        The initial data for each attribute covers all of the vertex lists,
+        in order; that is, it has ``count * n`` vertices.  Data given as a
+        ctypes array or `array.array` of the attribute's type is copied
+        without conversion.
+
+        :Parameters:
+            `count` : int
+                The number of vertices in each list.
+            `n` : int
+                The number of vertex lists to add.
+            `mode` : int
+                OpenGL drawing mode enumeration; for example, one of
+                ``GL_POINTS``, ``GL_LINES``, ``GL_TRIANGLES``, etc.
+                See the module summary for additional information.
+            `group` : `Group`
+                Group of the vertex lists, or ``None`` if no group is
+                required.
+            `data` : data items
+                Attribute formats and initial data for all of the vertex
+                lists.  See the module summary for details.
+
+        :rtype: list of `VertexList`
+        '''
+        formats, initial_arrays = _parse_data(data)
+        domain = self._get_domain(False, mode, group, formats)
+
+        vlists = domain.create_many(count, n)
+        if vlists:
+            start = vlists[0].start
+            for i, array in initial_arrays:
+                attribute = domain.attributes[i]
+                attribute.set_region(attribute.buffer, start, count * n,
+                                     array)
+
+        return vlists
+
     def add_indexed(self, count, mode, group, indices, *data):
         '''Add an indexed vertex list to the batch.
 
@@ -417,8 +761,46 @@ class Batch(object):
         '''
         formats = vertex_list.domain.__formats
         domain = batch._get_domain(False, mode, group, formats)
+        if vertex_list in self._bounded_lists:
+            if batch is self:
+                self._remove_bounded_domain(vertex_list.domain)
+                self._bounded_lists[vertex_list] = domain
+                self._bounded_domains[domain] = \
+                    self._bounded_domains.get(domain, 0) + 1
+            else:
+                self.clear_bounds(vertex_list)
         vertex_list.migrate(domain)
 
+    def compact(self, threshold=0.):
+        '''Compact the buffers of every domain in the batch.
+
+        Vertex lists are moved to remove the space left behind by deleted
+        vertex lists, and the buffers are shrunk to fit.  Arrays previously
+        obtained from vertex list attributes (for example,
+        ``vertex_list.vertices``) must be fetched again afterwards.
+
+        :Parameters:
+            `threshold` : float
+                Only domains whose fragmentation (see
+                `pyglet.graphics.allocation.Allocator.get_fragmentation`)
+                exceeds this value, or that use less than a quarter of
+                their capacity, are compacted.
+
+        '''
+        for domain_map in self.group_map.values():
+            for domain in domain_map.values():
+                if domain._needs_compact(threshold):
+                    domain.compact()
+
+    def _auto_compact(self):
+        threshold = self.compact_threshold
+        for domain_map in self.group_map.values():
+            for domain in domain_map.values():
+                if domain._freed:
+                    domain._freed = False
+                    if domain._needs_compact(threshold):
+                        domain.compact()
+
     def _get_domain(self, indexed, mode, group, formats):
         if group is None:
             group = null_group
@@ -435,10 +817,14 @@ class Batch(object):
             domain = domain_map[key]
         except KeyError:
             # Create domain
+            vertex_format = vertexdomain.get_vertex_format(formats)
+            attribute_usages = vertex_format.create_attribute_usages()
             if indexed:
-                domain = vertexdomain.create_indexed_domain(*formats)
+                domain = vertexdomain.IndexedVertexDomain(attribute_usages)
+            elif mode == GL_QUADS and self.quads_as_triangles:
+                domain = vertexdomain.QuadDomain(attribute_usages)
             else:
-                domain = vertexdomain.create_domain(*formats)
+                domain = vertexdomain.VertexDomain(attribute_usages)
             domain.__formats = formats
             domain_map[key] = domain
             self._draw_list_dirty = True 
@@ -460,6 +846,10 @@ class Batch(object):
     def _update_draw_list(self):
         '''Visit group tree in preorder and create a list of bound methods
         to call.
+
+        The domains of each group are drawn with a single call to
+        `vertexdomain.draw_domains`, ordered so that domains enabling the
+        same client arrays are adjacent.
         '''
 
         def visit(group):
@@ -467,22 +857,27 @@ class Batch(object):
 
             # Draw domains using this group
             domain_map = self.group_map[group]
+            commands = []
             for (formats, mode, indexed), domain in list(domain_map.items()):
                 # Remove unused domains from batch
                 if domain._is_empty():
                     del domain_map[(formats, mode, indexed)]
                     continue
+                commands.append((formats, mode, indexed, domain))
+            if commands:
+                commands.sort()
+                commands = [(domain, mode, None)
+                            for _, mode, _, domain in commands]
                 draw_list.append(
-                    (lambda d, m: lambda: d.draw(m))(domain, mode))
+                    (lambda c: lambda: vertexdomain.draw_domains(c))(commands))
 
             # Sort and visit child groups of this group
             children = self.group_children.get(group)
             if children:
-                children.sort()
-                for child in list(children):
-                    draw_list.extend(visit(child))
+                draw_list.extend(visit_siblings(children))
 
             if children or domain_map:
+                counts[0] += 2
                 return [group.set_state] + draw_list + [group.unset_state]
             else:
                 # Remove unused group from batch
@@ -499,12 +894,23 @@ class Batch(object):
                     pass
                 return []
 
-        self._draw_list = []
-
-        self.top_groups.sort()
-        for group in list(self.top_groups):
-            self._draw_list.extend(visit(group))
-
+        def visit_siblings(groups):
+            groups.sort()
+            if diff:
+                _sort_by_state(groups)
+            group_lists = []
+            for group in list(groups):
+                group_list = visit(group)
+                if group_list:
+                    group_lists.append((group, group_list))
+            return _join_siblings(group_lists, diff, counts, transitions)
+
+        diff = self.diff_group_state
+        counts = [0, 0]     # state changes, elided state changes
+        transitions = self._transitions = {}
+        self._draw_list = visit_siblings(self.top_groups)
+
+        self._state_changes, self._state_elided = counts
         self._draw_list_dirty = False
 
         if _debug_graphics_batch:
@@ -534,21 +940,166 @@ class Batch(object):
         for group in self.top_groups:
             dump(group)
         
-    def draw(self):
+    def get_report(self):
+        '''Count the groups, domains and vertex lists in the batch.
+
+        :rtype: `BatchReport`
+        '''
+        report = BatchReport()
+        for group, domain_map in self.group_map.items():
+            domains = [domain for domain in domain_map.values()
+                       if not domain._is_empty()]
+            if not domains:
+                continue
+            report.groups += 1
+            report.domains += len(domains)
+            for domain in domains:
+                report.vertex_lists += len(domain._vertex_lists)
+            name = group.__class__.__name__
+            report.group_classes[name] = report.group_classes.get(name, 0) + 1
+        return report
+
+    def enable_culling(self, cell_size=256):
+        '''Cull vertex lists outside the viewport given to `draw`.
+
+        Culling applies only to vertex lists whose bounds are given with
+        `set_bounds`; `pyglet.sprite.Sprite` does this automatically when
+        culling is enabled before it is added to the batch.  The bounds are
+        kept in a uniform grid (`spatial_hash`), so only the vertex lists near
+        the viewport are examined when drawing.  This is worthwhile when the
+        scene is much larger than the viewport.
+
+        :Parameters:
+            `cell_size` : float
+                Width and height of each cell of the grid, in the same
+                coordinates as the bounds.  This should be a few times
+                larger than a typical vertex list.
+
+        '''
+        if self.spatial_hash is None:
+            self.spatial_hash = spatialhash.SpatialHash(cell_size)
+
+    def set_bounds(self, vertex_list, bounds):
+        '''Set the bounds of a vertex list, used to cull it when drawing
+        with a viewport.
+
+        Culling is enabled with the default cell size if `enable_culling`
+        has not been called.  `clear_bounds` must be called before a vertex
+        list with bounds is deleted; it is called by `migrate` when a vertex
+        list is migrated to another batch.
+
+        :Parameters:
+            `vertex_list` : `VertexList`
+                A vertex list belonging to this batch.
+            `bounds` : tuple
+                ``(x1, y1, x2, y2)`` bounding box of the vertex list, or
+                ``None`` if it is not visible at all.
+
+        '''
+        if self.spatial_hash is None:
+            self.enable_culling()
+        self.spatial_hash.set(vertex_list, bounds)
+        if vertex_list not in self._bounded_lists:
+            domain = vertex_list.domain
+            self._bounded_lists[vertex_list] = domain
+            self._bounded_domains[domain] = \
+                self._bounded_domains.get(domain, 0) + 1
+
+    def clear_bounds(self, vertex_list):
+        '''Remove the bounds of a vertex list, so that it is always drawn.
+
+        Does nothing if the vertex list has no bounds.
+
+        :Parameters:
+            `vertex_list` : `VertexList`
+                A vertex list belonging to this batch.
+
+        '''
+        domain = self._bounded_lists.pop(vertex_list, None)
+        if domain is not None:
+            self.spatial_hash.remove(vertex_list)
+            self._remove_bounded_domain(domain)
+
+    def _remove_bounded_domain(self, domain):
+        count = self._bounded_domains[domain] - 1
+        if count:
+            self._bounded_domains[domain] = count
+        else:
+            del self._bounded_domains[domain]
+
+    def defer_update(self, func):
+        '''Register a function to be called before the batch is next drawn.
+
+        Each function is called once, however many times it is registered
+        before the batch is drawn; bound methods of the same object are
+        considered the same function.  This is used by objects in the batch
+        to coalesce updates to their vertices when `defer_updates` is set.
+
+        :Parameters:
+            `func` : callable
+                Function to call, with no arguments.
+
+        '''
+        self._deferred_updates.add(func)
+
+    def flush_updates(self):
+        '''Call the functions registered with `defer_update` now.
+
+        This is done automatically when the batch is drawn.
+        '''
+        while self._deferred_updates:
+            updates = self._deferred_updates
+            self._deferred_updates = set()
+            for func in updates:
+                func()
+
+    def draw(self, viewport=None):
         '''Draw the batch.
+
+        If a viewport is given and culling is enabled (see
+        `enable_culling`), vertex lists with bounds are drawn only if they
+        overlap the viewport.  The visible vertex lists of each domain are
+        drawn with a single OpenGL call, adjacent vertex lists being merged
+        into one range where the drawing mode allows.  The state of groups
+        with no vertex lists to draw is not set.
+
+        :Parameters:
+            `viewport` : tuple
+                ``(x, y, width, height)`` of the visible area, in the same
+                coordinates as the bounds of the vertex lists, or ``None``
+                to draw every vertex list.
+
         '''
+        if self._deferred_updates:
+            self.flush_updates()
+
+        if self.compact_threshold is not None:
+            self._auto_compact()
+
         if self._draw_list_dirty:
             self._update_draw_list()
 
+        if viewport is not None and self._bounded_domains:
+            self._draw_culled(viewport)
+            return
+
         for func in self._draw_list:
             func()
 
+        state_counters.changes += self._state_changes
+        state_counters.elided += self._state_elided
+
     def draw_subset(self, vertex_lists):
         '''Draw only some vertex lists in the batch.
 
-        The use of this method is highly discouraged, as it is quite
-        inefficient.  Usually an application can be redesigned so that batches
-        can always be drawn in their entirety, using `draw`.
+        The vertex lists are gathered by domain, and the lists of each domain
+        are drawn with a single OpenGL call where possible, so this method is
+        suitable for drawing, for example, only those vertex lists that are
+        visible.  The state of groups with no vertex lists to draw is not
+        set; as with `draw`, state changes between sibling groups are
+        elided if `diff_group_state` is set, and are counted by
+        `state_counters`.  Drawing the entire batch with `draw` is still
+        more efficient when most vertex lists are to be drawn.
 
         The given vertex lists must belong to this batch; behaviour is
         undefined if this condition is not met.
@@ -558,29 +1109,95 @@ class Batch(object):
                 Vertex lists to draw.
 
         '''
-        # Horrendously inefficient.
+        if self._deferred_updates:
+            self.flush_updates()
+
+        if self._draw_list_dirty:
+            self._update_draw_list()
+
+        # Gather the vertex lists of each domain
+        domain_lists = {}
+        for vertex_list in vertex_lists:
+            try:
+                domain_lists[vertex_list.domain].append(vertex_list)
+            except KeyError:
+                domain_lists[vertex_list.domain] = [vertex_list]
+
+        self._draw_domain_lists(domain_lists, False)
+
+    def _draw_culled(self, viewport):
+        x, y, width, height = viewport
+        visible = self.spatial_hash.query(x, y, x + width, y + height)
+
+        domain_lists = {}
+        bounded_lists = self._bounded_lists
+        for domain, count in self._bounded_domains.items():
+            if count < len(domain._vertex_lists):
+                # Vertex lists without bounds are always drawn
+                domain_lists[domain] = [v for v in domain._vertex_lists
+                                        if v not in bounded_lists]
+            else:
+                domain_lists[domain] = []
+        for vertex_list in visible:
+            domain_lists[vertex_list.domain].append(vertex_list)
+
+        self._draw_domain_lists(domain_lists, True)
+
+    def _draw_domain_lists(self, domain_lists, draw_others):
+        '''Draw the given vertex lists of each domain in `domain_lists`, a
+        dict of domain to list of vertex lists.  Domains not in the dict are
+        drawn entirely if `draw_others` is True, and not drawn otherwise.
+        '''
         def visit(group):
-            group.set_state()
+            draw_list = []
 
             # Draw domains using this group
-            domain_map = self.group_map[group]
-            for (_, mode, _), domain in domain_map.items():
-                for list in vertex_lists:
-                    if list.domain is domain:
-                        list.draw(mode)
+            commands = []
+            for key, domain in self.group_map[group].items():
+                if domain in domain_lists:
+                    if domain_lists[domain]:
+                        commands.append((key, domain))
+                elif draw_others and not domain._is_empty():
+                    commands.append((key, domain))
+            if commands:
+                commands.sort()
+                commands = [(domain, mode, domain_lists.get(domain))
+                            for (_, mode, _), domain in commands]
+                draw_list.append(
+                    (lambda c: lambda: vertexdomain.draw_domains(c))(commands))
 
-            # Sort and visit child groups of this group
+            # Visit child groups of this group, already sorted by
+            # _update_draw_list.
             children = self.group_children.get(group)
             if children:
-                children.sort()
-                for child in children:
-                    visit(child)
+                draw_list.extend(visit_siblings(children))
 
-            group.unset_state()
+            if draw_list:
+                counts[0] += 2
+                return [group.set_state] + draw_list + [group.unset_state]
+            return []
+
+        def visit_siblings(groups):
+            group_lists = []
+            for group in groups:
+                group_list = visit(group)
+                if group_list:
+                    group_lists.append((group, group_list))
+            return _join_siblings(group_lists, diff, counts,
+                                  self._transitions)
+
+        if len(self._transitions) > 2 * len(self.group_map) + 64:
+            # Culling and subsets pair up groups that are not adjacent in
+            # the draw list; keep the cache from growing without bound.
+            self._transitions.clear()
+
+        diff = self.diff_group_state
+        counts = [0, 0]     # state changes, elided state changes
+        for func in visit_siblings(self.top_groups):
+            func()
 
-        self.top_groups.sort()
-        for group in self.top_groups:
-            visit(group)
+        state_counters.changes += counts[0]
+        state_counters.elided += counts[1]
 
 class Group(object):
     '''Group of common OpenGL state.
@@ -604,6 +1221,36 @@ class Group(object):
     def __lt__(self, other):
         return hash(self) < hash(other)
 
+    def get_state(self):
+        '''Declare the OpenGL state set by this group.
+
+        A batch with `Batch.diff_group_state` set uses the declared state of
+        consecutive sibling groups of the same class to change only the state
+        that differs between them, in place of calling `unset_state` on the
+        first and `set_state` on the second.  The declared state is a dict with any of
+        the following keys:
+
+        ``'texture'``
+            ``(target, id)``: the texture target is enabled and the texture
+            bound to it.
+        ``'blend'``
+            ``(src, dest)``: ``GL_BLEND`` is enabled and the blend function
+            set.
+        ``'program'``
+            Name of the shader program in use.
+
+        `set_state` and `unset_state` must have the same effect as applying
+        and repealing the declared state (save for saving and restoring the
+        previous state), and the group must not set any other state.
+
+        The default implementation returns None, indicating that the state of
+        the group is not declared, and `set_state` and `unset_state` are
+        always called.
+
+        :rtype: dict
+        '''
+        return None
+
     def set_state(self):
         '''Apply the OpenGL state change.  
         
@@ -675,6 +1322,9 @@ class TextureGroup(Group):
     def unset_state(self):
         glDisable(self.texture.target)
 
+    def get_state(self):
+        return {'texture': (self.texture.target, self.texture.id)}
+
     def __hash__(self):
         return hash((self.texture.target, self.texture.id, self.parent))
 
@@ -41,7 +41,9 @@ by `pyglet.graphics.vertexbuffer`.
  
 The allocator will at times request more space from the buffers. The current
 policy is to double the buffer size when there is not enough room to fulfil an
-allocation.  The buffer is never resized smaller.
+allocation.  The buffer is only resized smaller when its domain is compacted
+(see `pyglet.graphics.vertexdomain.VertexDomain.compact`), in which case a new
+allocator is created.
 
 The allocator maintains references to free space only; it is the caller's
 responsibility to maintain the allocated regions.
@@ -49,6 +51,9 @@ responsibility to maintain the allocated regions.
 
 __docformat__ = 'restructuredtext'
 __version__ = '$Id: $'
+
+import bisect
+import heapq
  
 # Common cases:
 # -regions will be the same size (instances of same object, e.g. sprites)
@@ -71,7 +76,14 @@ __version__ = '$Id: $'
 #  to provide accurate (start, size) tuple, which completely describes
 #  a region from the allocator's point of view.
 # -this means that compacting is probably not feasible, or would be hideously
-#  expensive
+#  expensive, within the allocator.  Instead the vertex domain, which knows
+#  its vertex lists, compacts by moving them and replacing the allocator.
+#
+# `FreeListAllocator` inverts the bookkeeping: it tracks free blocks indexed
+# by start, end and size, so that alloc and dealloc are binary searches and
+# dict lookups rather than linear scans.  The list of allocated regions needed
+# for drawing is derived from the free blocks on demand and cached until the
+# next change.
 
 class AllocatorMemoryException(Exception):
     '''The buffer is not large enough to fulfil an allocation.
@@ -356,8 +368,9 @@ class Allocator(object):
         if not self.starts:
             return 0
 
-        # Variation of search for free block.
-        total_free = 0
+        # Variation of search for free block.  Space before the first block
+        # is free too.
+        total_free = self.starts[0]
         free_start = self.starts[0] + self.sizes[0]
         for i, (alloc_start, alloc_size) in \
                 enumerate(zip(self.starts[1:], self.sizes[1:])):
@@ -402,3 +415,328 @@ class Allocator(object):
 
     def __repr__(self):
         return '<%s %s>' % (self.__class__.__name__, str(self))
+
+class FreeListAllocator(object):
+    '''Buffer space allocation implementation using an indexed free list.
+
+    Has the same interface as `Allocator`, but finds and coalesces free space
+    using lookups keyed on the start, end and size of each free block instead
+    of scanning every allocated block, which is preferable when many vertex
+    lists are created and deleted within a single domain.
+
+    Free blocks are bucketed by size, so `alloc`, `realloc` and `dealloc`
+    find and coalesce free space in amortised O(log n) time in the number
+    of free blocks.  Two list operations remain linear, though they move
+    memory in C rather than scanning in Python: inserting a size not yet in
+    the sorted list of distinct free sizes (which stays short when regions
+    are similarly sized), and inserting or deleting an allocated region.
+
+    Free space is allocated best-fit, ties being broken by lowest start
+    index, so that equally sized regions (the common case of sprites) are
+    packed back into the holes left by deleted regions.
+
+    The aggregate allocated regions are updated as each block is allocated
+    or freed, so `get_allocated_regions` is as cheap as it is for
+    `Allocator` and can be called on every draw.
+    '''
+    def __init__(self, capacity):
+        '''Create an allocator for a buffer of the specified capacity.
+
+        :Parameters:
+            `capacity` : int
+                Maximum size of the buffer.
+
+        '''
+        self.capacity = capacity
+
+        # Free blocks, indexed three ways:
+        #
+        # _free_starts:  {start: size}
+        # _free_ends:    {start + size: start}
+        # _free_buckets: {size: (set of starts, heap of starts)}; the heap
+        #                may also hold stale starts no longer in the set.
+        # _free_sizes:   sorted list of the keys of _free_buckets
+        #
+        # Adjacent free blocks are always coalesced, so no two entries
+        # touch.
+        self._free_starts = {}
+        self._free_ends = {}
+        self._free_buckets = {}
+        self._free_sizes = []
+        self._free_size = 0
+
+        # Aggregate allocated regions, kept sorted and coalesced as in
+        # `Allocator`.
+        self.starts = []
+        self.sizes = []
+
+        if capacity:
+            self._insert_free(0, capacity)
+
+    def _insert_free(self, start, size):
+        self._free_starts[start] = size
+        self._free_ends[start + size] = start
+        bucket = self._free_buckets.get(size)
+        if bucket is None:
+            bucket = self._free_buckets[size] = (set(), [])
+            bisect.insort(self._free_sizes, size)
+        starts, heap = bucket
+        starts.add(start)
+        heapq.heappush(heap, start)
+        self._free_size += size
+
+    def _remove_free(self, start):
+        size = self._free_starts.pop(start)
+        del self._free_ends[start + size]
+        starts, heap = self._free_buckets[size]
+        starts.remove(start)
+        if not starts:
+            del self._free_buckets[size]
+            sizes = self._free_sizes
+            del sizes[bisect.bisect_left(sizes, size)]
+        elif len(heap) > 2 * len(starts):
+            # Drop stale starts
+            heap[:] = sorted(starts)
+        self._free_size -= size
+        return size
+
+    def _release(self, start, size):
+        # Return a block to the free list, merging with its neighbours.
+        end = start + size
+        if end in self._free_starts:
+            size += self._remove_free(end)
+        if start in self._free_ends:
+            prev_start = self._free_ends[start]
+            size += self._remove_free(prev_start)
+            start = prev_start
+        self._insert_free(start, size)
+
+    def _add_region(self, start, size):
+        # Add free space to the allocated regions, merging with its
+        # neighbours.
+        starts = self.starts
+        sizes = self.sizes
+        end = start + size
+        i = bisect.bisect_left(starts, start)
+        joins_prev = i > 0 and starts[i - 1] + sizes[i - 1] == start
+        joins_next = i < len(starts) and starts[i] == end
+        if joins_prev and joins_next:
+            sizes[i - 1] += size + sizes[i]
+            del starts[i]
+            del sizes[i]
+        elif joins_prev:
+            sizes[i - 1] += size
+        elif joins_next:
+            starts[i] = start
+            sizes[i] += size
+        else:
+            starts.insert(i, start)
+            sizes.insert(i, size)
+
+    def _remove_region(self, start, size):
+        # Remove allocated space from the allocated regions, splitting the
+        # region containing it.
+        starts = self.starts
+        sizes = self.sizes
+        end = start + size
+        i = bisect.bisect_right(starts, start) - 1
+        assert i >= 0 and end <= starts[i] + sizes[i], 'Region not allocated'
+        region_start = starts[i]
+        region_end = region_start + sizes[i]
+        if start == region_start:
+            if end == region_end:
+                del starts[i]
+                del sizes[i]
+            else:
+                starts[i] = end
+                sizes[i] = region_end - end
+        else:
+            sizes[i] = start - region_start
+            if end < region_end:
+                starts.insert(i + 1, end)
+                sizes.insert(i + 1, region_end - end)
+
+    def _get_final_free_size(self):
+        start = self._free_ends.get(self.capacity)
+        if start is None:
+            return 0
+        return self.capacity - start
+
+    def set_capacity(self, size):
+        '''Resize the maximum buffer size.
+
+        The capacity cannot be reduced.
+
+        :Parameters:
+            `size` : int
+                New maximum size of the buffer.
+
+        '''
+        assert size > self.capacity
+        old_capacity = self.capacity
+        self.capacity = size
+        self._release(old_capacity, size - old_capacity)
+
+    def alloc(self, size):
+        '''Allocate memory in the buffer.
+
+        Raises `AllocatorMemoryException` if the allocation cannot be
+        fulfilled.
+
+        :Parameters:
+            `size` : int
+                Size of region to allocate.
+
+        :rtype: int
+        :return: Starting index of the allocated region.
+        '''
+        assert size >= 0
+
+        if size == 0:
+            return 0
+
+        sizes = self._free_sizes
+        i = bisect.bisect_left(sizes, size)
+        if i == len(sizes):
+            raise AllocatorMemoryException(
+                self.capacity + size - self._get_final_free_size())
+
+        free_size = sizes[i]
+        starts, heap = self._free_buckets[free_size]
+        while heap[0] not in starts:
+            heapq.heappop(heap)
+        free_start = heap[0]
+        self._remove_free(free_start)
+        if free_size > size:
+            # Remainder can't touch another free block, no need to merge.
+            self._insert_free(free_start + size, free_size - size)
+        self._add_region(free_start, size)
+        return free_start
+
+    def realloc(self, start, size, new_size):
+        '''Reallocate a region of the buffer.
+
+        This is more efficient than separate `dealloc` and `alloc` calls, as
+        the region can often be resized in-place.
+
+        Raises `AllocatorMemoryException` if the allocation cannot be
+        fulfilled.
+
+        :Parameters:
+            `start` : int
+                Current starting index of the region.
+            `size` : int
+                Current size of the region.
+            `new_size` : int
+                New size of the region.
+
+        '''
+        assert size >= 0 and new_size >= 0
+
+        if new_size == 0:
+            if size != 0:
+                self.dealloc(start, size)
+            return 0
+        elif size == 0:
+            return self.alloc(new_size)
+
+        # Truncation is the same as deallocating the tail cruft
+        if new_size < size:
+            self.dealloc(start + new_size, size - new_size)
+            return start
+
+        # Expand in place if the following free block is large enough.
+        end = start + size
+        growth = new_size - size
+        free_size = self._free_starts.get(end, 0)
+        if free_size >= growth:
+            if growth:
+                self._remove_free(end)
+                if free_size > growth:
+                    self._insert_free(end + growth, free_size - growth)
+                self._add_region(end, growth)
+            return start
+
+        # Allocate before deallocating, so that a failed allocation leaves
+        # the original region intact.
+        try:
+            result = self.alloc(new_size)
+        except AllocatorMemoryException:
+            if end + free_size == self.capacity:
+                # Region is at the end of the buffer; ask for only enough
+                # extra capacity to grow it in place.
+                raise AllocatorMemoryException(
+                    self.capacity + growth - free_size)
+            raise
+        self.dealloc(start, size)
+        return result
+
+    def dealloc(self, start, size):
+        '''Free a region of the buffer.
+
+        :Parameters:
+            `start` : int
+                Starting index of the region.
+            `size` : int
+                Size of the region.
+
+        '''
+        assert size >= 0
+
+        if size == 0:
+            return
+
+        self._remove_region(start, size)
+        self._release(start, size)
+
+    def get_allocated_regions(self):
+        '''Get a list of (aggregate) allocated regions.
+
+        The result of this method is ``(starts, sizes)``, where ``starts`` is
+        a list of starting indices of the regions and ``sizes`` their
+        corresponding lengths.
+
+        :rtype: (list, list)
+        '''
+        return (self.starts, self.sizes)
+
+    def get_fragmented_free_size(self):
+        '''Returns the amount of space unused, not including the final
+        free block.
+
+        :rtype: int
+        '''
+        return self._free_size - self._get_final_free_size()
+
+    def get_free_size(self):
+        '''Return the amount of space unused.
+
+        :rtype: int
+        '''
+        return self._free_size
+
+    def get_usage(self):
+        '''Return fraction of capacity currently allocated.
+
+        :rtype: float
+        '''
+        return 1. - self.get_free_size() / float(self.capacity)
+
+    def get_fragmentation(self):
+        '''Return fraction of free space that is not expandable.
+
+        :rtype: float
+        '''
+        free_size = self.get_free_size()
+        if free_size == 0:
+            return 0.
+        return self.get_fragmented_free_size() / float(free_size)
+
+    def _is_empty(self):
+        return not self.starts
+
+    def __str__(self):
+        return 'allocs=' + repr(zip(self.starts, self.sizes))
+
+    def __repr__(self):
+        return '<%s %s>' % (self.__class__.__name__, str(self))
@@ -0,0 +1,201 @@
+# ----------------------------------------------------------------------------
+# pyglet
+# Copyright (c) 2006-2008 Alex Holkner
+# All rights reserved.
+# 
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions 
+# are met:
+#
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above copyright 
+#    notice, this list of conditions and the following disclaimer in
+#    the documentation and/or other materials provided with the
+#    distribution.
+#  * Neither the name of pyglet nor the names of its
+#    contributors may be used to endorse or promote products
+#    derived from this software without specific prior written
+#    permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+# ----------------------------------------------------------------------------
+# $Id:$
+
+'''Uniform grid of object bounds, used to cull vertex lists outside the
+viewport.
+
+Each object is stored in every grid cell that its axis-aligned bounding box
+overlaps.  Moving an object within the same cells only replaces its bounds;
+the cells are updated only when it crosses a cell boundary.  Querying a
+rectangle visits the cells it overlaps, so the cost depends on the size of
+the rectangle and the density of objects within it rather than on the
+total number of objects.
+
+The cell size should be a few times larger than a typical object; objects
+much larger than a cell are stored in many cells.
+
+See `pyglet.graphics.Batch.enable_culling` for how this is used by batches.
+'''
+
+__docformat__ = 'restructuredtext'
+__version__ = '$Id: $'
+
+class SpatialHash(object):
+    '''Uniform grid of axis-aligned bounding boxes.
+
+    Bounds are given as a tuple ``(x1, y1, x2, y2)`` with ``x1 <= x2`` and
+    ``y1 <= y2``.  Objects may also be added with bounds of ``None``, in which
+    case they are known to the spatial hash but never returned by `query`.
+    '''
+
+    def __init__(self, cell_size=256):
+        '''Create an empty spatial hash.
+
+        :Parameters:
+            `cell_size` : float
+                Width and height of each grid cell.
+
+        '''
+        assert cell_size > 0, 'Cell size must be positive'
+        self.cell_size = float(cell_size)
+
+        # (i, j) -> set of objects overlapping cell
+        self._cells = {}
+
+        # object -> (bounds, (i1, j1, i2, j2) or None)
+        self._items = {}
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, item):
+        return item in self._items
+
+    def _get_cell_range(self, bounds):
+        if bounds is None:
+            return None
+        x1, y1, x2, y2 = bounds
+        size = self.cell_size
+        return (int(x1 // size), int(y1 // size),
+                int(x2 // size), int(y2 // size))
+
+    def set(self, item, bounds):
+        '''Add an object, or update the bounds of an object already added.
+
+        :Parameters:
+            `item` : object
+                Hashable object to add.
+            `bounds` : tuple
+                ``(x1, y1, x2, y2)`` bounding box, or ``None`` if the object
+                should not be returned by `query`.
+
+        '''
+        cell_range = self._get_cell_range(bounds)
+        try:
+            _, old_range = self._items[item]
+        except KeyError:
+            old_range = None
+        self._items[item] = (bounds, cell_range)
+        if cell_range == old_range:
+            return
+
+        cells = self._cells
+        if old_range is not None:
+            self._remove_cells(item, old_range)
+        if cell_range is not None:
+            i1, j1, i2, j2 = cell_range
+            for i in xrange(i1, i2 + 1):
+                for j in xrange(j1, j2 + 1):
+                    try:
+                        cells[i, j].add(item)
+                    except KeyError:
+                        cells[i, j] = set((item,))
+
+    def _remove_cells(self, item, cell_range):
+        cells = self._cells
+        i1, j1, i2, j2 = cell_range
+        for i in xrange(i1, i2 + 1):
+            for j in xrange(j1, j2 + 1):
+                cell = cells[i, j]
+                cell.discard(item)
+                if not cell:
+                    del cells[i, j]
+
+    def remove(self, item):
+        '''Remove an object.
+
+        :Parameters:
+            `item` : object
+                Object previously added with `set`.
+
+        '''
+        _, cell_range = self._items.pop(item)
+        if cell_range is not None:
+            self._remove_cells(item, cell_range)
+
+    def get_bounds(self, item):
+        '''Get the bounds of an object.
+
+        :Parameters:
+            `item` : object
+                Object previously added with `set`.
+
+        :rtype: tuple
+        :return: The ``(x1, y1, x2, y2)`` bounds given to `set`, or ``None``.
+        '''
+        return self._items[item][0]
+
+    def query(self, x1, y1, x2, y2):
+        '''Find the objects whose bounds overlap a rectangle.
+
+        Bounds that only touch the edge of the rectangle are considered to
+        overlap it.
+
+        :Parameters:
+            `x1` : float
+                Left edge of the rectangle.
+            `y1` : float
+                Bottom edge of the rectangle.
+            `x2` : float
+                Right edge of the rectangle.
+            `y2` : float
+                Top edge of the rectangle.
+
+        :rtype: set
+        '''
+        i1, j1, i2, j2 = self._get_cell_range((x1, y1, x2, y2))
+        cells = self._cells
+        candidates = set()
+        if (i2 - i1 + 1) * (j2 - j1 + 1) > len(cells):
+            # Rectangle covers more cells than are occupied
+            for (i, j), cell in cells.iteritems():
+                if i1 <= i <= i2 and j1 <= j <= j2:
+                    candidates.update(cell)
+        else:
+            for i in xrange(i1, i2 + 1):
+                for j in xrange(j1, j2 + 1):
+                    cell = cells.get((i, j))
+                    if cell:
+                        candidates.update(cell)
+
+        # Objects in the cells at the edge of the rectangle may lie outside
+        # it.
+        items = self._items
+        result = set()
+        for item in candidates:
+            bx1, by1, bx2, by2 = items[item][0]
+            if bx1 <= x2 and bx2 >= x1 and by1 <= y2 and by2 >= y1:
+                result.add(item)
+        return result
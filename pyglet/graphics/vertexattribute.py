@@ -140,6 +140,11 @@ import re
 from pyglet.gl import *
 from pyglet.graphics import vertexbuffer
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 _c_types = {
     GL_BYTE: ctypes.c_byte,
     GL_UNSIGNED_BYTE: ctypes.c_ubyte,
@@ -176,6 +181,19 @@ _attribute_cache = {}
 def _align(v, align):
     return ((v - 1) & ~(align - 1)) + align
 
+def _as_c_array(c_type, count, data):
+    '''Return `data` as a ctypes array of `count` elements of `c_type`,
+    without copying if it is already a ctypes array or `array.array` of
+    matching type and length.
+    '''
+    array_type = c_type * count
+    if isinstance(data, array_type):
+        return data
+    if (getattr(data, 'typecode', None) == c_type._type_ and
+        len(data) == count):
+        return array_type.from_buffer(data)
+    return array_type(*data)
+
 def interleave_attributes(attributes):
     '''Interleave attribute offsets.
 
@@ -346,6 +364,48 @@ class AbstractAttribute(object):
             return vertexbuffer.IndirectArrayRegion(
                 region, array_count, self.count, elem_stride)
 
+    def get_view(self, buffer, start, count):
+        '''Map a buffer region using this attribute, without copying.
+
+        The returned region's ``array`` shares memory with the buffer.  If
+        NumPy is available it is a NumPy array of shape ``(count,
+        self.count)`` whose strides match the attribute's layout, so
+        interleaved attributes can be viewed too.  Otherwise the region is
+        the one returned by `get_region`: a flat array of ``self.count *
+        count`` components of the attribute's type, which is a
+        `pyglet.graphics.vertexbuffer.IndirectArrayRegion` for interleaved
+        attributes.
+
+        As with `get_region`, changes are not recognised until the region's
+        ``invalidate`` method is called, and the view becomes invalid if the
+        buffer is resized.
+
+        :Parameters:
+            `buffer` : `AbstractMappable`
+                The buffer to map.
+            `start` : int
+                Offset of the first vertex to map.
+            `count` : int
+                Number of vertices to map
+
+        :rtype: `AbstractBufferRegion`
+        '''
+        if numpy is None:
+            return self.get_region(buffer, start, count)
+
+        byte_start = self.stride * start + self.offset
+        if count:
+            byte_size = self.stride * (count - 1) + self.size
+        else:
+            byte_size = 0
+        region = buffer.get_region(byte_start, byte_size,
+                                   ctypes.POINTER(ctypes.c_byte * byte_size))
+        region.array = numpy.ndarray((count, self.count),
+                                     numpy.dtype(self.c_type),
+                                     region.array, 0,
+                                     (self.stride, self.align))
+        return region
+
     def set_region(self, buffer, start, count, data):
         '''Set the data over a region of the buffer.
 
@@ -357,7 +417,8 @@ class AbstractAttribute(object):
             `count` : int
                 Number of vertices to set.
             `data` : sequence
-                Sequence of data components.
+                Sequence of data components.  A ctypes array or
+                `array.array` of the attribute's type is copied directly.
 
         '''
         if self.stride == self.size:
@@ -365,7 +426,7 @@ class AbstractAttribute(object):
             byte_start = self.stride * start
             byte_size = self.stride * count
             array_count = self.count * count
-            data = (self.c_type * array_count)(*data)
+            data = _as_c_array(self.c_type, array_count, data)
             buffer.set_data_region(data, byte_start, byte_size)
         else:
             # interleaved
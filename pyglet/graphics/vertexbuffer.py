@@ -42,13 +42,17 @@ Buffers can optionally be created "mappable" (incorporating the
 `AbstractMappable` mix-in).  In this case the buffer provides a ``get_region``
 method which provides the most efficient path for updating partial data within
 the buffer.
+
+Mappable VBOs keep a system memory copy of their data and upload only the
+ranges that have been modified, when the buffer is next bound.  The amount of
+data uploaded is recorded in `upload_counters`, which an application can use
+to measure (and reset) the upload traffic of each frame.
 '''
 
 __docformat__ = 'restructuredtext'
 __version__ = '$Id: $'
 
 import ctypes
-import sys
 
 import pyglet
 from pyglet.gl import *
@@ -61,6 +65,59 @@ _enable_vbo = pyglet.options['graphics_vbo']
 # contexts anyway.  This is completely unlikely anyway).
 _workaround_vbo_finish = False
 
+#: Value of the ``vbo`` parameter of `create_mappable_buffer` requesting a
+#: `StreamingVertexBufferObject`.
+STREAM_RING = 'stream-ring'
+
+# Number of dirty ranges a buffer accumulates before they are coalesced
+# without waiting for the buffer to be bound.
+_max_dirty_ranges = 1024
+
+class UploadCounters(object):
+    '''Running totals of data uploaded by mappable buffers.
+
+    :Ivariables:
+        `bytes` : int
+            Number of bytes uploaded.
+        `calls` : int
+            Number of ``glBufferData`` and ``glBufferSubData`` calls made.
+
+    '''
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        '''Reset the counters to zero; for example, at the start of each
+        frame.'''
+        self.bytes = 0
+        self.calls = 0
+
+    def __repr__(self):
+        return '%s(bytes=%d, calls=%d)' % (
+            self.__class__.__name__, self.bytes, self.calls)
+
+#: Counters of all data uploaded by `MappableVertexBufferObject` instances.
+#:
+#: :type: `UploadCounters`
+upload_counters = UploadCounters()
+
+def _coalesce_ranges(ranges, gap, size):
+    '''Sort and merge a list of ``(start, end)`` byte ranges, joining ranges
+    separated by no more than `gap` bytes and clipping to `size`.'''
+    ranges.sort()
+    result = []
+    current_start, current_end = ranges[0]
+    for start, end in ranges:
+        if start <= current_end + gap:
+            if end > current_end:
+                current_end = end
+        else:
+            result.append((current_start, min(current_end, size)))
+            current_start = start
+            current_end = end
+    result.append((current_start, min(current_end, size)))
+    return [(start, end) for start, end in result if start < end]
+
 def create_buffer(size,
                   target=GL_ARRAY_BUFFER,
                   usage=GL_DYNAMIC_DRAW,
@@ -104,7 +161,9 @@ def create_mappable_buffer(size,
             OpenGL usage constant
         `vbo` : bool
             True if a `VertexBufferObject` should be created if the driver
-            supports it; otherwise only a `VertexArray` is created.
+            supports it; otherwise only a `VertexArray` is created.  If
+            `STREAM_RING`, a `StreamingVertexBufferObject` is created if the
+            driver supports VBOs.
 
     :rtype: `AbstractBuffer` with `AbstractMappable`
     '''
@@ -113,6 +172,8 @@ def create_mappable_buffer(size,
         gl_info.have_version(1, 5) and
         _enable_vbo and
         not gl.current_context._workaround_vbo):
+        if vbo == STREAM_RING:
+            return StreamingVertexBufferObject(size, target, usage)
         return MappableVertexBufferObject(size, target, usage)
     else:
         return VertexArray(size)
@@ -374,44 +435,78 @@ class MappableVertexBufferObject(VertexBufferObject, AbstractMappable):
     held in local memory until `bind` is called.  The advantage is that fewer
     OpenGL calls are needed, increasing performance.
 
+    Each modified byte range is recorded.  When the buffer is bound the
+    ranges are sorted and merged, and each merged range is uploaded with
+    ``glBufferSubData``; so modifying data at either end of a large buffer
+    does not upload everything in between.  Ranges separated by no more than
+    `dirty_merge_gap` bytes are uploaded together, trading a little extra
+    data for fewer calls.
+
     There may also be less performance penalty for resizing this buffer.
 
     Updates to data via `map` are committed immediately.
     '''
+
+    #: Maximum number of unmodified bytes between two modified ranges for
+    #: them to be uploaded in a single call.
+    #:
+    #: :type: int
+    dirty_merge_gap = 1024
+
     def __init__(self, size, target, usage):
         super(MappableVertexBufferObject, self).__init__(size, target, usage)
         self.data = (ctypes.c_byte * size)()
         self.data_ptr = ctypes.cast(self.data, ctypes.c_void_p).value
-        self._dirty_min = sys.maxint
-        self._dirty_max = 0
+        # List of modified (start, end) byte ranges, unsorted and possibly
+        # overlapping.
+        self._dirty = []
 
     def bind(self):
         # Commit pending data
         super(MappableVertexBufferObject, self).bind()
-        size = self._dirty_max - self._dirty_min
-        if size > 0:
-            if size == self.size:
-                glBufferData(self.target, self.size, self.data, self.usage)
-            else:
-                glBufferSubData(self.target, self._dirty_min, size,
-                    self.data_ptr + self._dirty_min)
-            self._dirty_min = sys.maxint
-            self._dirty_max = 0
+        if self._dirty:
+            self._upload_dirty()
+
+    def _upload_dirty(self):
+        ranges = _coalesce_ranges(self._dirty, self.dirty_merge_gap,
+                                  self.size)
+        self._dirty = []
+        if ranges == [(0, self.size)]:
+            glBufferData(self.target, self.size, self.data, self.usage)
+            upload_counters.bytes += self.size
+            upload_counters.calls += 1
+            return
+
+        for start, end in ranges:
+            glBufferSubData(self.target, start, end - start,
+                            self.data_ptr + start)
+            upload_counters.bytes += end - start
+        upload_counters.calls += len(ranges)
+
+    def _invalidate_range(self, start, end):
+        dirty = self._dirty
+        dirty.append((start, end))
+        if len(dirty) > _max_dirty_ranges:
+            dirty = _coalesce_ranges(dirty, self.dirty_merge_gap, self.size)
+            if len(dirty) > _max_dirty_ranges // 2:
+                # Too scattered to merge; upload the whole span rather than
+                # sorting the ranges again on every later write.
+                dirty = [(dirty[0][0], dirty[-1][1])]
+            self._dirty = dirty
 
     def set_data(self, data):
         super(MappableVertexBufferObject, self).set_data(data)
         ctypes.memmove(self.data, data, self.size)
-        self._dirty_min = 0
-        self._dirty_max = self.size
+        upload_counters.bytes += self.size
+        upload_counters.calls += 1
+        self._dirty = []
 
     def set_data_region(self, data, start, length):
         ctypes.memmove(self.data_ptr + start, data, length)
-        self._dirty_min = min(start, self._dirty_min)
-        self._dirty_max = max(start + length, self._dirty_max)
+        self._invalidate_range(start, start + length)
 
     def map(self, invalidate=False):
-        self._dirty_min = 0
-        self._dirty_max = self.size
+        self._dirty = [(0, self.size)]
         return self.data
 
     def unmap(self):
@@ -432,9 +527,114 @@ class MappableVertexBufferObject(VertexBufferObject, AbstractMappable):
         glBindBuffer(self.target, self.id)
         glBufferData(self.target, self.size, self.data, self.usage)
         glPopClientAttrib()
+        upload_counters.bytes += self.size
+        upload_counters.calls += 1
+
+        self._dirty = []
+
+class StreamingVertexBufferObject(MappableVertexBufferObject):
+    '''A mappable VBO for data that is rewritten every frame.
+
+    Updating a buffer that the GL is still reading from in order to draw a
+    previous frame can stall until the draw completes.  This buffer avoids
+    the stall by never modifying storage that may be in use:
+
+    * If the driver supports sync objects (OpenGL 3.2 or
+      ``GL_ARB_sync``), a ring of `ring_size` buffer objects is used.  Each
+      upload goes to the next buffer in the ring, after waiting on the fence
+      placed when it was last drawn (which, with enough buffers, has
+      already been signalled).
+    * Otherwise the buffer is orphaned: its storage is respecified with
+      ``glBufferData`` for each upload, so the driver can allocate new
+      storage while the old storage is still being read.
+
+    Either way, the entire buffer is uploaded whenever any of it has been
+    modified, so this buffer is only suited to data that is mostly
+    rewritten between draws.
+    '''
 
-        self._dirty_min = sys.maxint
-        self._dirty_max = 0
+    #: Number of buffer objects in the ring, when sync objects are
+    #: available.
+    #:
+    #: :type: int
+    ring_size = 3
+
+    def __init__(self, size, target, usage):
+        super(StreamingVertexBufferObject, self).__init__(size, target, usage)
+        self._ids = [self.id]
+        self._fences = [None]
+        self._index = 0
+        if gl_info.have_version(3, 2) or gl_info.have_extension('GL_ARB_sync'):
+            n = self.ring_size - 1
+            ids = (GLuint * n)()
+            glGenBuffers(n, ids)
+            glPushClientAttrib(GL_CLIENT_VERTEX_ARRAY_BIT)
+            for id in ids:
+                glBindBuffer(target, id)
+                glBufferData(target, self.size, None, self.usage)
+            glPopClientAttrib()
+            self._ids.extend(ids)
+            self._fences.extend([None] * n)
+
+    def bind(self):
+        if not self._dirty:
+            glBindBuffer(self.target, self.id)
+            return
+
+        self._dirty = []
+        if len(self._ids) > 1:
+            # Fence the commands issued so far, which may read from the
+            # current buffer.
+            self._fences[self._index] = \
+                glFenceSync(GL_SYNC_GPU_COMMANDS_COMPLETE, 0)
+            self._index = (self._index + 1) % len(self._ids)
+            self.id = self._ids[self._index]
+            fence = self._fences[self._index]
+            if fence:
+                while glClientWaitSync(fence, GL_SYNC_FLUSH_COMMANDS_BIT,
+                                       1000000000) == GL_TIMEOUT_EXPIRED:
+                    pass
+                glDeleteSync(fence)
+                self._fences[self._index] = None
+            glBindBuffer(self.target, self.id)
+            glBufferSubData(self.target, 0, self.size, self.data)
+        else:
+            # Respecifying the storage lets the driver orphan the storage
+            # still in use, rather than wait for it.
+            glBindBuffer(self.target, self.id)
+            glBufferData(self.target, self.size, self.data, self.usage)
+        upload_counters.bytes += self.size
+        upload_counters.calls += 1
+
+    def resize(self, size):
+        super(StreamingVertexBufferObject, self).resize(size)
+        glPushClientAttrib(GL_CLIENT_VERTEX_ARRAY_BIT)
+        for i, id in enumerate(self._ids):
+            if self._fences[i]:
+                glDeleteSync(self._fences[i])
+                self._fences[i] = None
+            if id != self.id:
+                glBindBuffer(self.target, id)
+                glBufferData(self.target, self.size, None, self.usage)
+        glPopClientAttrib()
+
+    def __del__(self):
+        try:
+            for id in self._ids:
+                if id is not None:
+                    self._context.delete_buffer(id)
+        except:
+            pass
+
+    def delete(self):
+        for fence in self._fences:
+            if fence:
+                glDeleteSync(fence)
+        ids = (GLuint * len(self._ids))(*self._ids)
+        glDeleteBuffers(len(self._ids), ids)
+        self._ids = [None]
+        self._fences = [None]
+        self.id = None
 
 class AbstractBufferRegion(object):
     '''A mapped region of a buffer.
@@ -464,9 +664,7 @@ class VertexBufferObjectRegion(AbstractBufferRegion):
         self.array = array
 
     def invalidate(self):
-        buffer = self.buffer
-        buffer._dirty_min = min(buffer._dirty_min, self.start)
-        buffer._dirty_max = max(buffer._dirty_max, self.end)
+        self.buffer._invalidate_range(self.start, self.end)
 
 class VertexArrayRegion(AbstractBufferRegion):
     '''A mapped region of a vertex array.
@@ -517,6 +715,9 @@ class IndirectArrayRegion(AbstractBufferRegion):
         return 'IndirectArrayRegion(size=%d, count=%d, stride=%d)' % (
             self.size, self.count, self.stride)
 
+    def __len__(self):
+        return self.size
+
     def __getitem__(self, index):
         count = self.count
         if not isinstance(index, slice):
@@ -45,6 +45,10 @@ Domains can optionally be indexed, in which case they also manage a buffer
 containing vertex indices.  This buffer is grown separately and has no size
 relation to the attribute buffers.
 
+A `QuadDomain` holds quads of four vertices each, like a domain drawn with
+``GL_QUADS``, but draws them as pairs of triangles using an index buffer
+shared by all quad domains of the context (see `get_quad_index_buffer`).
+
 Applications can create vertices (and optionally, indices) within a domain
 with the `VertexDomain.create` method.  This returns a `VertexList`
 representing the list of vertices created.  The vertex attribute data within
@@ -60,14 +64,16 @@ __docformat__ = 'restructuredtext'
 __version__ = '$Id: $'
 
 import ctypes
+import itertools
 import re
 
+import pyglet
 from pyglet.gl import *
 from pyglet.graphics import allocation, vertexattribute, vertexbuffer
 
 _usage_format_re = re.compile(r'''
     (?P<attribute>[^/]*)
-    (/ (?P<usage> static|dynamic|stream|none))?
+    (/ (?P<usage> static|dynamic|stream-ring|stream|none))?
 ''', re.VERBOSE)
 
 _gl_usages = {
@@ -77,6 +83,22 @@ _gl_usages = {
     'none': GL_STREAM_DRAW_ARB, # Force no VBO
 }
 
+_allocator_classes = {
+    'list': allocation.Allocator,
+    'freelist': allocation.FreeListAllocator,
+}
+
+def _get_allocator_class(name):
+    '''Get the allocator class for a ``graphics_allocator`` option value.'''
+    try:
+        return _allocator_classes[name]
+    except KeyError:
+        raise ValueError(
+            'Invalid graphics_allocator option %r; must be one of %s' % (
+                name, ', '.join(repr(n) for n in sorted(_allocator_classes))))
+
+_allocator_class = _get_allocator_class(pyglet.options['graphics_allocator'])
+
 def _nearest_pow2(v):
     # From http://graphics.stanford.edu/~seander/bithacks.html#RoundUpPowerOf2
     # Credit: Sean Anderson
@@ -88,18 +110,83 @@ def _nearest_pow2(v):
     v |= v >> 16
     return v + 1
 
+def _get_compaction_runs(items):
+    '''Given a sequence of ``(start, count)`` regions sorted by start,
+    return the list of ``(src, dest, count)`` moves that pack them against
+    the start of the buffer, and the total count.
+
+    Consecutive regions that move by the same amount are coalesced into one
+    run.
+    '''
+    runs = []
+    cursor = 0
+    for start, count in items:
+        if start != cursor and count:
+            if runs:
+                src, dest, run_count = runs[-1]
+                if src + run_count == start and dest + run_count == cursor:
+                    runs[-1] = (src, dest, run_count + count)
+                    cursor += count
+                    continue
+            runs.append((start, cursor, count))
+        cursor += count
+    return runs, cursor
+
+# Drawing modes whose primitives are independent of each other, so that
+# adjacent ranges of vertices can be drawn as one range.
+_independent_modes = set([GL_POINTS, GL_LINES, GL_TRIANGLES, GL_QUADS])
+
+def _get_draw_ranges(mode, regions):
+    '''Given a list of ``(start, count)`` regions, return the regions sorted
+    by start, with adjacent regions merged if `mode` allows it.
+    '''
+    regions.sort()
+    if mode not in _independent_modes:
+        return regions
+    ranges = [regions[0]]
+    for start, count in regions[1:]:
+        last_start, last_count = ranges[-1]
+        if last_start + last_count == start:
+            ranges[-1] = (last_start, last_count + count)
+        else:
+            ranges.append((start, count))
+    return ranges
+
+def _move_buffer_data(buffer, element_size, runs):
+    '''Move elements within a mappable buffer.  Moves are toward the start
+    of the buffer and applied in order, so overlapping runs are safe.
+    '''
+    if not runs:
+        return
+    region = buffer.get_region(0, buffer.size,
+                               ctypes.POINTER(ctypes.c_byte * buffer.size))
+    base = ctypes.addressof(region.array)
+    for src, dest, count in runs:
+        ctypes.memmove(base + dest * element_size,
+                       base + src * element_size,
+                       count * element_size)
+    region.invalidate()
+
 def create_attribute_usage(format):
     '''Create an attribute and usage pair from a format string.  The
     format string is as documented in `pyglet.graphics.vertexattribute`, with
     the addition of an optional usage component::
 
-        usage ::= attribute ( '/' ('static' | 'dynamic' | 'stream' | 'none') )?
+        usage ::= attribute ( '/' ('static' | 'dynamic' | 'stream' |
+                                   'stream-ring' | 'none') )?
 
     If the usage is not given it defaults to 'dynamic'.  The usage corresponds
     to the OpenGL VBO usage hint, and for ``static`` also indicates a
     preference for interleaved arrays.  If ``none`` is specified a buffer
     object is not created, and vertex data is stored in system memory.
 
+    ``stream-ring`` is a ``stream`` usage for data that is rewritten every
+    frame, such as particles.  It uses a
+    `pyglet.graphics.vertexbuffer.StreamingVertexBufferObject`, which
+    avoids stalling on data the GL is still drawing from by cycling through
+    several buffers, or by orphaning the buffer if sync objects are not
+    supported.
+
     Some examples:
 
     ``v3f/stream``
@@ -107,13 +194,16 @@ def create_attribute_usage(format):
     ``c4b/static``
         4-byte color attribute, for static usage
 
-    :return: attribute, usage
+    :return: attribute, usage, vbo
     '''
     match = _usage_format_re.match(format)
     attribute_format = match.group('attribute')
     attribute = vertexattribute.create_attribute(attribute_format)
     usage = match.group('usage')
-    if usage:
+    if usage == 'stream-ring':
+        vbo = vertexbuffer.STREAM_RING
+        usage = GL_STREAM_DRAW
+    elif usage:
         vbo = not usage == 'none'
         usage = _gl_usages[usage]
     else:
@@ -122,6 +212,171 @@ def create_attribute_usage(format):
 
     return (attribute, usage, vbo)
 
+class VertexFormat(object):
+    '''A compiled sequence of attribute usage formats.
+
+    Parsing format strings is comparatively slow; a vertex format parses
+    them once, and can then be passed to `pyglet.graphics.Batch.add`,
+    `pyglet.graphics.Batch.add_indexed` and `pyglet.graphics.vertex_list`
+    in place of the format strings.  Vertex formats are immutable, and
+    compare and hash equal to other vertex formats with the same format
+    strings, so vertex lists created with either share domains.
+
+    Applications that create many vertex lists of the same format should
+    create the vertex format once and reuse it::
+
+        sprite_format = VertexFormat('v2f/dynamic', 'c4B', 't3f')
+        vertex_list = batch.add(4, GL_QUADS, group,
+                                sprite_format, None, None, tex_coords)
+
+    :Ivariables:
+        `formats` : tuple of str
+            The attribute usage format strings.
+        `attributes` : tuple of `AbstractAttribute`
+            Prototype of the attribute for each format.  These are never
+            bound to a buffer; domains create their own attributes.
+        `usages` : tuple of int
+            OpenGL usage hint of each attribute.
+        `c_types` : tuple of ctypes type
+            ctypes type of each attribute's components.
+        `sizes` : tuple of int
+            Size of each (non-interleaved) attribute per vertex, in bytes.
+        `names` : tuple of str
+            Name of each attribute as used by `VertexList`; for example,
+            ``"vertices"``, or ``None`` for generic and multi-texture
+            attributes.
+
+    '''
+    def __init__(self, *formats):
+        '''Compile a vertex format.
+
+        :Parameters:
+            `formats` : str
+                Attribute usage format strings, as documented in
+                `create_attribute_usage`.
+
+        '''
+        assert formats, 'No attribute formats given'
+        self.formats = formats
+        attribute_usages = [create_attribute_usage(f) for f in formats]
+        self.attributes = tuple(a for a, _, _ in attribute_usages)
+        self.usages = tuple(u for _, u, _ in attribute_usages)
+        self._vbos = tuple(v for _, _, v in attribute_usages)
+        self.c_types = tuple(a.c_type for a in self.attributes)
+        self.sizes = tuple(a.size for a in self.attributes)
+        self.names = tuple(getattr(a, 'plural', None)
+                           for a in self.attributes)
+        self._hash = hash(formats)
+
+    def create_attribute_usages(self):
+        '''Create new attribute and usage triples for a domain of this
+        format, as returned by `create_attribute_usage`.
+
+        :rtype: list of (`AbstractAttribute`, int, bool)
+        '''
+        return [create_attribute_usage(f) for f in self.formats]
+
+    def __eq__(self, other):
+        return (self is other or
+                (isinstance(other, VertexFormat) and
+                 self.formats == other.formats))
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return self._hash
+
+    def __len__(self):
+        return len(self.formats)
+
+    def __repr__(self):
+        return '%s(%s)' % (self.__class__.__name__,
+                           ', '.join(repr(f) for f in self.formats))
+
+# Vertex formats compiled by get_vertex_format, keyed by format strings.
+_vertex_format_cache = {}
+_vertex_format_cache_size = 128
+_vertex_format_clock = itertools.count()
+
+def get_vertex_format(formats):
+    '''Get the compiled `VertexFormat` for a sequence of attribute usage
+    format strings.
+
+    Compiled formats are kept in a cache of the most recently used formats,
+    so repeated calls with the same formats do not parse them again.
+
+    :Parameters:
+        `formats` : tuple of str
+            Attribute usage format strings.
+
+    :rtype: `VertexFormat`
+    '''
+    try:
+        vertex_format = _vertex_format_cache[formats]
+    except KeyError:
+        if len(_vertex_format_cache) >= _vertex_format_cache_size:
+            # Evict the least recently used format.
+            del _vertex_format_cache[min(_vertex_format_cache.values(),
+                key=lambda f: f._last_used).formats]
+        vertex_format = VertexFormat(*formats)
+        _vertex_format_cache[formats] = vertex_format
+    vertex_format._last_used = next(_vertex_format_clock)
+    return vertex_format
+
+def draw_domains(commands):
+    '''Draw the vertex lists of a sequence of domains.
+
+    This is equivalent to calling ``domain.draw(mode)`` for each
+    ``(domain, mode, None)`` in `commands`, or ``vertex_list.draw(mode)`` for
+    each vertex list in ``(domain, mode, vertex_lists)``, but avoids
+    redundant state changes between the domains: client arrays are only
+    enabled when they differ from those of the previous domain, and buffers
+    are not unbound between domains that use buffer objects.  The vertex
+    lists of each domain are drawn with a single ``glMultiDrawArrays`` or
+    ``glMultiDrawElements`` call, if supported.
+
+    :Parameters:
+        `commands` : sequence of (`VertexDomain`, int, list)
+            Domains to draw, the OpenGL drawing mode of each, and the vertex
+            lists of the domain to draw, or None to draw all of them.
+
+    '''
+    glPushClientAttrib(GL_CLIENT_VERTEX_ARRAY_BIT)
+    client_state = None
+    vbo_bound = False
+    for i, (domain, mode, vertex_lists) in enumerate(commands):
+        enable = (i == 0 or domain._client_state is None or
+                  domain._client_state != client_state)
+        if enable and i:
+            # Disable the previous domain's arrays.
+            glPopClientAttrib()
+            glPushClientAttrib(GL_CLIENT_VERTEX_ARRAY_BIT)
+        client_state = domain._client_state
+
+        if vbo_bound and domain._has_client_buffer:
+            # Pointers into system memory are only valid with no buffer
+            # object bound.
+            _unbind_buffer_objects()
+            vbo_bound = False
+        domain._bind(enable)
+        vbo_bound = vbo_bound or domain._has_vbo
+        if vertexbuffer._workaround_vbo_finish:
+            glFinish()
+
+        if vertex_lists is None:
+            domain._draw(mode)
+        else:
+            domain._draw_lists(mode, vertex_lists)
+
+    if vbo_bound:
+        _unbind_buffer_objects()
+    glPopClientAttrib()
+
+def _unbind_buffer_objects():
+    glBindBuffer(GL_ARRAY_BUFFER, 0)
+    glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+
 def create_domain(*attribute_usage_formats):
     '''Create a vertex domain covering the given attribute usage formats.
     See documentation for `create_attribute_usage` and
@@ -134,6 +389,18 @@ def create_domain(*attribute_usage_formats):
                         for f in attribute_usage_formats]
     return VertexDomain(attribute_usages)
 
+def create_quad_domain(*attribute_usage_formats):
+    '''Create a quad domain covering the given attribute usage formats.
+    See documentation for `create_attribute_usage` and
+    `pyglet.graphics.vertexattribute.create_attribute` for the grammar of
+    these format strings.
+
+    :rtype: `QuadDomain`
+    '''
+    attribute_usages = [create_attribute_usage(f) \
+                        for f in attribute_usage_formats]
+    return QuadDomain(attribute_usages)
+
 def create_indexed_domain(*attribute_usage_formats):
     '''Create an indexed vertex domain covering the given attribute usage
     formats.  See documentation for `create_attribute_usage` and
@@ -146,17 +413,101 @@ def create_indexed_domain(*attribute_usage_formats):
                         for f in attribute_usage_formats]
     return IndexedVertexDomain(attribute_usages)
 
+class QuadIndexBuffer(object):
+    '''Static buffer of indices that draw consecutive quads as
+    ``GL_TRIANGLES``.
+
+    The indices of quad ``i`` are ``4i, 4i + 1, 4i + 2, 4i, 4i + 2, 4i + 3``,
+    so the quad starting at vertex ``start`` (a multiple of 4) is drawn by
+    the 6 indices starting at index ``start // 4 * 6``.  The buffer is grown
+    as required by `reserve`, and never shrinks.
+
+    Use `get_quad_index_buffer` to get the buffer shared by the current
+    context.
+    '''
+    gl_type = GL_UNSIGNED_INT
+    element_size = ctypes.sizeof(GLuint)
+
+    def __init__(self):
+        #: Number of vertices the indices cover.
+        #:
+        #: :type: int
+        self.capacity = 0
+
+        #: Buffer of indices, or None if no indices have been reserved.
+        #:
+        #: :type: `AbstractBuffer`
+        self.buffer = None
+
+    def reserve(self, count):
+        '''Ensure that the indices cover at least `count` vertices.
+
+        The buffer is recreated when it grows, so `buffer` must be fetched
+        again afterwards.
+
+        :Parameters:
+            `count` : int
+                Number of vertices.
+
+        '''
+        if count <= self.capacity:
+            return
+        quads = _nearest_pow2((count + 3) // 4)
+        indices = (GLuint * (quads * 6))()
+        indices[:] = [4 * q + i for q in xrange(quads)
+                                for i in (0, 1, 2, 0, 2, 3)]
+        buffer = vertexbuffer.create_buffer(ctypes.sizeof(indices),
+                                            target=GL_ELEMENT_ARRAY_BUFFER,
+                                            usage=GL_STATIC_DRAW)
+        buffer.set_data(indices)
+        if self.buffer is not None:
+            self.buffer.delete()
+        self.buffer = buffer
+        self.capacity = quads * 4
+
+def get_quad_index_buffer():
+    '''Get the `QuadIndexBuffer` shared by the current context, and the
+    contexts sharing its objects.
+
+    :rtype: `QuadIndexBuffer`
+    '''
+    object_space = pyglet.gl.current_context.object_space
+    try:
+        return object_space.pyglet_graphics_quad_index_buffer
+    except AttributeError:
+        object_space.pyglet_graphics_quad_index_buffer = QuadIndexBuffer()
+        return object_space.pyglet_graphics_quad_index_buffer
+
 class VertexDomain(object):
     '''Management of a set of vertex lists.
 
     Construction of a vertex domain is usually done with the `create_domain`
     function.
+
+    The class used to allocate vertices within the domain's buffers is given
+    by the ``graphics_allocator`` option (see `pyglet.options`), and can be
+    overridden per subclass with the `allocator_class` attribute.
     '''
     _version = 0
     _initial_count = 16
 
+    #: Class used to allocate regions of the domain's buffers; one of the
+    #: classes in `pyglet.graphics.allocation`.
+    allocator_class = _allocator_class
+
     def __init__(self, attribute_usages):
-        self.allocator = allocation.Allocator(self._initial_count)
+        self.allocator = self.allocator_class(self._initial_count)
+
+        # Live vertex lists, required to relocate them in `compact`.
+        self._vertex_lists = set()
+
+        # Set when space is freed; cleared by `compact` and by
+        # `Batch._auto_compact` once it has been checked.
+        self._freed = False
+
+        # Arguments for drawing every allocated region, built by
+        # `_get_draw_regions`; reset to None whenever an allocation changes.
+        self._draw_regions = None
 
         # If there are any MultiTexCoord attributes, then a TexCoord attribute
         # must be converted.
@@ -231,6 +582,28 @@ class VertexDomain(object):
                     'More than one "%s" attribute given' % name
                 self.attribute_names[name] = attribute
 
+        # Identifies the client arrays enabled by `_bind`, so that
+        # `draw_domains` need only enable them once for consecutive domains
+        # with the same arrays.  None if they must always be enabled, as
+        # enabling multiple texture coordinates changes the client active
+        # texture.
+        if have_multi_texcoord:
+            self._client_state = None
+        else:
+            self._client_state = frozenset(
+                (attribute.__class__, getattr(attribute, 'index', None))
+                for attribute in attributes)
+        self._has_vbo = False
+        self._has_client_buffer = False
+        for buffer, _ in self.buffer_attributes:
+            self._check_buffer(buffer)
+
+    def _check_buffer(self, buffer):
+        if isinstance(buffer, vertexbuffer.VertexBufferObject):
+            self._has_vbo = True
+        else:
+            self._has_client_buffer = True
+
     def __del__(self):
         # Break circular refs that Python GC seems to miss even when forced
         # collection.
@@ -242,6 +615,7 @@ class VertexDomain(object):
 
     def _safe_alloc(self, count):
         '''Allocate vertices, resizing the buffers if necessary.'''
+        self._draw_regions = None
         try:
             return self.allocator.alloc(count)
         except allocation.AllocatorMemoryException, e:
@@ -254,6 +628,7 @@ class VertexDomain(object):
 
     def _safe_realloc(self, start, count, new_count):
         '''Reallocate vertices, resizing the buffers if necessary.'''
+        self._draw_regions = None
         try:
             return self.allocator.realloc(start, count, new_count)
         except allocation.AllocatorMemoryException, e:
@@ -274,7 +649,74 @@ class VertexDomain(object):
         :rtype: `VertexList`
         '''
         start = self._safe_alloc(count)
-        return VertexList(self, start, count)
+        vertex_list = VertexList(self, start, count)
+        self._vertex_lists.add(vertex_list)
+        return vertex_list
+
+    def create_many(self, count, n):
+        '''Create several equally sized `VertexList` objects in this domain.
+
+        The vertex lists are allocated in one contiguous region, in order, so
+        that their attribute data can be set with a single operation.
+
+        :Parameters:
+            `count` : int
+                Number of vertices in each list.
+            `n` : int
+                Number of vertex lists to create.
+
+        :rtype: list of `VertexList`
+        '''
+        start = self._safe_alloc(count * n)
+        vertex_lists = [VertexList(self, start + i * count, count)
+                        for i in range(n)]
+        self._vertex_lists.update(vertex_lists)
+        return vertex_lists
+
+    def compact(self):
+        '''Move all vertex lists in this domain toward the start of its
+        buffers, removing the free space between them, and shrink the buffers
+        to fit.
+
+        The ``start`` of each vertex list is updated.  Arrays previously
+        obtained from the vertex lists' attribute properties (for example,
+        ``vertex_list.vertices``) are invalidated and must be fetched again.
+        '''
+        vertex_lists = sorted(self._vertex_lists, key=lambda v: v.start)
+        runs, count = _get_compaction_runs(
+            [(v.start, v.count) for v in vertex_lists])
+        for buffer, _ in self.buffer_attributes:
+            _move_buffer_data(buffer, buffer.element_size, runs)
+
+        start = 0
+        for vertex_list in vertex_lists:
+            vertex_list.start = start
+            start += vertex_list.count
+
+        capacity = max(self._initial_count, _nearest_pow2(count))
+        if capacity < self.allocator.capacity:
+            for buffer, _ in self.buffer_attributes:
+                buffer.resize(capacity * buffer.element_size)
+        else:
+            capacity = self.allocator.capacity
+        self.allocator = self.allocator_class(capacity)
+        self.allocator.alloc(count)
+
+        self._version += 1
+        self._freed = False
+        self._draw_regions = None
+
+    def _needs_compact(self, threshold):
+        '''Determine if the domain should be compacted: either the
+        fragmentation of its free space exceeds `threshold`, or less than a
+        quarter of its capacity is in use.
+        '''
+        allocator = self.allocator
+        if allocator._is_empty():
+            return False
+        return (allocator.get_fragmentation() > threshold or
+                (allocator.capacity > self._initial_count and
+                 allocator.get_usage() < .25))
 
     def draw(self, mode, vertex_list=None):
         '''Draw vertices in the domain.
@@ -293,38 +735,109 @@ class VertexDomain(object):
 
         '''
         glPushClientAttrib(GL_CLIENT_VERTEX_ARRAY_BIT)
-        for buffer, attributes in self.buffer_attributes:
-            buffer.bind()
-            for attribute in attributes:
-                attribute.enable()
-                attribute.set_pointer(attribute.buffer.ptr)
+        self._bind(True)
         if vertexbuffer._workaround_vbo_finish:
             glFinish()
 
         if vertex_list is not None:
             glDrawArrays(mode, vertex_list.start, vertex_list.count)
         else:
-            starts, sizes = self.allocator.get_allocated_regions()
-            primcount = len(starts)
-            if primcount == 0:
-                pass
-            elif primcount == 1:
-                # Common case
-                glDrawArrays(mode, starts[0], sizes[0])
-            elif gl_info.have_version(1, 4):
-                starts = (GLint * primcount)(*starts)
-                sizes = (GLsizei * primcount)(*sizes)
-                glMultiDrawArrays(mode, starts, sizes, primcount)
-            else:
-                for start, size in zip(starts, sizes):
-                    glDrawArrays(mode, start, size)
+            self._draw(mode)
 
+        self._unbind()
+        glPopClientAttrib()
+
+    def _bind(self, enable):
+        '''Bind the buffers of the domain and point the client arrays at
+        them, enabling the arrays if `enable` is True.
+        '''
+        for buffer, attributes in self.buffer_attributes:
+            buffer.bind()
+            for attribute in attributes:
+                if enable:
+                    attribute.enable()
+                attribute.set_pointer(attribute.buffer.ptr)
+
+    def _unbind(self):
         for buffer, _ in self.buffer_attributes:
             buffer.unbind()
-        glPopClientAttrib()
+
+    def _get_draw_regions(self):
+        '''Get ``(primcount, starts, sizes, multi)`` for drawing every
+        allocated region, where `multi` is True if the regions can be drawn
+        with a single ``glMultiDrawArrays`` call.  The result is cached until
+        an allocation changes.
+        '''
+        if self._draw_regions is None:
+            starts, sizes = self.allocator.get_allocated_regions()
+            primcount = len(starts)
+            self._draw_regions = (primcount,
+                                  (GLint * primcount)(*starts),
+                                  (GLsizei * primcount)(*sizes),
+                                  gl_info.have_version(1, 4))
+        return self._draw_regions
+
+    def _draw(self, mode):
+        '''Draw every allocated region; the domain must be bound.'''
+        primcount, starts, sizes, multi = self._get_draw_regions()
+        if primcount == 0:
+            pass
+        elif primcount == 1:
+            # Common case
+            glDrawArrays(mode, starts[0], sizes[0])
+        elif multi:
+            glMultiDrawArrays(mode, starts, sizes, primcount)
+        else:
+            for start, size in zip(starts, sizes):
+                glDrawArrays(mode, start, size)
+
+    def _draw_lists(self, mode, vertex_lists):
+        '''Draw some vertex lists of the domain; the domain must be bound.
+        The vertex lists are drawn in the order of their vertices.'''
+        ranges = _get_draw_ranges(mode,
+            [(v.start, v.count) for v in vertex_lists])
+        primcount = len(ranges)
+        if primcount == 1:
+            glDrawArrays(mode, *ranges[0])
+        elif gl_info.have_version(1, 4):
+            starts, sizes = zip(*ranges)
+            glMultiDrawArrays(mode, (GLint * primcount)(*starts),
+                              (GLsizei * primcount)(*sizes), primcount)
+        else:
+            for start, count in ranges:
+                glDrawArrays(mode, start, count)
+
+    def get_attribute_array(self, name):
+        '''Get a view of one attribute's data for every vertex in the domain,
+        without copying.
+
+        The view covers the whole capacity of the domain, including
+        unallocated vertices; use ``allocator.get_allocated_regions`` or the
+        ``start`` and ``count`` of each vertex list to find the vertices in
+        use.  This allows all vertex lists in the domain to be updated with
+        a single vectorised operation.  See
+        `pyglet.graphics.vertexattribute.AbstractAttribute.get_view` for the
+        type of the returned view.
+
+        The buffer is marked as modified when this method is called; the
+        view should be fetched again for each update.  The view becomes
+        invalid when the domain is resized or compacted.
+
+        :Parameters:
+            `name` : str
+                Name of the attribute; for example, ``"vertices"`` or
+                ``"colors"``.
+
+        :rtype: NumPy array or sequence
+        '''
+        attribute = self.attribute_names[name]
+        region = attribute.get_view(attribute.buffer, 0,
+                                    self.allocator.capacity)
+        region.invalidate()
+        return region.array
 
     def _is_empty(self):
-        return not self.allocator.starts
+        return self.allocator._is_empty()
 
     def __repr__(self):
         return '<%s@%x %s>' % (self.__class__.__name__, id(self),
@@ -374,6 +887,8 @@ class VertexList(object):
 
         '''
         new_start = self.domain._safe_realloc(self.start, self.count, count)
+        if count < self.count or new_start != self.start:
+            self.domain._freed = True
         if new_start != self.start:
             # Copy contents to new location
             for attribute in self.domain.attributes:
@@ -397,6 +912,9 @@ class VertexList(object):
     def delete(self):
         '''Delete this group.'''
         self.domain.allocator.dealloc(self.start, self.count)
+        self.domain._vertex_lists.discard(self)
+        self.domain._freed = True
+        self.domain._draw_regions = None
 
     def migrate(self, domain):
         '''Move this group from its current domain and add to the specified
@@ -422,8 +940,12 @@ class VertexList(object):
             new.invalidate()
 
         self.domain.allocator.dealloc(self.start, self.count)
+        self.domain._vertex_lists.discard(self)
+        self.domain._freed = True
+        self.domain._draw_regions = None
         self.domain = domain
         self.start = new_start
+        domain._vertex_lists.add(self)
 
         self._colors_cache_version = None
         self._fog_coords_cache_version = None
@@ -433,6 +955,33 @@ class VertexList(object):
         self._tex_coords_cache_version = None
         self._vertices_cache_version = None
 
+    def get_attribute_view(self, name):
+        '''Get a view of one attribute's data in this vertex list, without
+        copying.
+
+        Unlike the attribute properties (for example, `vertices`), which
+        return ctypes arrays, the view shares memory with the buffer and
+        understands interleaved layouts.  If NumPy is available it is a
+        NumPy array of shape ``(count, components)``; otherwise it is a
+        flat sequence of ``count * components`` typed values.
+
+        The region is marked as modified when this method is called; the
+        view should be fetched again for each update.  The view becomes
+        invalid when the vertex list is resized or migrated, or its domain
+        is resized or compacted.
+
+        :Parameters:
+            `name` : str
+                Name of the attribute; for example, ``"vertices"`` or
+                ``"colors"``.
+
+        :rtype: NumPy array or sequence
+        '''
+        attribute = self.domain.attribute_names[name]
+        region = attribute.get_view(attribute.buffer, self.start, self.count)
+        region.invalidate()
+        return region.array
+
     def _set_attribute_data(self, i, data):
         attribute = self.domain.attributes[i]
         # TODO without region
@@ -596,6 +1145,129 @@ class VertexList(object):
     vertices = property(_get_vertices, _set_vertices,
                         doc='''Array of vertex coordinate data.''')
 
+class QuadDomain(VertexDomain):
+    '''Management of a set of vertex lists of quads, drawn as triangles.
+
+    Vertex lists are created as for `VertexDomain`, but the number of
+    vertices of each must be a multiple of 4; every 4 vertices give the
+    corners of a quad, as with ``GL_QUADS``.  The quads are drawn with
+    ``GL_TRIANGLES``, indexed by the `QuadIndexBuffer` shared by the
+    context, so no vertices are duplicated and ``GL_QUADS`` is not required.
+    The mode given to `draw` is ignored.
+
+    Construction of a quad domain is usually done with the
+    `create_quad_domain` function, or by a batch with
+    ``quads_as_triangles`` set (see `pyglet.graphics.Batch`).
+    '''
+
+    # Index buffer used by the cached draw regions.
+    _draw_regions_buffer = None
+
+    def create(self, count):
+        assert count % 4 == 0, 'Quad vertex lists need a multiple of 4 vertices'
+        return super(QuadDomain, self).create(count)
+
+    def create_many(self, count, n):
+        assert count % 4 == 0, 'Quad vertex lists need a multiple of 4 vertices'
+        return super(QuadDomain, self).create_many(count, n)
+
+    def draw(self, mode, vertex_list=None):
+        '''Draw vertices in the domain.
+
+        If `vertex_list` is not specified, all vertices in the domain are
+        drawn.  This is the most efficient way to render primitives.
+
+        If `vertex_list` specifies a `VertexList`, only primitives in that
+        list will be drawn.
+
+        :Parameters:
+            `mode` : int
+                Ignored; the quads are always drawn as ``GL_TRIANGLES``.
+            `vertex_list` : `VertexList`
+                Vertex list to draw, or ``None`` for all lists in this domain.
+
+        '''
+        glPushClientAttrib(GL_CLIENT_VERTEX_ARRAY_BIT)
+        self._bind(True)
+        if vertexbuffer._workaround_vbo_finish:
+            glFinish()
+
+        if vertex_list is not None:
+            self._draw_lists(mode, [vertex_list])
+        else:
+            self._draw(mode)
+
+        self._unbind()
+        glPopClientAttrib()
+
+    def _bind(self, enable):
+        super(QuadDomain, self)._bind(enable)
+        self._quad_indices = get_quad_index_buffer()
+        self._quad_indices.reserve(self.allocator.capacity)
+        self._check_buffer(self._quad_indices.buffer)
+        self._quad_indices.buffer.bind()
+
+    def _unbind(self):
+        self._quad_indices.buffer.unbind()
+        super(QuadDomain, self)._unbind()
+
+    def _get_draw_regions(self):
+        buffer = self._quad_indices.buffer
+        if (self._draw_regions is None or
+            self._draw_regions_buffer is not buffer):
+            starts, sizes = self.allocator.get_allocated_regions()
+            primcount = len(starts)
+            # Byte offsets of the indices of each region's first quad
+            element_size = self._quad_indices.element_size
+            starts = [s // 4 * 6 * element_size + buffer.ptr for s in starts]
+            sizes = [s // 4 * 6 for s in sizes]
+            self._draw_regions = (primcount,
+                                  (ctypes.c_void_p * primcount)(*starts),
+                                  (GLsizei * primcount)(*sizes),
+                                  gl_info.have_version(1, 4))
+            self._draw_regions_buffer = buffer
+        return self._draw_regions
+
+    def _draw(self, mode):
+        primcount, starts, sizes, multi = self._get_draw_regions()
+        gl_type = self._quad_indices.gl_type
+        if primcount == 0:
+            pass
+        elif primcount == 1:
+            # Common case
+            glDrawElements(GL_TRIANGLES, sizes[0], gl_type, starts[0])
+        elif multi:
+            glMultiDrawElements(GL_TRIANGLES, sizes, gl_type,
+                ctypes.cast(starts, ctypes.POINTER(ctypes.c_void_p)),
+                primcount)
+        else:
+            for start, size in zip(starts, sizes):
+                glDrawElements(GL_TRIANGLES, size, gl_type, start)
+
+    def _draw_lists(self, mode, vertex_lists):
+        ranges = _get_draw_ranges(GL_QUADS,
+            [(v.start, v.count) for v in vertex_lists])
+        primcount = len(ranges)
+        gl_type = self._quad_indices.gl_type
+        element_size = self._quad_indices.element_size
+        ptr = self._quad_indices.buffer.ptr
+        if primcount == 1:
+            start, count = ranges[0]
+            glDrawElements(GL_TRIANGLES, count // 4 * 6, gl_type,
+                           ptr + start // 4 * 6 * element_size)
+        elif gl_info.have_version(1, 4):
+            starts = (ctypes.c_void_p * primcount)(
+                *[ptr + start // 4 * 6 * element_size for start, _ in ranges])
+            sizes = (GLsizei * primcount)(
+                *[count // 4 * 6 for _, count in ranges])
+            glMultiDrawElements(GL_TRIANGLES, sizes, gl_type,
+                ctypes.cast(starts, ctypes.POINTER(ctypes.c_void_p)),
+                primcount)
+        else:
+            for start, count in ranges:
+                glDrawElements(GL_TRIANGLES, count // 4 * 6, gl_type,
+                               ptr + start // 4 * 6 * element_size)
+
 class IndexedVertexDomain(VertexDomain):
     '''Management of a set of indexed vertex lists.
 
@@ -607,7 +1279,7 @@ class IndexedVertexDomain(VertexDomain):
     def __init__(self, attribute_usages, index_gl_type=GL_UNSIGNED_INT):
         super(IndexedVertexDomain, self).__init__(attribute_usages)
 
-        self.index_allocator = allocation.Allocator(self._initial_index_count)
+        self.index_allocator = self.allocator_class(self._initial_index_count)
 
         self.index_gl_type = index_gl_type
         self.index_c_type = vertexattribute._c_types[index_gl_type]
@@ -615,9 +1287,11 @@ class IndexedVertexDomain(VertexDomain):
         self.index_buffer = vertexbuffer.create_mappable_buffer(
             self.index_allocator.capacity * self.index_element_size,
             target=GL_ELEMENT_ARRAY_BUFFER)
+        self._check_buffer(self.index_buffer)
 
     def _safe_index_alloc(self, count):
         '''Allocate indices, resizing the buffers if necessary.'''
+        self._draw_regions = None
         try:
             return self.index_allocator.alloc(count)
         except allocation.AllocatorMemoryException, e:
@@ -629,6 +1303,7 @@ class IndexedVertexDomain(VertexDomain):
 
     def _safe_index_realloc(self, start, count, new_count):
         '''Reallocate indices, resizing the buffers if necessary.'''
+        self._draw_regions = None
         try:
             return self.index_allocator.realloc(start, count, new_count)
         except allocation.AllocatorMemoryException, e:
@@ -650,7 +1325,47 @@ class IndexedVertexDomain(VertexDomain):
         '''
         start = self._safe_alloc(count)
         index_start = self._safe_index_alloc(index_count)
-        return IndexedVertexList(self, start, count, index_start, index_count)
+        vertex_list = IndexedVertexList(self, start, count,
+                                        index_start, index_count)
+        self._vertex_lists.add(vertex_list)
+        return vertex_list
+
+    def compact(self):
+        '''Move all vertex lists in this domain toward the start of its
+        buffers and shrink the buffers to fit.
+
+        Both the vertex and index buffers are compacted.  Indices of vertex
+        lists whose vertices moved are adjusted by the same offset.
+        '''
+        old_starts = [(v, v.start) for v in self._vertex_lists]
+        super(IndexedVertexDomain, self).compact()
+
+        vertex_lists = sorted(self._vertex_lists, key=lambda v: v.index_start)
+        runs, count = _get_compaction_runs(
+            [(v.index_start, v.index_count) for v in vertex_lists])
+        _move_buffer_data(self.index_buffer, self.index_element_size, runs)
+
+        index_start = 0
+        for vertex_list in vertex_lists:
+            vertex_list.index_start = index_start
+            index_start += vertex_list.index_count
+
+        for vertex_list, old_start in old_starts:
+            diff = vertex_list.start - old_start
+            if diff and vertex_list.index_count:
+                region = self.get_index_region(vertex_list.index_start,
+                                               vertex_list.index_count)
+                region.array[:] = [i + diff for i in region.array]
+                region.invalidate()
+
+        capacity = max(self._initial_index_count, _nearest_pow2(count))
+        if capacity < self.index_allocator.capacity:
+            self.index_buffer.resize(capacity * self.index_element_size)
+        else:
+            capacity = self.index_allocator.capacity
+        self.index_allocator = self.allocator_class(capacity)
+        self.index_allocator.alloc(count)
+        self._draw_regions = None
 
     def get_index_region(self, start, count):
         '''Get a region of the index buffer.
@@ -685,12 +1400,7 @@ class IndexedVertexDomain(VertexDomain):
 
         '''
         glPushClientAttrib(GL_CLIENT_VERTEX_ARRAY_BIT)
-        for buffer, attributes in self.buffer_attributes:
-            buffer.bind()
-            for attribute in attributes:
-                attribute.enable()
-                attribute.set_pointer(attribute.buffer.ptr)
-        self.index_buffer.bind()
+        self._bind(True)
         if vertexbuffer._workaround_vbo_finish:
             glFinish()
 
@@ -699,31 +1409,69 @@ class IndexedVertexDomain(VertexDomain):
                 self.index_buffer.ptr +
                     vertex_list.index_start * self.index_element_size)
         else:
-            starts, sizes = self.index_allocator.get_allocated_regions()
-            primcount = len(starts)
-            if primcount == 0:
-                pass
-            elif primcount == 1:
-                # Common case
-                glDrawElements(mode, sizes[0], self.index_gl_type,
-                    self.index_buffer.ptr + starts[0])
-            elif gl_info.have_version(1, 4):
-                starts = [s * self.index_element_size + self.index_buffer.ptr for s in starts]
-                starts = ctypes.cast((GLuint * primcount)(*starts), ctypes.POINTER(ctypes.c_void_p))
-                sizes = (GLsizei * primcount)(*sizes)
-                glMultiDrawElements(mode, sizes, GL_UNSIGNED_INT, starts,
-                                    primcount)
-            else:
-                for start, size in zip(starts, sizes):
-                    glDrawElements(mode, size, self.index_gl_type,
-                        self.index_buffer.ptr +
-                            start * self.index_element_size)
+            self._draw(mode)
 
-        self.index_buffer.unbind()
-        for buffer, _ in self.buffer_attributes:
-            buffer.unbind()
+        self._unbind()
         glPopClientAttrib()
 
+    def _bind(self, enable):
+        super(IndexedVertexDomain, self)._bind(enable)
+        self.index_buffer.bind()
+
+    def _unbind(self):
+        self.index_buffer.unbind()
+        super(IndexedVertexDomain, self)._unbind()
+
+    def _get_draw_regions(self):
+        if self._draw_regions is None:
+            starts, sizes = self.index_allocator.get_allocated_regions()
+            primcount = len(starts)
+            # Byte offsets into the index buffer
+            starts = [s * self.index_element_size + self.index_buffer.ptr
+                      for s in starts]
+            self._draw_regions = (primcount,
+                                  (ctypes.c_void_p * primcount)(*starts),
+                                  (GLsizei * primcount)(*sizes),
+                                  gl_info.have_version(1, 4))
+        return self._draw_regions
+
+    def _draw(self, mode):
+        primcount, starts, sizes, multi = self._get_draw_regions()
+        if primcount == 0:
+            pass
+        elif primcount == 1:
+            # Common case
+            glDrawElements(mode, sizes[0], self.index_gl_type, starts[0])
+        elif multi:
+            glMultiDrawElements(mode, sizes, self.index_gl_type,
+                ctypes.cast(starts, ctypes.POINTER(ctypes.c_void_p)),
+                primcount)
+        else:
+            for start, size in zip(starts, sizes):
+                glDrawElements(mode, size, self.index_gl_type, start)
+
+    def _draw_lists(self, mode, vertex_lists):
+        ranges = _get_draw_ranges(mode,
+            [(v.index_start, v.index_count) for v in vertex_lists])
+        primcount = len(ranges)
+        element_size = self.index_element_size
+        ptr = self.index_buffer.ptr
+        if primcount == 1:
+            start, count = ranges[0]
+            glDrawElements(mode, count, self.index_gl_type,
+                           ptr + start * element_size)
+        elif gl_info.have_version(1, 4):
+            starts = (ctypes.c_void_p * primcount)(
+                *[ptr + start * element_size for start, _ in ranges])
+            sizes = (GLsizei * primcount)(*[count for _, count in ranges])
+            glMultiDrawElements(mode, sizes, self.index_gl_type,
+                ctypes.cast(starts, ctypes.POINTER(ctypes.c_void_p)),
+                primcount)
+        else:
+            for start, count in ranges:
+                glDrawElements(mode, count, self.index_gl_type,
+                               ptr + start * element_size)
+
 class IndexedVertexList(VertexList):
     '''A list of vertices within an `IndexedVertexDomain` that are indexed.
     Use `IndexedVertexDomain.create` to construct this list.
@@ -773,6 +1521,7 @@ class IndexedVertexList(VertexList):
         '''Delete this group.'''
         super(IndexedVertexList, self).delete()
         self.domain.index_allocator.dealloc(self.index_start, self.index_count)
+        self.domain._draw_regions = None
 
     def _set_index_data(self, data):
         # TODO without region
@@ -87,16 +87,68 @@ however a sprite can belong to at most one batch.  See the documentation for
 `pyglet.graphics` for more details on batched rendering, and grouping of
 sprites within batches.
 
+Each change to a sprite's position, rotation or scale recomputes its
+vertices.  Use `Sprite.update` to change several of these at once, or set
+the batch's ``defer_updates`` attribute to recompute the vertices of each
+changed sprite only once, when the batch is next drawn::
+
+    batch.defer_updates = True
+
+Drawing many sprites
+====================
+
+Each `Sprite` is an individual object with its own vertex list, and
+updates its vertices whenever one of its properties is changed.  When
+tens of thousands of sprites displaying the same texture are updated every
+frame, a `SpriteSystem` is much faster.  Its sprites are identified by
+integer indices, and their properties are stored in arrays which are
+modified directly.  The vertices of all sprites are then computed together
+by `SpriteSystem.update`, using NumPy if it is available::
+
+    balls = pyglet.sprite.SpriteSystem(ball_image, batch=batch)
+    for i in range(10000):
+        balls.add(x=i % 100 * 10, y=i // 100 * 10)
+
+    def update(dt):
+        for i in range(len(balls)):
+            balls.y[i] -= 10 * dt
+        balls.update()
+
+To move many individual sprites at once, use `set_positions` or
+`translate`, which write the vertices of the sprites sharing a vertex
+domain together::
+
+    pyglet.sprite.translate(units, 5, 0)
+
+When the scene is much larger than the window, enable culling on the batch
+before adding sprites to it.  Sprites then keep their bounds up to date in
+the batch, and only those overlapping the viewport given to `Batch.draw`
+are drawn::
+
+    batch.enable_culling()
+    ...
+    batch.draw(viewport=(scroll_x, scroll_y, window.width, window.height))
+
 :since: pyglet 1.1
 '''
 
 __docformat__ = 'restructuredtext'
 __version__ = '$Id$'
 
+import array
+import bisect
+import ctypes
 import math
 import sys
+import weakref
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 from pyglet.gl import *
+from pyglet.gl import gl_info
 from pyglet import clock
 from pyglet import event
 from pyglet import graphics
@@ -104,6 +156,213 @@ from pyglet import image
 
 _is_epydoc = hasattr(sys, 'is_epydoc') and sys.is_epydoc
 
+# Compiled vertex format for each vertex type, texture coordinate type and
+# usage hint.
+_vertex_formats = {}
+
+def _get_vertex_format(vertex_type, tex_coord_type, usage):
+    key = vertex_type, tex_coord_type, usage
+    try:
+        return _vertex_formats[key]
+    except KeyError:
+        vertex_format = graphics.vertexdomain.VertexFormat(
+            '%s/%s' % (vertex_type, usage), 'c4B', tex_coord_type)
+        _vertex_formats[key] = vertex_format
+        return vertex_format
+
+def _get_tex_coords(texture, tex_coord_type):
+    # Texture coordinates of the corners of `texture` with the given number
+    # of components.
+    tex_coords = texture.tex_coords
+    if tex_coord_type == 't2f':
+        assert texture.target != GL_TEXTURE_3D, \
+            'Sprites of 3D textures require t3f texture coordinates'
+        return (tex_coords[0], tex_coords[1], tex_coords[3], tex_coords[4],
+                tex_coords[6], tex_coords[7], tex_coords[9], tex_coords[10])
+    return tex_coords
+
+class _AnimationTimeline(object):
+    '''Frame timing of an `image.Animation`, precomputed for frame lookup.'''
+    def __init__(self, animation):
+        self.textures = [frame.image.get_texture()
+                         for frame in animation.frames]
+
+        # Texture coordinates of each frame, by texture coordinate type, so
+        # that a frame change copies a prepared tuple into each sprite.
+        self.tex_coords = {}
+        for tex_coord_type in ('t2f', 't3f'):
+            if (tex_coord_type == 't2f' and
+                GL_TEXTURE_3D in [t.target for t in self.textures]):
+                continue
+            self.tex_coords[tex_coord_type] = \
+                [_get_tex_coords(t, tex_coord_type) for t in self.textures]
+
+        # Time at which each frame ends, up to the first frame with no
+        # duration, which ends the animation.
+        self.ends = []
+        self.stop = None
+        t = 0
+        for i, frame in enumerate(animation.frames):
+            if frame.duration is None:
+                self.stop = i
+                break
+            t += frame.duration
+            self.ends.append(t)
+        self.duration = t
+
+    def get_frame_index(self, t):
+        '''Get the index of the frame displayed `t` seconds after the start
+        of the animation (or loop of the animation).'''
+        if self.stop is not None and t >= self.duration:
+            return self.stop
+        return bisect.bisect_right(self.ends, t)
+
+class _AnimationTrack(object):
+    '''Sprites displaying the same animation with the same phase.'''
+    def __init__(self, timeline, start):
+        self.timeline = timeline
+        self.start = start
+        self.loops = 0
+        self.frame_index = 0
+        self.sprites = []
+
+class _Animator(object):
+    '''Advances the animations of all animated sprites from a single clock
+    callback.
+
+    Sprites that start the same animation between two clock ticks share a
+    track: their frame is looked up once, and changed together.  The
+    callback is scheduled for the next frame change of any track, on the
+    default clock; if the default clock is changed, the callback moves to the
+    new default clock when it is next scheduled.
+    '''
+    def __init__(self):
+        self._timelines = weakref.WeakKeyDictionary()
+        self._tracks = []
+        # Tracks created since the last tick, by animation.
+        self._new_tracks = {}
+        self._next_ts = None
+        # The clock the callback is scheduled on.
+        self._clock = None
+
+    def _get_clock(self):
+        # The default clock, moving the callback and the tracks' start times
+        # from the previous default clock if it has changed.
+        clk = clock.get_default()
+        if clk is not self._clock:
+            if self._clock is not None:
+                self._clock.unschedule(self._tick)
+                offset = self._get_time(clk) - self._get_time(self._clock)
+                for track in self._tracks:
+                    track.start += offset
+            self._clock = clk
+            self._next_ts = None
+            if self._tracks:
+                # Bring the moved tracks up to date on the next tick.
+                self._next_ts = self._get_time(clk)
+                clk.schedule_once(self._tick, 0)
+        return clk
+
+    def _get_time(self, clk):
+        # The time from which clk.schedule_once measures its delay.
+        last_ts = clk.last_ts or clk.next_ts
+        ts = clk.time()
+        if ts - last_ts > 0.2:
+            return ts
+        return last_ts
+
+    def add(self, sprite, animation):
+        '''Start animating `sprite`, which displays the first frame of
+        `animation`.'''
+        track = self._new_tracks.get(animation)
+        if track is None:
+            try:
+                timeline = self._timelines[animation]
+            except KeyError:
+                timeline = _AnimationTimeline(animation)
+                self._timelines[animation] = timeline
+            if timeline.stop == 0 or not timeline.duration:
+                return # Not animated
+            track = _AnimationTrack(timeline,
+                                    self._get_time(self._get_clock()))
+            self._tracks.append(track)
+            self._new_tracks[animation] = track
+            self._schedule(track.start + timeline.ends[0])
+        track.sprites.append(sprite)
+        sprite._animation_track = track
+
+    def remove(self, sprite):
+        '''Stop animating `sprite`.'''
+        track = sprite._animation_track
+        if track is None:
+            return
+        sprite._animation_track = None
+        track.sprites.remove(sprite)
+        if not track.sprites:
+            self._tracks.remove(track)
+            for animation, new_track in self._new_tracks.items():
+                if new_track is track:
+                    del self._new_tracks[animation]
+            if not self._tracks:
+                self._clock.unschedule(self._tick)
+                self._next_ts = None
+
+    def _dispatch(self, track, event_type):
+        for sprite in list(track.sprites):
+            # The sprite may have been deleted by an earlier handler.
+            if sprite._animation_track is track:
+                sprite.dispatch_event(event_type)
+
+    def _schedule(self, next_ts):
+        clk = self._get_clock()
+        if self._next_ts is not None and self._next_ts <= next_ts:
+            return
+        clk.unschedule(self._tick)
+        clk.schedule_once(self._tick, max(0, next_ts - self._get_time(clk)))
+        self._next_ts = next_ts
+
+    def _tick(self, dt):
+        now = self._clock.last_ts
+        self._new_tracks.clear()
+        self._next_ts = None
+
+        next_ts = None
+        for track in list(self._tracks):
+            timeline = track.timeline
+            t = now - track.start
+            loops = int(t // timeline.duration)
+            if timeline.stop is None:
+                # Looping animation
+                t -= loops * timeline.duration
+                if loops > track.loops:
+                    track.loops = loops
+                    self._dispatch(track, 'on_animation_end')
+
+            index = timeline.get_frame_index(t)
+            if index != track.frame_index:
+                track.frame_index = index
+                texture = timeline.textures[index]
+                tex_coords = timeline.tex_coords
+                for sprite in list(track.sprites):
+                    if sprite._animation_track is track:
+                        sprite._set_frame(index, texture,
+                            tex_coords[sprite._tex_coord_type][index])
+
+            if index == timeline.stop:
+                self._dispatch(track, 'on_animation_end')
+                for sprite in list(track.sprites):
+                    self.remove(sprite)
+            elif track.sprites:
+                ts = track.start + loops * timeline.duration + \
+                    timeline.ends[index]
+                if next_ts is None or ts < next_ts:
+                    next_ts = ts
+
+        if next_ts is not None:
+            self._schedule(next_ts)
+
+_animator = _Animator()
+
 class SpriteGroup(graphics.Group):
     '''Shared sprite rendering group.
 
@@ -146,6 +405,10 @@ class SpriteGroup(graphics.Group):
         glPopAttrib()
         glDisable(self.texture.target)
 
+    def get_state(self):
+        return {'texture': (self.texture.target, self.texture.id),
+                'blend': (self.blend_src, self.blend_dest)}
+
     def __repr__(self):
         return '%s(%r)' % (self.__class__.__name__, self.texture)
 
@@ -162,6 +425,39 @@ class SpriteGroup(graphics.Group):
                      self.texture.id, self.texture.target,
                      self.blend_src, self.blend_dest))
 
+# Interned sprite groups, by (texture target, texture id, blend_src,
+# blend_dest, id(parent)).  The parent is kept alive by the group, so its id
+# is not reused while the group exists.
+_sprite_groups = weakref.WeakValueDictionary()
+
+def get_sprite_group(texture, blend_src, blend_dest, parent=None):
+    '''Get the shared `SpriteGroup` for the given texture, blend mode and
+    parent group.
+
+    Sprites created with the same parameters share one group object, rather
+    than each creating an equal group, so that the group is hashed and
+    compared only once when sprites are added to a batch, and changing the
+    frame of an animation within one texture does not create a group.
+
+    :Parameters:
+        `texture` : `Texture`
+            The (top-level) texture containing the sprite image.
+        `blend_src` : int
+            OpenGL blend source mode.
+        `blend_dest` : int
+            OpenGL blend destination mode.
+        `parent` : `Group`
+            Optional parent group.
+
+    :rtype: `SpriteGroup`
+    '''
+    key = (texture.target, texture.id, blend_src, blend_dest, id(parent))
+    group = _sprite_groups.get(key)
+    if group is None:
+        group = SpriteGroup(texture, blend_src, blend_dest, parent)
+        _sprite_groups[key] = group
+    return group
+
 class Sprite(event.EventDispatcher):
     '''Instance of an on-screen image.
 
@@ -169,10 +465,15 @@ class Sprite(event.EventDispatcher):
     '''
     _batch = None
     _animation = None
+    _animation_track = None
     _rotation = 0
     _opacity = 255
     _rgb = (255, 255, 255)
     _scale = 1.0
+    _scale_x = 1.0
+    _scale_y = 1.0
+    _z = 0.0
+    _quad = None
     _visible = True
     _vertex_list = None
 
@@ -182,7 +483,9 @@ class Sprite(event.EventDispatcher):
                  blend_dest=GL_ONE_MINUS_SRC_ALPHA,
                  batch=None,
                  group=None,
-                 usage='dynamic'):
+                 usage='dynamic',
+                 vertex_type='v2i',
+                 tex_coord_type='t3f'):
         '''Create a sprite.
 
         :Parameters:
@@ -206,8 +509,26 @@ class Sprite(event.EventDispatcher):
                 Vertex buffer object usage hint, one of ``"none"`` (default),
                 ``"stream"``, ``"dynamic"`` or ``"static"``.  Applies
                 only to vertex data.
+            `vertex_type` : str
+                Type of the sprite's vertices: ``"v2i"`` (the default)
+                rounds each corner to whole pixels; ``"v2f"`` allows
+                sprites to move smoothly by fractions of a pixel; ``"v3f"``
+                also gives each vertex the sprite's `z` coordinate, for use
+                with the depth buffer.  Sprites with different vertex types
+                are drawn separately.
+            `tex_coord_type` : str
+                Type of the sprite's texture coordinates: ``"t3f"`` (the
+                default) or ``"t2f"``.  Two-component texture coordinates
+                make each vertex smaller, and frame changes of animations
+                copy fewer values, but cannot be used with 3D textures
+                (such as the items of a `Texture3D`).  Sprites with
+                different texture coordinate types are drawn separately.
 
         '''
+        assert vertex_type in ('v2i', 'v2f', 'v3f'), \
+            'Unsupported vertex type %r' % vertex_type
+        assert tex_coord_type in ('t2f', 't3f'), \
+            'Unsupported texture coordinate type %r' % tex_coord_type
         if batch is not None:
             self._batch = batch
 
@@ -218,16 +539,20 @@ class Sprite(event.EventDispatcher):
             self._animation = img
             self._frame_index = 0
             self._texture = img.frames[0].image.get_texture()
-            self._next_dt = img.frames[0].duration
-            if self._next_dt:
-                clock.schedule_once(self._animate, self._next_dt)
         else:
             self._texture = img.get_texture()
 
-        self._group = SpriteGroup(self._texture, blend_src, blend_dest, group)
+        self._group = get_sprite_group(self._texture, blend_src, blend_dest,
+                                       group)
         self._usage = usage
+        self._vertex_type = vertex_type
+        self._tex_coord_type = tex_coord_type
+        self._update_quad()
         self._create_vertex_list()
 
+        if self._animation:
+            _animator.add(self, img)
+
     def __del__(self):
         try:
             if self._vertex_list is not None:
@@ -243,7 +568,9 @@ class Sprite(event.EventDispatcher):
         sprite is garbage.
         '''
         if self._animation:
-            clock.unschedule(self._animate)
+            _animator.remove(self)
+        if self._batch is not None:
+            self._batch.clear_bounds(self._vertex_list)
         self._vertex_list.delete()
         self._vertex_list = None
         self._texture = None
@@ -251,24 +578,11 @@ class Sprite(event.EventDispatcher):
         # Easy way to break circular reference, speeds up GC
         self._group = None
 
-    def _animate(self, dt):
-        self._frame_index += 1
-        if self._frame_index >= len(self._animation.frames):
-            self._frame_index = 0
-            self.dispatch_event('on_animation_end')
-            if self._vertex_list is None:
-                return # Deleted in event handler.
-
-        frame = self._animation.frames[self._frame_index]
-        self._set_texture(frame.image.get_texture())
-
-        if frame.duration is not None:
-            duration = frame.duration - (self._next_dt - dt)
-            duration = min(max(0, duration), frame.duration)
-            clock.schedule_once(self._animate, duration)
-            self._next_dt = duration
-        else:
-            self.dispatch_event('on_animation_end')
+    def _set_frame(self, index, texture, tex_coords):
+        # Called by the animator when the animation frame changes, with the
+        # texture coordinates of the frame from the animation's timeline.
+        self._frame_index = index
+        self._set_texture(texture, tex_coords)
 
     def _set_batch(self, batch):
         if self._batch == batch:
@@ -277,7 +591,12 @@ class Sprite(event.EventDispatcher):
         if batch is not None and self._batch is not None:
             self._batch.migrate(self._vertex_list, GL_QUADS, self._group, batch)
             self._batch = batch
+            # Updates deferred by the previous batch may not have been made.
+            self._update_position()
+            self._update_color()
         else:
+            if self._batch is not None:
+                self._batch.clear_bounds(self._vertex_list)
             self._vertex_list.delete()
             self._batch = batch
             self._create_vertex_list()
@@ -299,10 +618,10 @@ class Sprite(event.EventDispatcher):
         if self._group.parent == group:
             return
 
-        self._group = SpriteGroup(self._texture,
-                                  self._group.blend_src,
-                                  self._group.blend_dest,
-                                  group)
+        self._group = get_sprite_group(self._texture,
+                                       self._group.blend_src,
+                                       self._group.blend_dest,
+                                       group)
 
         if self._batch is not None:
             self._batch.migrate(self._vertex_list, GL_QUADS, self._group,
@@ -327,19 +646,16 @@ class Sprite(event.EventDispatcher):
 
     def _set_image(self, img):
         if self._animation is not None:
-            clock.unschedule(self._animate)
+            _animator.remove(self)
             self._animation = None
 
         if isinstance(img, image.Animation):
             self._animation = img
             self._frame_index = 0
             self._set_texture(img.frames[0].image.get_texture())
-            self._next_dt = img.frames[0].duration
-            if self._next_dt:
-                clock.schedule_once(self._animate, self._next_dt)
+            _animator.add(self, img)
         else:
             self._set_texture(img.get_texture())
-        self._update_position()
 
     image = property(_get_image, _set_image,
                      doc='''Image or animation to display.
@@ -347,76 +663,176 @@ class Sprite(event.EventDispatcher):
     :type: `AbstractImage` or `Animation`
     ''')
 
-    def _set_texture(self, texture):
-        if texture.id is not self._texture.id:
-            self._group = SpriteGroup(texture,
-                                      self._group.blend_src,
-                                      self._group.blend_dest,
-                                      self._group.parent)
-            if self._batch is None:
-                self._vertex_list.tex_coords[:] = texture.tex_coords
-            else:
-                self._vertex_list.delete()
-                self._texture = texture
-                self._create_vertex_list()
-        else:
-            self._vertex_list.tex_coords[:] = texture.tex_coords
+    def _set_texture(self, texture, tex_coords=None):
+        if tex_coords is None:
+            tex_coords = _get_tex_coords(texture, self._tex_coord_type)
+        if (texture.id != self._texture.id or
+            texture.target != self._texture.target):
+            self._group = get_sprite_group(texture,
+                                           self._group.blend_src,
+                                           self._group.blend_dest,
+                                           self._group.parent)
+            if self._batch is not None:
+                self._batch.migrate(self._vertex_list, GL_QUADS, self._group,
+                                    self._batch)
+        self._vertex_list.tex_coords[:] = tex_coords
         self._texture = texture
+        if self._update_quad():
+            self._update_position()
 
     def _create_vertex_list(self):
+        vertex_format = _get_vertex_format(self._vertex_type,
+                                           self._tex_coord_type, self._usage)
+        tex_coords = _get_tex_coords(self._texture, self._tex_coord_type)
         if self._batch is None:
             self._vertex_list = graphics.vertex_list(4,
-                'v2i/%s' % self._usage, 
-                'c4B', ('t3f', self._texture.tex_coords))
+                vertex_format, None, None, tex_coords)
         else:
             self._vertex_list = self._batch.add(4, GL_QUADS, self._group,
-                'v2i/%s' % self._usage, 
-                'c4B', ('t3f', self._texture.tex_coords))
+                vertex_format, None, None, tex_coords)
         self._update_position()
         self._update_color()
 
     def _update_position(self):
+        if self._batch is not None and self._batch.defer_updates:
+            self._batch.defer_update(self._flush_position)
+        else:
+            self._flush_position()
+
+    def _update_quad(self):
+        # Corners of the unscaled, unrotated image relative to its anchor.
+        # Returns True if they differ from the previous texture's.
         img = self._texture
+        quad = (-img.anchor_x, -img.anchor_y,
+                img.width - img.anchor_x, img.height - img.anchor_y)
+        if quad == self._quad:
+            return False
+        self._quad = quad
+        return True
+
+    def _flush_position(self):
+        if self._vertex_list is None:
+            return # Deleted since the update was deferred.
+
+        vertices, bounds = self._get_vertices()
+        self._vertex_list.vertices[:] = vertices
+        if self._batch is not None and self._batch.spatial_hash is not None:
+            self._batch.set_bounds(self._vertex_list, bounds)
+
+    def _get_vertices(self):
+        # Vertices of the sprite in its vertex format, and their bounds for
+        # culling; None if the sprite is invisible.
         if not self._visible:
-            self._vertex_list.vertices[:] = [0, 0, 0, 0, 0, 0, 0, 0]
-        elif self._rotation:
-            x1 = -img.anchor_x * self._scale
-            y1 = -img.anchor_y * self._scale
-            x2 = x1 + img.width * self._scale
-            y2 = y1 + img.height * self._scale
-            x = self._x
-            y = self._y
-
+            if self._vertex_type == 'v3f':
+                return [0] * 12, None
+            return [0] * 8, None
+
+        x1, y1, x2, y2 = self._quad
+        scale_x = self._scale * self._scale_x
+        scale_y = self._scale * self._scale_y
+        if scale_x != 1.0:
+            x1 *= scale_x
+            x2 *= scale_x
+        if scale_y != 1.0:
+            y1 *= scale_y
+            y2 *= scale_y
+        x = self._x
+        y = self._y
+
+        if self._rotation:
             r = -math.radians(self._rotation)
             cr = math.cos(r)
             sr = math.sin(r)
-            ax = int(x1 * cr - y1 * sr + x)
-            ay = int(x1 * sr + y1 * cr + y)
-            bx = int(x2 * cr - y1 * sr + x)
-            by = int(x2 * sr + y1 * cr + y)
-            cx = int(x2 * cr - y2 * sr + x)
-            cy = int(x2 * sr + y2 * cr + y)
-            dx = int(x1 * cr - y2 * sr + x)
-            dy = int(x1 * sr + y2 * cr + y)
-
-            self._vertex_list.vertices[:] = [ax, ay, bx, by, cx, cy, dx, dy]
-        elif self._scale != 1.0:
-            x1 = int(self._x - img.anchor_x * self._scale)
-            y1 = int(self._y - img.anchor_y * self._scale)
-            x2 = int(x1 + img.width * self._scale)
-            y2 = int(y1 + img.height * self._scale)
-            self._vertex_list.vertices[:] = [x1, y1, x2, y1, x2, y2, x1, y2]
+            ax = x1 * cr - y1 * sr + x
+            ay = x1 * sr + y1 * cr + y
+            bx = x2 * cr - y1 * sr + x
+            by = x2 * sr + y1 * cr + y
+            cx = x2 * cr - y2 * sr + x
+            cy = x2 * sr + y2 * cr + y
+            dx = x1 * cr - y2 * sr + x
+            dy = x1 * sr + y2 * cr + y
+            vertices = [ax, ay, bx, by, cx, cy, dx, dy]
+            bounds = (min(ax, bx, cx, dx), min(ay, by, cy, dy),
+                      max(ax, bx, cx, dx), max(ay, by, cy, dy))
         else:
-            x1 = int(self._x - img.anchor_x)
-            y1 = int(self._y - img.anchor_y)
-            x2 = x1 + img.width
-            y2 = y1 + img.height
-            self._vertex_list.vertices[:] = [x1, y1, x2, y1, x2, y2, x1, y2]
+            width = x2 - x1
+            height = y2 - y1
+            x1 += x
+            y1 += y
+            x2 += x
+            y2 += y
+            bounds = min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2)
+            if self._vertex_type == 'v2i':
+                # Truncate the position and size separately, so the sprite
+                # keeps its size wherever it is.
+                x1 = int(x1)
+                y1 = int(y1)
+                x2 = x1 + int(width)
+                y2 = y1 + int(height)
+                return [x1, y1, x2, y1, x2, y2, x1, y2], bounds
+            vertices = [x1, y1, x2, y1, x2, y2, x1, y2]
+
+        vertex_type = self._vertex_type
+        if vertex_type == 'v2i':
+            vertices = map(int, vertices)
+        elif vertex_type == 'v3f':
+            z = self._z
+            vertices = [vertices[0], vertices[1], z,
+                        vertices[2], vertices[3], z,
+                        vertices[4], vertices[5], z,
+                        vertices[6], vertices[7], z]
+        return vertices, bounds
 
     def _update_color(self):
+        if self._batch is not None and self._batch.defer_updates:
+            self._batch.defer_update(self._flush_color)
+        else:
+            self._flush_color()
+
+    def _flush_color(self):
+        if self._vertex_list is None:
+            return # Deleted since the update was deferred.
+
         r, g, b = self._rgb
         self._vertex_list.colors[:] = [r, g, b, int(self._opacity)] * 4
 
+    def update(self, x=None, y=None, rotation=None, scale=None,
+               scale_x=None, scale_y=None):
+        '''Simultaneously change the position, rotation or scale of the
+        sprite.
+
+        This is equivalent to setting each of the corresponding properties
+        that is not None, but the sprite's vertices are only updated once.
+
+        :Parameters:
+            `x` : int
+                X coordinate of the sprite.
+            `y` : int
+                Y coordinate of the sprite.
+            `rotation` : float
+                Clockwise rotation of the sprite, in degrees.
+            `scale` : float
+                Scaling factor.
+            `scale_x` : float
+                Horizontal scaling factor.
+            `scale_y` : float
+                Vertical scaling factor.
+
+        '''
+        if x is not None:
+            self._x = x
+        if y is not None:
+            self._y = y
+        if rotation is not None:
+            self._rotation = rotation
+        if scale is not None:
+            self._scale = scale
+        if scale_x is not None:
+            self._scale_x = scale_x
+        if scale_y is not None:
+            self._scale_y = scale_y
+        self._update_position()
+
     def set_position(self, x, y):
         '''Set the X and Y coordinates of the sprite simultaneously.
 
@@ -479,12 +895,51 @@ class Sprite(event.EventDispatcher):
                      doc='''Scaling factor.
 
     A scaling factor of 1 (the default) has no effect.  A scale of 2 will draw
-    the sprite at twice the native size of its image.
+    the sprite at twice the native size of its image.  This is applied in
+    addition to `scale_x` and `scale_y`.
+
+    :type: float
+    ''')
+
+    def _set_scale_x(self, scale_x):
+        self._scale_x = scale_x
+        self._update_position()
+
+    scale_x = property(lambda self: self._scale_x, _set_scale_x,
+                       doc='''Horizontal scaling factor.
+
+    The sprite is stretched horizontally by this factor, before rotation.
+
+    :type: float
+    ''')
+
+    def _set_scale_y(self, scale_y):
+        self._scale_y = scale_y
+        self._update_position()
+
+    scale_y = property(lambda self: self._scale_y, _set_scale_y,
+                       doc='''Vertical scaling factor.
+
+    The sprite is stretched vertically by this factor, before rotation.
+
+    :type: float
+    ''')
+
+    def _set_z(self, z):
+        self._z = z
+        if self._vertex_type == 'v3f':
+            self._update_position()
+
+    z = property(lambda self: self._z, _set_z,
+                 doc='''Z coordinate of the sprite.
+
+    Only used by sprites created with a `vertex_type` of ``"v3f"``.
 
     :type: float
     ''')
 
-    width = property(lambda self: int(self._texture.width * self._scale),
+    width = property(lambda self:
+                        int(self._texture.width * self._scale * self._scale_x),
                      doc='''Scaled width of the sprite.
 
     Read-only.  Invariant under rotation.
@@ -492,7 +947,8 @@ class Sprite(event.EventDispatcher):
     :type: int
     ''')
 
-    height = property(lambda self: int(self._texture.height * self._scale),
+    height = property(lambda self:
+                        int(self._texture.height * self._scale * self._scale_y),
                       doc='''Scaled height of the sprite.
 
     Read-only.  Invariant under rotation.
@@ -551,6 +1007,8 @@ class Sprite(event.EventDispatcher):
         See the module documentation for hints on drawing multiple sprites
         efficiently.
         '''
+        if self._batch is not None:
+            self._batch.flush_updates()
         self._group.set_state_recursive()
         self._vertex_list.draw(GL_QUADS)
         self._group.unset_state_recursive()
@@ -567,3 +1025,741 @@ class Sprite(event.EventDispatcher):
             '''
 
 Sprite.register_event_type('on_animation_end')
+
+def set_positions(sprites, xs, ys):
+    '''Set the X and Y coordinates of many sprites at once.
+
+    This is equivalent to calling `Sprite.set_position` for each sprite,
+    but the vertices of the sprites sharing a vertex domain are computed and
+    written together, using NumPy if it is available.  The vertices are
+    written immediately, even if the sprites' batch defers updates.
+
+    :Parameters:
+        `sprites` : sequence of `Sprite`
+            Sprites to move.
+        `xs` : sequence of float
+            New X coordinate of each sprite; any sequence, such as a list,
+            `array.array` or NumPy array.
+        `ys` : sequence of float
+            New Y coordinate of each sprite.
+
+    '''
+    assert len(xs) == len(sprites) and len(ys) == len(sprites), \
+        'One coordinate per sprite is required'
+    for sprite, x, y in zip(sprites, xs, ys):
+        sprite._x = x
+        sprite._y = y
+    _flush_positions(sprites)
+
+def translate(sprites, dx, dy):
+    '''Move many sprites by the same offset at once.
+
+    This is equivalent to adding `dx` and `dy` to the X and Y coordinates of
+    each sprite; see `set_positions`.
+
+    :Parameters:
+        `sprites` : sequence of `Sprite`
+            Sprites to move.
+        `dx` : float
+            Offset to add to the X coordinate of each sprite.
+        `dy` : float
+            Offset to add to the Y coordinate of each sprite.
+
+    '''
+    for sprite in sprites:
+        sprite._x += dx
+        sprite._y += dy
+    _flush_positions(sprites)
+
+def _flush_positions(sprites):
+    # Group the sprites by domain, and write the vertices of each domain
+    # through a single view of the range of vertices they occupy.
+    domain_sprites = {}
+    for sprite in sprites:
+        vertex_list = sprite._vertex_list
+        if vertex_list is None:
+            continue
+        try:
+            domain_sprites[vertex_list.domain].append(sprite)
+        except KeyError:
+            domain_sprites[vertex_list.domain] = [sprite]
+
+    for domain, sprites in domain_sprites.items():
+        attribute = domain.attribute_names['vertices']
+        starts = [sprite._vertex_list.start for sprite in sprites]
+        base = min(starts)
+        count = max(starts) + 4 - base
+        if numpy is not None:
+            region = attribute.get_view(attribute.buffer, base, count)
+            bounds = _write_vertices_numpy(sprites, starts, base,
+                                           region.array)
+        else:
+            region = attribute.get_region(attribute.buffer, base, count)
+            bounds = _write_vertices_array(sprites, starts, base,
+                                           attribute.count, region.array)
+        region.invalidate()
+
+        for sprite, sprite_bounds in zip(sprites, bounds):
+            batch = sprite._batch
+            if batch is not None and batch.spatial_hash is not None:
+                batch.set_bounds(sprite._vertex_list, sprite_bounds)
+
+def _write_vertices_array(sprites, starts, base, components, array):
+    all_bounds = []
+    for sprite, start in zip(sprites, starts):
+        vertices, bounds = sprite._get_vertices()
+        offset = (start - base) * components
+        array[offset:offset + 4 * components] = vertices
+        all_bounds.append(bounds)
+    return all_bounds
+
+def _write_vertices_numpy(sprites, starts, base, view):
+    n = len(sprites)
+    properties = numpy.array([
+        (sprite._x, sprite._y, sprite._rotation,
+         sprite._scale * sprite._scale_x, sprite._scale * sprite._scale_y,
+         sprite._visible, sprite._z) + sprite._quad
+        for sprite in sprites], numpy.float64).reshape((n, 11))
+    x, y, rotation, scale_x, scale_y, visible, z, x1, y1, x2, y2 = \
+        properties.T
+    x1 = x1 * scale_x
+    x2 = x2 * scale_x
+    y1 = y1 * scale_y
+    y2 = y2 * scale_y
+    r = numpy.radians(-rotation)
+    cr = numpy.cos(r)
+    sr = numpy.sin(r)
+
+    if view.dtype.kind == 'i':
+        # As in Sprite._get_vertices, unrotated sprites have their position
+        # and size truncated separately, so they keep their size.
+        unrotated = rotation == 0
+        ix1 = numpy.trunc(x1 + x)
+        iy1 = numpy.trunc(y1 + y)
+        ix2 = ix1 + numpy.trunc(x2 - x1)
+        iy2 = iy1 + numpy.trunc(y2 - y1)
+        int_corners = ((ix1, iy1), (ix2, iy1), (ix2, iy2), (ix1, iy2))
+
+    rows = numpy.array(starts) - base
+    xs = []
+    ys = []
+    for i, (cx, cy) in enumerate(((x1, y1), (x2, y1), (x2, y2), (x1, y2))):
+        vx = cx * cr - cy * sr + x
+        vy = cx * sr + cy * cr + y
+        xs.append(vx)
+        ys.append(vy)
+        if view.dtype.kind == 'i':
+            vx = numpy.where(unrotated, int_corners[i][0], vx)
+            vy = numpy.where(unrotated, int_corners[i][1], vy)
+        view[rows + i, 0] = vx * visible
+        view[rows + i, 1] = vy * visible
+        if view.shape[1] == 3:
+            view[rows + i, 2] = z * visible
+
+    bounds = numpy.array([numpy.minimum.reduce(xs), numpy.minimum.reduce(ys),
+                          numpy.maximum.reduce(xs), numpy.maximum.reduce(ys)])
+    return [tuple(b) if sprite._visible else None
+            for sprite, b in zip(sprites, bounds.T.tolist())]
+
+# Shaders drawing one instance of a quad per sprite of a `SpriteSystem`.
+# Each instance gives the position, rotation and scale of the sprite, the
+# index of its frame and its color.  The frames uniform holds two vectors per
+# frame: the corners of the frame relative to its anchor, and the corners of
+# its texture region.  The number of frames is substituted for %(frames)d.
+_instance_vertex_source = '''
+#version 120
+uniform vec4 frames[%(frames)d];
+attribute vec2 corner;
+attribute vec4 position;
+attribute float frame;
+attribute vec4 color;
+
+void main()
+{
+    int i = int(frame + 0.5) * 2;
+    vec4 quad = frames[i];
+    vec4 region = frames[i + 1];
+    vec2 local = mix(quad.xy, quad.zw, corner) * position.w;
+    float r = radians(-position.z);
+    float cr = cos(r);
+    float sr = sin(r);
+    vec2 p = vec2(local.x * cr - local.y * sr,
+                  local.x * sr + local.y * cr) + position.xy;
+    gl_Position = gl_ModelViewProjectionMatrix * vec4(p, 0.0, 1.0);
+    gl_TexCoord[0] = vec4(mix(region.xy, region.zw, corner), 0.0, 1.0);
+    gl_FrontColor = color;
+}
+'''
+
+_instance_fragment_source = '''
+#version 120
+uniform sampler2D texture;
+
+void main()
+{
+    gl_FragColor = texture2D(texture, gl_TexCoord[0].st) * gl_Color;
+}
+'''
+
+# Attribute names in order of location.
+_instance_attributes = ('corner', 'position', 'frame', 'color')
+
+# Number of floats per instance, for the position and frame attributes.
+_instance_floats = 5
+
+def _have_instancing():
+    '''Determine if the current context can draw instanced sprites.'''
+    if not gl_info.have_context():
+        return False
+    if gl_info.have_version(3, 3):
+        return True
+    return (gl_info.have_version(2, 0) and
+            gl_info.have_extension('GL_ARB_instanced_arrays') and
+            gl_info.have_extension('GL_ARB_draw_instanced'))
+
+def _compile_shader(shader_type, source):
+    shader = glCreateShader(shader_type)
+    source_buffer = ctypes.create_string_buffer(source)
+    sources = (ctypes.POINTER(GLchar) * 1)(
+        ctypes.cast(source_buffer, ctypes.POINTER(GLchar)))
+    glShaderSource(shader, 1, sources, None)
+    glCompileShader(shader)
+
+    status = GLint()
+    glGetShaderiv(shader, GL_COMPILE_STATUS, status)
+    if not status.value:
+        log = ctypes.create_string_buffer(4096)
+        glGetShaderInfoLog(shader, len(log), None, log)
+        glDeleteShader(shader)
+        raise GLException('Sprite shader failed to compile: %s' % log.value)
+    return shader
+
+class _SpriteInstancer(object):
+    '''Draws the sprites of a `SpriteSystem` as instances of a single quad,
+    using a shader program and instanced vertex attributes.
+
+    The corners and texture region of each frame are given by a table of
+    8 floats per frame, stored in a uniform array; each instance only gives
+    the index of its frame.
+    '''
+    def __init__(self, frame_table):
+        frame_count = len(frame_table) // 8
+        max_components = GLint()
+        glGetIntegerv(GL_MAX_VERTEX_UNIFORM_COMPONENTS, max_components)
+        # Leave room for the built-in matrix uniforms.
+        if frame_count * 8 + 64 > max_components.value:
+            raise GLException('Too many frames for instanced sprites')
+
+        if gl_info.have_version(3, 3):
+            self._draw_instanced = glDrawArraysInstanced
+            self._attrib_divisor = glVertexAttribDivisor
+        else:
+            self._draw_instanced = glDrawArraysInstancedARB
+            self._attrib_divisor = glVertexAttribDivisorARB
+
+        vertex_shader = _compile_shader(GL_VERTEX_SHADER,
+            _instance_vertex_source % {'frames': frame_count * 2})
+        fragment_shader = _compile_shader(GL_FRAGMENT_SHADER,
+                                          _instance_fragment_source)
+        self.program = glCreateProgram()
+        glAttachShader(self.program, vertex_shader)
+        glAttachShader(self.program, fragment_shader)
+        for location, name in enumerate(_instance_attributes):
+            glBindAttribLocation(self.program, location, name)
+        glLinkProgram(self.program)
+        glDeleteShader(vertex_shader)
+        glDeleteShader(fragment_shader)
+
+        status = GLint()
+        glGetProgramiv(self.program, GL_LINK_STATUS, status)
+        if not status.value:
+            log = ctypes.create_string_buffer(4096)
+            glGetProgramInfoLog(self.program, len(log), None, log)
+            glDeleteProgram(self.program)
+            raise GLException('Sprite shader failed to link: %s' % log.value)
+
+        table = (GLfloat * len(frame_table))(*frame_table)
+        glUseProgram(self.program)
+        location = glGetUniformLocation(self.program, 'frames')
+        glUniform4fv(location, frame_count * 2, table)
+        glUseProgram(0)
+
+        corners = (GLfloat * 8)(0, 0, 1, 0, 1, 1, 0, 1)
+        self.corner_buffer = graphics.vertexbuffer.VertexBufferObject(
+            ctypes.sizeof(corners), GL_ARRAY_BUFFER, GL_STATIC_DRAW)
+        self.corner_buffer.set_data(corners)
+        self.float_buffer = graphics.vertexbuffer.VertexBufferObject(
+            0, GL_ARRAY_BUFFER, GL_STREAM_DRAW)
+        self.color_buffer = graphics.vertexbuffer.VertexBufferObject(
+            0, GL_ARRAY_BUFFER, GL_STREAM_DRAW)
+
+    def upload(self, count, floats, colors):
+        '''Replace the instance data with the given arrays, as returned by
+        `SpriteSystem._pack_instances`.'''
+        for buffer, data, size in (
+                (self.float_buffer, floats, count * _instance_floats * 4),
+                (self.color_buffer, colors, count * 4)):
+            if numpy is not None and isinstance(data, numpy.ndarray):
+                address = data.ctypes.data
+            else:
+                address = data.buffer_info()[0]
+            buffer.size = size
+            buffer.set_data(address)
+
+    def draw(self, count):
+        glUseProgram(self.program)
+        glPushClientAttrib(GL_CLIENT_VERTEX_ARRAY_BIT)
+
+        self.corner_buffer.bind()
+        glEnableVertexAttribArray(0)
+        glVertexAttribPointer(0, 2, GL_FLOAT, GL_FALSE, 0, None)
+
+        self.float_buffer.bind()
+        stride = _instance_floats * 4
+        glEnableVertexAttribArray(1)
+        glVertexAttribPointer(1, 4, GL_FLOAT, GL_FALSE, stride, None)
+        self._attrib_divisor(1, 1)
+        glEnableVertexAttribArray(2)
+        glVertexAttribPointer(2, 1, GL_FLOAT, GL_FALSE, stride, 16)
+        self._attrib_divisor(2, 1)
+
+        self.color_buffer.bind()
+        glEnableVertexAttribArray(3)
+        glVertexAttribPointer(3, 4, GL_UNSIGNED_BYTE, GL_TRUE, 0, None)
+        self._attrib_divisor(3, 1)
+
+        self._draw_instanced(GL_TRIANGLE_FAN, 0, 4, count)
+
+        for location in (1, 2, 3):
+            self._attrib_divisor(location, 0)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glPopClientAttrib()
+        glUseProgram(0)
+
+    def delete(self):
+        glDeleteProgram(self.program)
+        self.corner_buffer.delete()
+        self.float_buffer.delete()
+        self.color_buffer.delete()
+
+class SpriteSystem(object):
+    '''A collection of sprites stored in arrays and updated together.
+
+    All sprites in the system display one of a sequence of images (frames)
+    sharing a texture, such as the items of an `image.ImageGrid` or the
+    images of an `image.atlas.TextureAtlas`, and share blend mode, batch
+    and group.  A sprite is identified by the index returned by `add`,
+    which is valid until the sprite is removed.
+
+    The properties of sprite ``i`` are elements ``i`` of the arrays `x`,
+    `y`, `rotation`, `scale`, `opacity`, `frame` and `visible`, and elements
+    ``3 * i`` to ``3 * i + 2`` of `color`; they have the same meaning as the
+    properties of `Sprite`, except that vertices are not rounded to
+    integers.  The arrays can be modified directly, in which case `update`
+    must be called afterwards, and the arrays must not be resized.
+
+    The arrays are reallocated when sprites are added beyond the capacity of
+    the system, so references to them should not be kept across calls to
+    `add`.
+
+    A system that is not in a batch can draw each sprite as an instance of
+    a single quad, so that only one record per sprite is uploaded rather
+    than four vertices; see the `instanced` parameter of the constructor.
+    The record gives the index of the sprite's frame, and the frames'
+    corners and texture regions are looked up from a table in the shader.
+
+    :Ivariables:
+        `x` : array.array
+            X coordinate of each sprite.
+        `y` : array.array
+            Y coordinate of each sprite.
+        `rotation` : array.array
+            Clockwise rotation of each sprite, in degrees.
+        `scale` : array.array
+            Scaling factor of each sprite.
+        `opacity` : array.array
+            Blend opacity of each sprite, between 0 and 255.
+        `color` : array.array
+            Blend color of each sprite, as consecutive red, green and blue
+            components between 0 and 255.
+        `frame` : array.array
+            Index into `frames` of the image displayed by each sprite.
+        `visible` : array.array
+            Nonzero for sprites that will be drawn.
+
+    '''
+
+    # Number of sprites there is room for initially; the capacity doubles
+    # whenever the system is full.
+    _initial_capacity = 16
+
+    def __init__(self, images,
+                 blend_src=GL_SRC_ALPHA,
+                 blend_dest=GL_ONE_MINUS_SRC_ALPHA,
+                 batch=None,
+                 group=None,
+                 usage='dynamic',
+                 instanced=False):
+        '''Create a sprite system with no sprites.
+
+        :Parameters:
+            `images` : `AbstractImage` or sequence of `AbstractImage`
+                Image, or sequence of images, that sprites can display.
+                All the images must share a texture.
+            `blend_src` : int
+                OpenGL blend source mode.
+            `blend_dest` : int
+                OpenGL blend destination mode.
+            `batch` : `Batch`
+                Optional batch to add the sprites to.
+            `group` : `Group`
+                Optional parent group of the sprites.
+            `usage` : str
+                Vertex buffer object usage hint, one of ``"none"``,
+                ``"stream"``, ``"dynamic"`` (default) or ``"static"``.
+            `instanced` : bool
+                If True and `batch` is None, draw the sprites with
+                instancing when the OpenGL context supports it (OpenGL 3.3,
+                or OpenGL 2.0 with the ``GL_ARB_instanced_arrays`` and
+                ``GL_ARB_draw_instanced`` extensions).  Otherwise the
+                sprites are drawn as quads.  The images must be 2D textures
+                (not rectangle or 3D textures) to be drawn with instancing,
+                and there must be few enough of them for their table to fit
+                in the shader's uniforms (typically a few hundred).  See
+                `is_instanced`.
+
+        '''
+        if isinstance(images, image.AbstractImage):
+            images = [images]
+        textures = [img.get_texture() for img in images]
+        assert textures, 'At least one image is required'
+        texture = textures[0]
+        for t in textures:
+            assert (t.target, t.id) == (texture.target, texture.id), \
+                'All images of a sprite system must share a texture'
+
+        #: Textures of the images that sprites can display.
+        #:
+        #: :type: list of `Texture`
+        self.frames = textures
+
+        # Position of each frame's corners relative to its anchor, as
+        # (x1, y1, x2, y2), and its texture coordinates.  For the instancing
+        # frame table, the corners are followed by the texture coordinates
+        # of the first and third corners.
+        self._frame_quads = array.array('f')
+        self._frame_tex_coords = array.array('f')
+        self._frame_instances = array.array('f')
+        for t in textures:
+            x1 = -t.anchor_x
+            y1 = -t.anchor_y
+            quad = [x1, y1, x1 + t.width, y1 + t.height]
+            self._frame_quads.extend(quad)
+            self._frame_tex_coords.extend(t.tex_coords)
+            self._frame_instances.extend(quad)
+            self._frame_instances.extend(t.tex_coords[0:2])
+            self._frame_instances.extend(t.tex_coords[6:8])
+
+        self._batch = batch
+        self._group = get_sprite_group(texture, blend_src, blend_dest, group)
+        self._usage = usage
+
+        self._capacity = 0
+        self._count = 0         # Number of indices ever used
+        self._free = []         # Indices of removed sprites
+
+        self.x = array.array('f')
+        self.y = array.array('f')
+        self.rotation = array.array('f')
+        self.scale = array.array('f')
+        self.opacity = array.array('B')
+        self.color = array.array('B')
+        self.frame = array.array('i')
+        self.visible = array.array('B')
+
+        self._vertex_list = None
+        self._instancer = None
+        self._instance_count = 0
+        if (instanced and batch is None and
+            texture.target == GL_TEXTURE_2D and _have_instancing()):
+            try:
+                self._instancer = _SpriteInstancer(self._frame_instances)
+            except GLException:
+                pass
+        self._set_capacity(self._initial_capacity)
+
+    def __len__(self):
+        return self._count - len(self._free)
+
+    is_instanced = property(lambda self: self._instancer is not None,
+                            doc='''True if the sprites are drawn with
+    instancing.
+
+    Read-only.
+
+    :type: bool
+    ''')
+
+    def _set_capacity(self, capacity):
+        n = capacity - self._capacity
+        for values in (self.x, self.y, self.rotation, self.opacity,
+                       self.frame, self.visible):
+            values.extend([0] * n)
+        self.scale.extend([1.] * n)
+        self.color.extend([255] * (3 * n))
+
+        if self._instancer is not None:
+            pass
+        elif self._vertex_list is None:
+            vertex_format = graphics.vertexdomain.VertexFormat(
+                'v2f/%s' % self._usage, 'c4B/%s' % self._usage,
+                't3f/%s' % self._usage)
+            if self._batch is None:
+                self._vertex_list = graphics.vertex_list(4 * capacity,
+                                                         vertex_format)
+            else:
+                self._vertex_list = self._batch.add(4 * capacity, GL_QUADS,
+                    self._group, vertex_format)
+        else:
+            self._vertex_list.resize(4 * capacity)
+        self._capacity = capacity
+
+    def add(self, x=0, y=0, frame=0, rotation=0, scale=1, opacity=255,
+            color=(255, 255, 255), visible=True):
+        '''Add a sprite to the system.
+
+        The sprite is not displayed until `update` is called.
+
+        :Parameters:
+            `x` : float
+                X coordinate of the sprite.
+            `y` : float
+                Y coordinate of the sprite.
+            `frame` : int
+                Index into `frames` of the image to display.
+            `rotation` : float
+                Clockwise rotation of the sprite, in degrees.
+            `scale` : float
+                Scaling factor.
+            `opacity` : int
+                Blend opacity.
+            `color` : (int, int, int)
+                Blend color.
+            `visible` : bool
+                True if the sprite will be drawn.
+
+        :rtype: int
+        :return: The index of the sprite.
+        '''
+        if self._free:
+            index = self._free.pop()
+        else:
+            if self._count == self._capacity:
+                self._set_capacity(self._capacity * 2)
+            index = self._count
+            self._count += 1
+
+        self.x[index] = x
+        self.y[index] = y
+        self.frame[index] = frame
+        self.rotation[index] = rotation
+        self.scale[index] = scale
+        self.opacity[index] = opacity
+        self.color[3 * index:3 * index + 3] = array.array('B', color)
+        self.visible[index] = bool(visible)
+        return index
+
+    def remove(self, index):
+        '''Remove a sprite from the system.
+
+        The sprite is hidden, and its index may be reused by a subsequently
+        added sprite.  The change is not displayed until `update` is called.
+
+        :Parameters:
+            `index` : int
+                Index of the sprite to remove.
+
+        '''
+        assert 0 <= index < self._count and index not in self._free, \
+            'No sprite with index %d' % index
+        self.visible[index] = 0
+        self._free.append(index)
+
+    def delete(self):
+        '''Remove all sprites and release the system's vertex list.'''
+        if self._instancer is not None:
+            self._instancer.delete()
+            self._instancer = None
+        else:
+            self._vertex_list.delete()
+            self._vertex_list = None
+        self._group = None
+
+    def update(self):
+        '''Compute the vertices, colors and texture coordinates of every
+        sprite from the property arrays.
+        '''
+        if not self._count:
+            return
+        if self._instancer is not None:
+            count, floats, colors = self._pack_instances(self._count)
+            self._instancer.upload(count, floats, colors)
+            self._instance_count = count
+        elif numpy is not None:
+            self._update_numpy(self._count)
+        else:
+            self._update_array(self._count)
+
+    def _pack_instances(self, n):
+        '''Pack the visible sprites among the first `n` into instance
+        records.
+
+        Returns the number of visible sprites, an array of 5 floats per
+        visible sprite (x, y, rotation, scale and frame index) and an array
+        of 4 bytes per visible sprite (its color and opacity).  The arrays
+        are NumPy arrays if NumPy is available, and `array.array` otherwise.
+        '''
+        if numpy is not None:
+            visible = numpy.frombuffer(self.visible, numpy.uint8, n)
+            indices = numpy.flatnonzero(visible)
+            count = len(indices)
+            floats = numpy.empty((count, _instance_floats), numpy.float32)
+            for i, values in enumerate((self.x, self.y,
+                                        self.rotation, self.scale)):
+                floats[:, i] = numpy.frombuffer(values, numpy.float32,
+                                                n)[indices]
+            floats[:, 4] = numpy.frombuffer(self.frame, numpy.int32,
+                                            n)[indices]
+
+            colors = numpy.empty((count, 4), numpy.uint8)
+            colors[:, :3] = numpy.frombuffer(self.color, numpy.uint8,
+                                             3 * n).reshape((n, 3))[indices]
+            colors[:, 3] = numpy.frombuffer(self.opacity, numpy.uint8,
+                                            n)[indices]
+            return count, floats.ravel(), colors.ravel()
+
+        floats = array.array('f')
+        colors = array.array('B')
+        for i in xrange(n):
+            if not self.visible[i]:
+                continue
+            floats.extend((self.x[i], self.y[i],
+                           self.rotation[i], self.scale[i], self.frame[i]))
+            colors.extend(self.color[3 * i:3 * i + 3])
+            colors.append(self.opacity[i])
+        return len(colors) // 4, floats, colors
+
+    def _update_numpy(self, n):
+        x = numpy.frombuffer(self.x, numpy.float32, n)
+        y = numpy.frombuffer(self.y, numpy.float32, n)
+        scale = numpy.frombuffer(self.scale, numpy.float32, n)
+        frame = numpy.frombuffer(self.frame, numpy.int32, n)
+        visible = numpy.frombuffer(self.visible, numpy.uint8, n) != 0
+        rotation = numpy.frombuffer(self.rotation, numpy.float32, n)
+
+        quads = numpy.frombuffer(self._frame_quads, numpy.float32)
+        quads = quads.reshape((-1, 4))[frame] * scale[:, numpy.newaxis]
+        x1, y1, x2, y2 = quads.T
+
+        vertices = self._vertex_list.get_attribute_view('vertices')[:4 * n]
+        if rotation.any():
+            r = numpy.radians(-rotation)
+            cr = numpy.cos(r)
+            sr = numpy.sin(r)
+            corners = ((x1, y1), (x2, y1), (x2, y2), (x1, y2))
+            for i, (cx, cy) in enumerate(corners):
+                vertices[i::4, 0] = (cx * cr - cy * sr + x) * visible
+                vertices[i::4, 1] = (cx * sr + cy * cr + y) * visible
+        else:
+            x1 = (x1 + x) * visible
+            y1 = (y1 + y) * visible
+            x2 = (x2 + x) * visible
+            y2 = (y2 + y) * visible
+            vertices[0::4, 0] = x1
+            vertices[0::4, 1] = y1
+            vertices[1::4, 0] = x2
+            vertices[1::4, 1] = y1
+            vertices[2::4, 0] = x2
+            vertices[2::4, 1] = y2
+            vertices[3::4, 0] = x1
+            vertices[3::4, 1] = y2
+
+        color = numpy.frombuffer(self.color, numpy.uint8, 3 * n)
+        color = color.reshape((n, 3))
+        opacity = numpy.frombuffer(self.opacity, numpy.uint8, n)
+        colors = self._vertex_list.get_attribute_view('colors')[:4 * n]
+        tex_coords = numpy.frombuffer(self._frame_tex_coords, numpy.float32)
+        tex_coords = tex_coords.reshape((-1, 12))[frame]
+        tex_coord_view = \
+            self._vertex_list.get_attribute_view('tex_coords')[:4 * n]
+        for i in range(4):
+            colors[i::4, :3] = color
+            colors[i::4, 3] = opacity
+            tex_coord_view[i::4] = tex_coords[:, 3 * i:3 * i + 3]
+
+    def _update_array(self, n):
+        vertices = array.array('f', [0.]) * (8 * n)
+        colors = array.array('B', [0]) * (16 * n)
+        tex_coords = array.array('f', [0.]) * (12 * n)
+        quads = self._frame_quads
+        frame_tex_coords = self._frame_tex_coords
+        cos = math.cos
+        sin = math.sin
+        radians = math.radians
+        for i in xrange(n):
+            f = self.frame[i]
+            tex_coords[12 * i:12 * i + 12] = \
+                frame_tex_coords[12 * f:12 * f + 12]
+            r, g, b = self.color[3 * i:3 * i + 3]
+            colors[16 * i:16 * i + 16] = \
+                array.array('B', (r, g, b, self.opacity[i])) * 4
+            if not self.visible[i]:
+                continue
+
+            s = self.scale[i]
+            x = self.x[i]
+            y = self.y[i]
+            x1 = quads[4 * f] * s
+            y1 = quads[4 * f + 1] * s
+            x2 = quads[4 * f + 2] * s
+            y2 = quads[4 * f + 3] * s
+            rotation = self.rotation[i]
+            if rotation:
+                r = -radians(rotation)
+                cr = cos(r)
+                sr = sin(r)
+                vertices[8 * i:8 * i + 8] = array.array('f', (
+                    x1 * cr - y1 * sr + x, x1 * sr + y1 * cr + y,
+                    x2 * cr - y1 * sr + x, x2 * sr + y1 * cr + y,
+                    x2 * cr - y2 * sr + x, x2 * sr + y2 * cr + y,
+                    x1 * cr - y2 * sr + x, x1 * sr + y2 * cr + y))
+            else:
+                x1 += x
+                y1 += y
+                x2 += x
+                y2 += y
+                vertices[8 * i:8 * i + 8] = array.array('f', (
+                    x1, y1, x2, y1, x2, y2, x1, y2))
+
+        vertex_list = self._vertex_list
+        for name, data in (('vertices', vertices),
+                           ('colors', colors),
+                           ('tex_coords', tex_coords)):
+            attribute = vertex_list.domain.attribute_names[name]
+            attribute.set_region(attribute.buffer, vertex_list.start, 4 * n,
+                                 data)
+
+    def draw(self):
+        '''Update and draw the sprites.
+
+        See the module documentation for hints on drawing multiple sprites
+        efficiently.
+        '''
+        self.update()
+        self._group.set_state_recursive()
+        if self._instancer is not None:
+            if self._instance_count:
+                self._instancer.draw(self._instance_count)
+        else:
+            self._vertex_list.draw(GL_QUADS)
+        self._group.unset_state_recursive()
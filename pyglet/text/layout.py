@@ -170,6 +170,11 @@ _is_epydoc = hasattr(sys, 'is_epydoc') and sys.is_epydoc
 
 _distance_re = re.compile(r'([-0-9.]+)([a-zA-Z]+)')
 
+_glyph_vertex_format = graphics.vertexdomain.VertexFormat(
+    'v2f/dynamic', 't3f/dynamic', 'c4B/dynamic')
+_decoration_vertex_format = graphics.vertexdomain.VertexFormat(
+    'v2f/dynamic', 'c4B/dynamic')
+
 def _parse_distance(distance, dpi):
     '''Parse a distance string and return corresponding distance in pixels as
     an integer.
@@ -355,9 +360,7 @@ class _GlyphBox(_AbstractBox):
             colors.extend(color * ((end - start) * 4))
 
         vertex_list = layout.batch.add(n_glyphs * 4, GL_QUADS, group,
-            ('v2f/dynamic', vertices),
-            ('t3f/dynamic', tex_coords),
-            ('c4B/dynamic', colors))
+            _glyph_vertex_format, vertices, tex_coords, colors)
         context.add_list(vertex_list)
 
         # Decoration (background color and underline)
@@ -395,17 +398,15 @@ class _GlyphBox(_AbstractBox):
         if background_vertices:
             background_list = layout.batch.add(
                 len(background_vertices) // 2, GL_QUADS,
-                layout.background_group,
-                ('v2f/dynamic', background_vertices),
-                ('c4B/dynamic', background_colors))
+                layout.background_group, _decoration_vertex_format,
+                background_vertices, background_colors)
             context.add_list(background_list)
 
         if underline_vertices:
             underline_list = layout.batch.add(
                 len(underline_vertices) // 2, GL_LINES,
-                layout.foreground_decoration_group,
-                ('v2f/dynamic', underline_vertices),
-                ('c4B/dynamic', underline_colors))
+                layout.foreground_decoration_group, _decoration_vertex_format,
+                underline_vertices, underline_colors)
             context.add_list(underline_list)
 
     def delete(self, layout):
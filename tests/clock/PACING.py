@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+
+'''Test that frame pacing learns how much sleeps overshoot and counts missed
+deadlines, using a simulated time function and sleep.
+'''
+
+__docformat__ = 'restructuredtext'
+__version__ = '$Id$'
+
+import unittest
+
+from pyglet import clock
+
+__noninteractive = True
+
+class SimulatedClock(clock.Clock):
+    # Each sleep lasts `overshoot` seconds longer than requested; each
+    # reading of the time while spinning advances it by `spin_step`.
+    overshoot = .003
+    spin_step = .0001
+
+    def __init__(self, fps_limit):
+        self.now = 0.
+        self.spins = 0
+        super(SimulatedClock, self).__init__(fps_limit, self.get_time)
+
+    def get_time(self):
+        return self.now
+
+    def sleep(self, microseconds):
+        self.now += microseconds / 1000000. + self.overshoot
+
+    def spin(self):
+        self.spins += 1
+        self.now += self.spin_step
+        return self.now
+
+class TestPacing(unittest.TestCase):
+    def setUp(self):
+        self.clock = SimulatedClock(60)
+        self.clock.time = self.clock.spin
+        self.pacer = self.clock.enable_pacing(margin=.002, spin_yield=False)
+
+    def test_learns_overshoot(self):
+        self.clock.tick()
+        for i in range(20):
+            self.clock.tick()
+        # After a few frames the sleep request allows for the overshoot.
+        self.assertAlmostEqual(self.pacer.get_sleep_request(.01), .007, 3)
+        spins = self.clock.spins
+        self.clock.tick()
+        self.assertTrue(self.clock.spins - spins < 40)
+        self.assertAlmostEqual(self.clock.get_fps(), 60, 0)
+        self.assertEqual(self.pacer.frames, 22)
+        self.assertTrue(self.pacer.lateness <= self.clock.spin_step)
+
+    def test_missed_deadline(self):
+        for i in range(10):
+            self.clock.tick()
+        missed = self.pacer.missed_deadlines
+        self.clock.now += .1
+        self.clock.tick()
+        self.assertEqual(self.pacer.missed_deadlines, missed + 1)
+        self.assertTrue(self.pacer.lateness > .08)
+        self.clock.tick()
+        self.assertEqual(self.pacer.missed_deadlines, missed + 1)
+
+    def test_disable(self):
+        self.clock.disable_pacing()
+        self.assertEqual(self.clock.pacer, None)
+        self.clock.tick()
+        self.clock.tick()
+        self.assertEqual(self.pacer.frames, 0)
+
+if __name__ == '__main__':
+    unittest.main()
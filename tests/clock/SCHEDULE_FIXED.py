@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+
+'''Test that functions scheduled with a fixed step are called with a constant
+dt, once for each step elapsed, and that catch-up steps are limited, using a
+simulated time function.
+'''
+
+__docformat__ = 'restructuredtext'
+__version__ = '$Id$'
+
+import unittest
+
+from pyglet import clock
+
+__noninteractive = True
+
+class TestScheduleFixed(unittest.TestCase):
+    def setUp(self):
+        self.time = 0.
+        self.clock = clock.Clock(time_function=lambda: self.time)
+        self.calls = []
+
+    def tick(self, time):
+        self.time = time
+        self.clock.tick()
+
+    def callback(self, dt, name='a'):
+        self.calls.append((name, dt))
+
+    def test_steps(self):
+        handle = self.clock.schedule_fixed(self.callback, .25)
+        self.tick(.125)
+        self.assertEqual(self.calls, [])
+        self.assertEqual(handle.alpha, .5)
+        self.tick(.5)
+        self.assertEqual(self.calls, [('a', .25), ('a', .25)])
+        self.assertEqual(handle.alpha, 0.)
+        self.tick(.875)
+        self.assertEqual(len(self.calls), 3)
+        self.assertEqual(handle.alpha, .5)
+
+    def test_args(self):
+        self.clock.schedule_fixed(self.callback, .5, 'b', tag='level')
+        self.tick(.5)
+        self.assertEqual(self.calls, [('b', .5)])
+
+    def test_max_catchup(self):
+        handle = self.clock.schedule_fixed(self.callback, .25, max_catchup=2)
+        # 10 steps elapsed: 2 are run, and 2 are left for the next ticks.
+        self.tick(2.5)
+        self.assertEqual(len(self.calls), 2)
+        self.assertEqual(handle.alpha, 1.)
+        self.tick(2.5)
+        self.assertEqual(len(self.calls), 4)
+        self.assertEqual(handle.alpha, 0.)
+        self.tick(2.5)
+        self.assertEqual(len(self.calls), 4)
+
+    def test_sleep_time(self):
+        self.clock.schedule_fixed(self.callback, 1.)
+        # The clock is ticked every frame, to allow interpolation.
+        self.assertEqual(self.clock.get_sleep_time(True), 0.)
+
+    def test_cancel(self):
+        handle = self.clock.schedule_fixed(self.callback, .25)
+        self.clock.schedule_fixed(self.callback, .25, 'b', tag='level')
+        self.clock.schedule_fixed(self.callback, .25, 'c')
+        handle.cancel()
+        self.clock.unschedule_tag('level')
+        self.tick(.25)
+        self.assertEqual(self.calls, [('c', .25)])
+        self.clock.unschedule(self.callback)
+        self.tick(.5)
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(self.clock._schedule_fixed_items, [])
+        self.assertEqual(self.clock.get_sleep_time(True), None)
+
+    def test_cancel_in_callback(self):
+        def callback(dt):
+            self.calls.append(dt)
+            handle.cancel()
+        handle = self.clock.schedule_fixed(callback, .25)
+        self.tick(1.)
+        self.assertEqual(self.calls, [.25])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,238 @@
+#!/usr/bin/env python
+
+'''Test the order in which the clock calls scheduled functions, and
+cancellation through the handles returned by the schedule methods, by function
+and by tag, using a simulated time function.
+
+`TestScheduleBenchmark` times ticking a clock with many scheduled functions,
+and cancelling them individually and by tag; timings are printed to stderr.
+'''
+
+__docformat__ = 'restructuredtext'
+__version__ = '$Id$'
+
+import random
+import sys
+import time
+import unittest
+
+from pyglet import clock
+
+__noninteractive = True
+
+class TestScheduleHeap(unittest.TestCase):
+    def setUp(self):
+        self.time = 0.
+        self.clock = clock.Clock(time_function=lambda: self.time)
+        self.calls = []
+
+    def tick(self, time):
+        self.time = time
+        self.clock.tick()
+
+    def callback(self, dt, name):
+        self.calls.append((name, round(dt, 6)))
+
+    def test_order(self):
+        for name, delay in (('c', .3), ('a', .1), ('d', .3), ('b', .2)):
+            self.clock.schedule_once(self.callback, delay, name)
+        self.tick(.25)
+        self.assertEqual(self.calls, [('a', .25), ('b', .25)])
+        self.tick(.5)
+        # Functions due at the same time are called in the order scheduled.
+        self.assertEqual(self.calls[2:], [('c', .5), ('d', .5)])
+        self.assertEqual(self.clock._schedule_interval_items, [])
+        self.assertEqual(self.clock.get_sleep_time(True), None)
+
+    def test_interval(self):
+        self.clock.schedule_interval(self.callback, .1, 'a')
+        self.clock.schedule_interval(self.callback, .2, 'b')
+        for i in range(1, 11):
+            self.tick(i * .1)
+        names = [name for name, dt in self.calls]
+        self.assertEqual((names.count('a'), names.count('b')), (10, 5))
+        self.assertEqual(set(self.calls[1:]), set([('a', .1), ('b', .2)]))
+        self.assertAlmostEqual(self.clock.get_sleep_time(True), .1)
+
+    def test_schedule_in_callback(self):
+        def callback(dt):
+            self.calls.append('outer')
+            self.clock.schedule_once(self.callback, 0, 'inner')
+        self.clock.schedule_once(callback, .1)
+        self.tick(.1)
+        self.assertEqual(self.calls, ['outer'])
+        self.tick(.2)
+        self.assertEqual(self.calls, ['outer', ('inner', .1)])
+
+    def test_cancel(self):
+        a = self.clock.schedule_interval(self.callback, .1, 'a')
+        b = self.clock.schedule_interval(self.callback, .1, 'b')
+        c = self.clock.schedule_once(self.callback, .1, 'c')
+        d = self.clock.schedule(self.callback, 'd')
+        self.tick(.1)
+        self.assertEqual([name for name, dt in self.calls],
+                         ['d', 'a', 'b', 'c'])
+        del self.calls[:]
+
+        # Only the cancelled schedule of the function is removed.
+        a.cancel()
+        d.cancel()
+        c.cancel()
+        a.cancel()
+        self.tick(.2)
+        self.assertEqual(self.calls, [('b', .1)])
+        self.assertEqual(self.clock._schedule_items, [])
+
+        b.cancel()
+        self.assertEqual(self.clock._schedule_interval_items, [])
+        self.assertEqual(self.clock.get_sleep_time(True), None)
+
+    def test_cancel_in_callback(self):
+        handles = []
+        def callback(dt, name):
+            self.calls.append(name)
+            for handle in handles:
+                handle.cancel()
+        for name in 'abc':
+            handles.append(
+                self.clock.schedule_interval(callback, .1, name))
+        self.tick(.1)
+        self.tick(.2)
+        self.assertEqual(self.calls, ['a'])
+        self.assertEqual(self.clock._schedule_interval_items, [])
+
+    def test_unschedule_in_callback(self):
+        def callback(dt):
+            self.calls.append(dt)
+            self.clock.unschedule(callback)
+        self.clock.schedule_interval(callback, .1)
+        for i in range(1, 6):
+            self.tick(i * .1)
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(self.clock._schedule_interval_items, [])
+        self.assertEqual(self.clock._dead_interval_items, 0)
+
+    def test_cancel_new_in_callback(self):
+        # Items scheduled and cancelled during a tick, and the item being
+        # called, are not counted as cancelled items of the heap.
+        handles = []
+        def schedule(dt):
+            # Due before cancel, so it is held back from the heap when
+            # cancel is called.
+            handles.append(self.clock.schedule_once(self.callback, -.05,
+                                                    'a'))
+        def cancel(dt):
+            handles[0].cancel()
+            handles[1].cancel()
+        handles.append(self.clock.schedule_once(cancel, .2))
+        self.clock.schedule_once(schedule, .1)
+        for name in 'bcde':
+            self.clock.schedule_interval(self.callback, 1, name)
+        self.tick(.2)
+        self.assertEqual(self.clock._dead_interval_items, 0)
+        self.assertEqual(len(self.clock._schedule_interval_items), 4)
+        self.tick(.3)
+        self.assertEqual(self.calls, [])
+
+    def test_cancel_many(self):
+        handles = [self.clock.schedule_once(self.callback, i * .01, i)
+                   for i in range(100)]
+        for handle in handles[:90]:
+            handle.cancel()
+        # Cancelled items are removed once they make up half the heap.
+        self.assertTrue(len(self.clock._schedule_interval_items) < 60)
+        self.assertAlmostEqual(self.clock.get_sleep_time(True), .9)
+        self.tick(2)
+        self.assertEqual([name for name, dt in self.calls], range(90, 100))
+
+    def test_unschedule(self):
+        self.clock.schedule_interval(self.callback, .1, 'a')
+        handle = self.clock.schedule_once(self.callback, .1, 'b')
+        self.clock.schedule(self.callback, 'c')
+        handle.cancel()
+        self.clock.unschedule(self.callback)
+        self.assertEqual(self.clock._schedule_interval_items, [])
+        self.tick(.5)
+        self.assertEqual(self.calls, [])
+        self.assertEqual(self.clock._schedule_items, [])
+
+    def test_unschedule_many(self):
+        def other(dt):
+            self.calls.append('other')
+        def unscheduled(dt):
+            self.calls.append('unscheduled')
+        self.clock.schedule_interval(self.callback, .1, 'a')
+        self.clock.schedule(unscheduled)
+        self.clock.schedule_once(other, .1)
+        self.clock.unschedule_many([self.callback, unscheduled])
+        self.tick(.1)
+        self.assertEqual(self.calls, ['other'])
+        self.assertEqual(self.clock._func_items, {})
+
+    def test_unschedule_tag(self):
+        self.clock.schedule_interval(self.callback, .1, 'a', tag='level')
+        self.clock.schedule_once(self.callback, .1, 'b', tag='level')
+        self.clock.schedule(self.callback, 'c', tag='level')
+        self.clock.schedule_once(self.callback, .1, 'd')
+        self.clock.unschedule_tag('level')
+        self.clock.unschedule_tag('missing')
+        self.tick(.1)
+        # The tag is not passed on to the function.
+        self.assertEqual(self.calls, [('d', .1)])
+        self.assertEqual(self.clock._tag_items, {})
+        self.assertEqual(self.clock._func_items, {})
+
+    def test_unschedule_after_call(self):
+        # One-shot items are forgotten once called.
+        self.clock.schedule_once(self.callback, .1, 'a', tag='level')
+        self.tick(.1)
+        self.assertEqual(self.clock._tag_items, {})
+        self.assertEqual(self.clock._func_items, {})
+        self.clock.schedule_interval(self.callback, .1, 'b', tag='level')
+        self.clock.unschedule_tag('level')
+        self.tick(.2)
+        self.assertEqual(self.calls, [('a', .1)])
+
+class TestScheduleBenchmark(unittest.TestCase):
+    n_items = 10000
+    n_frames = 200
+
+    def test_benchmark(self):
+        self.time = 0.
+        clk = clock.Clock(time_function=lambda: self.time)
+        def callback(dt):
+            pass
+
+        t = time.time()
+        handles = [clk.schedule_interval(callback, random.uniform(.05, 2))
+                   for i in range(self.n_items)]
+        schedule_time = time.time() - t
+
+        t = time.time()
+        for i in range(self.n_frames):
+            self.time += 1 / 60.
+            clk.tick()
+        tick_time = time.time() - t
+
+        t = time.time()
+        for handle in handles:
+            handle.cancel()
+        cancel_time = time.time() - t
+        self.assertEqual(clk.get_sleep_time(True), None)
+
+        for i in range(self.n_items):
+            clk.schedule_interval(callback, random.uniform(.05, 2),
+                                  tag=i % 100)
+        t = time.time()
+        for i in range(100):
+            clk.unschedule_tag(i)
+        unschedule_tag_time = time.time() - t
+        self.assertEqual(clk.get_sleep_time(True), None)
+
+        print >> sys.stderr, ('%d items: schedule %.3fs, %d frames %.3fs, '
+                              'cancel %.3fs, unschedule_tag %.3fs' % (
+                              self.n_items, schedule_time, self.n_frames,
+                              tick_time, cancel_time, unschedule_tag_time))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+
+'''Test the frame time statistics recorded by a clock, using a simulated time
+function.
+'''
+
+__docformat__ = 'restructuredtext'
+__version__ = '$Id$'
+
+import unittest
+
+from pyglet import clock
+
+__noninteractive = True
+
+class TestStats(unittest.TestCase):
+    def setUp(self):
+        self.time = 0.
+        self.clock = clock.Clock(time_function=lambda: self.time)
+
+    def tick(self, time):
+        self.time = time
+        self.clock.tick()
+
+    def work(self, dt, duration):
+        self.time += duration
+
+    def test_disabled(self):
+        self.assertEqual(self.clock.stats, None)
+        self.clock.schedule(self.work, .5)
+        self.tick(1.)
+        self.assertEqual(self.clock.stats, None)
+
+    def test_frame_times(self):
+        stats = self.clock.enable_stats(window_size=4)
+        for i in range(1, 7):
+            self.tick(self.time + i)
+        # The first tick starts the clock, and is not a frame.
+        self.assertEqual(stats.frames, 5)
+        self.assertEqual(stats.get_frame_times(), [3., 4., 5., 6.])
+        self.assertEqual(stats.get_average_frame_time(), 4.5)
+        self.assertEqual(stats.get_percentiles((0, 50, 75, 100)),
+                         (3., 4., 5., 6.))
+
+        stats.reset()
+        self.assertEqual(stats.get_frame_times(), [])
+        self.assertEqual(stats.get_percentiles(), (0., 0., 0.))
+
+    def test_callbacks(self):
+        stats = self.clock.enable_stats()
+        self.clock.schedule(self.work, .25)
+        self.clock.schedule_interval(self.work, 2., .5)
+        self.tick(1.)
+        self.tick(2.25)
+        self.tick(3.5)
+        self.assertEqual(stats.callbacks,
+                         {'TestStats.work': [4, 1.25, .5]})
+        self.assertEqual(stats.get_callback_times(), [.25, .75])
+        self.assertEqual(stats.get_frame_times(), [1.25, 1.25])
+
+    def test_idle(self):
+        stats = self.clock.enable_stats()
+        self.clock.schedule_once(self.work, 2., 0.)
+        self.tick(1.)
+        self.assertEqual(self.clock.get_sleep_time(True), 1.)
+        self.assertEqual(self.clock.get_sleep_time(False), 0.)
+        self.tick(2.)
+        self.assertEqual(stats.get_idle_times(), [1.])
+
+    def test_disable(self):
+        self.clock.enable_stats()
+        self.clock.disable_stats()
+        self.tick(1.)
+        self.tick(2.)
+        self.assertEqual(self.clock.stats, None)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,9 +2,11 @@
 # $Id:$
 
 import random
+import sys
+import time
 import unittest
 
-from pyglet.graphics import allocation
+from pyglet.graphics import allocation, vertexdomain
 
 __noninteractive = True
 
@@ -17,8 +19,8 @@ class Region(object):
         return 'Region(%r, %r)' % (self.start, self.size)
 
 class RegionAllocator(object):
-    def __init__(self, capacity):
-        self.allocator = allocation.Allocator(capacity)
+    def __init__(self, capacity, allocator_class=allocation.Allocator):
+        self.allocator = allocator_class(capacity)
         self.regions = []
 
     def check_region(self, region):
@@ -141,45 +143,50 @@ class RegionAllocator(object):
     capacity = property(lambda self: self.allocator.capacity)
 
 class TestAllocation(unittest.TestCase):
+    allocator_class = allocation.Allocator
+
     def setUp(self):
         global fixture
         fixture = self
 
+    def create_allocator(self, capacity):
+        return RegionAllocator(capacity, self.allocator_class)
+
     def test_alloc1(self):
         capacity = 10
-        allocator = RegionAllocator(capacity)
+        allocator = self.create_allocator(capacity)
         for i in range(capacity):
             allocator.alloc(1)
     
     def test_alloc2(self):
         capacity = 10
-        allocator = RegionAllocator(capacity)
+        allocator = self.create_allocator(capacity)
         for i in range(capacity//2):
             allocator.alloc(2)
 
     def test_alloc3(self):
         capacity = 10
-        allocator = RegionAllocator(capacity)
+        allocator = self.create_allocator(capacity)
         for i in range(capacity//3):
             allocator.alloc(3)
 
     def test_alloc_mix1_2(self):
         allocs = [1, 2] * 5
         capacity = sum(allocs)
-        allocator = RegionAllocator(capacity)
+        allocator = self.create_allocator(capacity)
         for alloc in allocs:
             allocator.alloc(alloc)
 
     def test_alloc_mix5_3_7(self):
         allocs = [5, 3, 7] * 5
         capacity = sum(allocs)
-        allocator = RegionAllocator(capacity)
+        allocator = self.create_allocator(capacity)
         for alloc in allocs:
             allocator.alloc(alloc)
 
     def test_dealloc_1_order_all(self):
         capacity = 10
-        allocator = RegionAllocator(capacity)
+        allocator = self.create_allocator(capacity)
         regions = []
         for i in range(capacity):
             regions.append(allocator.alloc(1))
@@ -189,7 +196,7 @@ class TestAllocation(unittest.TestCase):
 
     def test_dealloc_1_order(self):
         capacity = 15
-        allocator = RegionAllocator(capacity)
+        allocator = self.create_allocator(capacity)
         regions = []
         for i in range(10):
             regions.append(allocator.alloc(1))
@@ -198,7 +205,7 @@ class TestAllocation(unittest.TestCase):
 
     def test_dealloc_1_reverse_all(self):
         capacity = 10
-        allocator = RegionAllocator(capacity)
+        allocator = self.create_allocator(capacity)
         regions = []
         for i in range(capacity):
             regions.append(allocator.alloc(1))
@@ -208,7 +215,7 @@ class TestAllocation(unittest.TestCase):
  
     def test_dealloc_1_reverse(self):
         capacity = 15
-        allocator = RegionAllocator(capacity)
+        allocator = self.create_allocator(capacity)
         regions = []
         for i in range(10):
             regions.append(allocator.alloc(1))
@@ -218,7 +225,7 @@ class TestAllocation(unittest.TestCase):
     def test_dealloc_mix1_2_order(self):
         allocs = [1, 2] * 5
         capacity = sum(allocs)
-        allocator = RegionAllocator(capacity)
+        allocator = self.create_allocator(capacity)
         regions = []
         for alloc in allocs:
             regions.append(allocator.alloc(alloc))
@@ -229,7 +236,7 @@ class TestAllocation(unittest.TestCase):
     def test_dealloc_mix5_3_7_order(self):
         allocs = [5, 3, 7] * 5
         capacity = sum(allocs)
-        allocator = RegionAllocator(capacity)
+        allocator = self.create_allocator(capacity)
         regions = []
         for alloc in allocs:
             regions.append(allocator.alloc(alloc))
@@ -240,7 +247,7 @@ class TestAllocation(unittest.TestCase):
     def test_dealloc_1_outoforder(self):
         random.seed(1)
         capacity = 15
-        allocator = RegionAllocator(capacity)
+        allocator = self.create_allocator(capacity)
         regions = []
         for i in range(capacity):
             regions.append(allocator.alloc(1))
@@ -253,7 +260,7 @@ class TestAllocation(unittest.TestCase):
         random.seed(1)
         allocs = [1, 2] * 5
         capacity = sum(allocs)
-        allocator = RegionAllocator(capacity)
+        allocator = self.create_allocator(capacity)
         regions = []
         for alloc in allocs:
             regions.append(allocator.alloc(alloc))
@@ -266,7 +273,7 @@ class TestAllocation(unittest.TestCase):
         random.seed(1)
         allocs = [5, 3, 7] * 5
         capacity = sum(allocs)
-        allocator = RegionAllocator(capacity)
+        allocator = self.create_allocator(capacity)
         regions = []
         for alloc in allocs:
             regions.append(allocator.alloc(alloc))
@@ -302,7 +309,7 @@ class TestAllocation(unittest.TestCase):
         allocs = self.mixed_alloc_dealloc_list([1])
 
         capacity = sum([a for a in allocs if a > 0])
-        allocator=  RegionAllocator(capacity)
+        allocator = self.create_allocator(capacity)
         regions = []
         for alloc in allocs:
             if alloc > 0:
@@ -316,7 +323,7 @@ class TestAllocation(unittest.TestCase):
         allocs = self.mixed_alloc_dealloc_list([5, 3, 7], count=50)
 
         capacity = sum([a for a in allocs if a > 0])
-        allocator=  RegionAllocator(capacity)
+        allocator = self.create_allocator(capacity)
         regions = []
         for alloc in allocs:
             if alloc > 0:
@@ -327,7 +334,7 @@ class TestAllocation(unittest.TestCase):
         self.assertTrue(allocator.get_free_size() == allocator.capacity)
 
     def test_realloc1_2(self):
-        allocator = RegionAllocator(30)
+        allocator = self.create_allocator(30)
         regions = []
         for i in range(10):
             regions.append(allocator.alloc(1))
@@ -337,7 +344,7 @@ class TestAllocation(unittest.TestCase):
             allocator.dealloc(region)
 
     def test_realloc2_1(self):
-        allocator = RegionAllocator(20)
+        allocator = self.create_allocator(20)
         regions = []
         for i in range(10):
             regions.append(allocator.alloc(2))
@@ -348,7 +355,7 @@ class TestAllocation(unittest.TestCase):
         self.assertTrue(allocator.get_free_size() == allocator.capacity)
 
     def test_realloc_2_1_2(self):
-        allocator = RegionAllocator(30)
+        allocator = self.create_allocator(30)
         regions = []
         for i in range(10):
             regions.append(allocator.alloc(2))
@@ -361,7 +368,7 @@ class TestAllocation(unittest.TestCase):
         self.assertTrue(allocator.get_free_size() == allocator.capacity)
 
     def test_realloc_3_1_5_4_6(self):
-        allocator = RegionAllocator(1000)
+        allocator = self.create_allocator(1000)
         regions = []
         for i in range(10):
             regions.append(allocator.alloc(3))
@@ -378,7 +385,7 @@ class TestAllocation(unittest.TestCase):
         self.assertTrue(allocator.get_free_size() == allocator.capacity)
 
     def test_realloc_3_1_5_4_6_sequential(self):
-        allocator = RegionAllocator(1000)
+        allocator = self.create_allocator(1000)
         regions = []
         for i in range(10):
             regions.append(allocator.alloc(3))
@@ -392,7 +399,7 @@ class TestAllocation(unittest.TestCase):
         self.assertTrue(allocator.get_free_size() == allocator.capacity)
 
     def test_resize1(self):
-        allocator = RegionAllocator(1)
+        allocator = self.create_allocator(1)
         regions = []
         for i in range(10):
             regions.append(allocator.force_alloc(3))
@@ -402,7 +409,7 @@ class TestAllocation(unittest.TestCase):
 
     def test_mix_resize(self):
         # Try a bunch of stuff.  There is not much method to this madness.
-        allocator = RegionAllocator(1)
+        allocator = self.create_allocator(1)
         regions = []
         for i in range(10):
             regions.append(allocator.force_alloc(3))
@@ -424,5 +431,100 @@ class TestAllocation(unittest.TestCase):
             allocator.dealloc(region) 
         self.assertTrue(allocator.get_free_size() == allocator.capacity)
 
+class TestFreeListAllocation(TestAllocation):
+    allocator_class = allocation.FreeListAllocator
+
+    def test_best_fit(self):
+        allocator = allocation.FreeListAllocator(40)
+        starts = [allocator.alloc(4) for i in range(10)]
+        self.assertEqual(starts, range(0, 40, 4))
+        for i in (0, 1, 7, 2, 5):
+            allocator.dealloc(starts[i], 4)
+        # Free blocks: 0 (size 12), 20 (size 4) and 28 (size 4).
+        self.assertEqual(allocator.alloc(4), 20)
+        allocator.dealloc(20, 4)
+        self.assertEqual(allocator.alloc(4), 20)
+        self.assertEqual(allocator.alloc(4), 28)
+        self.assertEqual(allocator.alloc(4), 0)
+        self.assertEqual(allocator.alloc(3), 4)
+        allocator.dealloc(28, 4)
+        self.assertEqual(allocator.alloc(2), 28)
+        self.assertEqual(allocator.alloc(5), 7)
+        self.assertRaises(allocation.AllocatorMemoryException,
+                          allocator.alloc, 3)
+
+class TestAllocatorOption(unittest.TestCase):
+    def test_names(self):
+        self.assertTrue(vertexdomain._get_allocator_class('list') is
+                        allocation.Allocator)
+        self.assertTrue(vertexdomain._get_allocator_class('freelist') is
+                        allocation.FreeListAllocator)
+
+    def test_invalid(self):
+        try:
+            vertexdomain._get_allocator_class('free-list')
+        except ValueError, e:
+            self.assertTrue("'freelist', 'list'" in str(e))
+        else:
+            self.fail('ValueError not raised')
+
+class TestAllocationChurn(unittest.TestCase):
+    '''Compare allocators under sprite-like churn: many equally sized
+    regions, randomly deleted and recreated, with the allocated regions
+    fetched for drawing after every few replacements.
+    '''
+    n_regions = 10000
+    n_operations = 20000
+    frame_operations = 10
+    region_size = 4
+
+    def churn(self, allocator_class):
+        random.seed(1)
+        allocator = allocator_class(1)
+        size = self.region_size
+
+        def alloc():
+            try:
+                return allocator.alloc(size)
+            except allocation.AllocatorMemoryException, e:
+                allocator.set_capacity(e.requested_capacity * 2)
+                return allocator.alloc(size)
+
+        live = [alloc() for i in range(self.n_regions)]
+        t = time.time()
+        # Fragment the buffer by freeing a random half of the regions, then
+        # replace random regions.
+        random.shuffle(live)
+        for start in live[self.n_regions // 2:]:
+            allocator.dealloc(start, size)
+        del live[self.n_regions // 2:]
+        for i in range(self.n_operations):
+            j = random.randrange(len(live))
+            allocator.dealloc(live[j], size)
+            live[j] = alloc()
+            if i % self.frame_operations == 0:
+                # As drawn by VertexDomain._get_draw_regions
+                allocator.get_allocated_regions()
+        elapsed = time.time() - t
+
+        self.assertEqual(allocator.get_free_size(),
+                         allocator.capacity - size * len(live))
+        starts, sizes = allocator.get_allocated_regions()
+        self.assertEqual(sum(sizes), size * len(live))
+        for start in live:
+            allocator.dealloc(start, size)
+        self.assertEqual(allocator.get_free_size(), allocator.capacity)
+        return elapsed
+
+    def test_churn(self):
+        list_time = self.churn(allocation.Allocator)
+        free_list_time = self.churn(allocation.FreeListAllocator)
+        print >> sys.stderr, \
+            '\n%d regions, %d dealloc/alloc pairs, %d draws: ' \
+            'Allocator %.3fs, FreeListAllocator %.3fs' % (
+                self.n_regions, self.n_operations,
+                self.n_operations // self.frame_operations,
+                list_time, free_list_time)
+
 if __name__ == '__main__':
     unittest.main()
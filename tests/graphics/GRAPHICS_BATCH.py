@@ -0,0 +1,276 @@
+#!/usr/bin/python
+# $Id:$
+
+'''Test batch operations that do not require drawing.
+'''
+
+import array
+import unittest
+
+import pyglet
+from pyglet.gl import *
+from pyglet.graphics import vertexattribute, vertexdomain
+
+__noninteractive = True
+
+class TestBatch(unittest.TestCase):
+    def test_add_many(self):
+        n = 50
+        batch = pyglet.graphics.Batch()
+        vertices = array.array('f', range(8 * n))
+        colors = [i % 256 for i in range(16 * n)]
+        vertex_lists = batch.add_many(4, n, GL_QUADS, None,
+                                      ('v2f/none', vertices),
+                                      ('c4B/none', colors))
+        self.assertEqual(len(vertex_lists), n)
+        for i, vertex_list in enumerate(vertex_lists):
+            self.assertEqual(vertex_list.get_size(), 4)
+            self.assertEqual(list(vertex_list.vertices),
+                             list(vertices[i * 8:(i + 1) * 8]))
+            self.assertEqual(list(vertex_list.colors),
+                             colors[i * 16:(i + 1) * 16])
+
+        # Lists can be deleted individually.
+        domain = vertex_lists[0].domain
+        for vertex_list in vertex_lists[::2]:
+            vertex_list.delete()
+        self.assertEqual(domain.allocator.get_free_size(),
+                         domain.allocator.capacity - 4 * (n // 2))
+
+    def test_add_many_none(self):
+        batch = pyglet.graphics.Batch()
+        self.assertEqual(
+            batch.add_many(4, 0, GL_QUADS, None, ('v2f/none', ())), [])
+
+    def test_vertex_format(self):
+        batch = pyglet.graphics.Batch()
+        vertex_format = vertexdomain.VertexFormat('v2f/none', 'c4B/none')
+        compiled = batch.add(2, GL_LINES, None, vertex_format,
+                             None, (255, 0, 0, 255) * 2)
+        parsed = batch.add(2, GL_LINES, None,
+                           'v2f/none', ('c4B/none', (255, 0, 0, 255) * 2))
+        self.assertTrue(compiled.domain is parsed.domain)
+        self.assertEqual(list(compiled.colors), list(parsed.colors))
+        self.assertEqual(vertex_format.names, ('vertices', 'colors'))
+        self.assertEqual(vertex_format.sizes, (8, 4))
+
+    def test_vertex_format_cache(self):
+        formats = ('v2f/none', 'c4B/none')
+        vertex_format = vertexdomain.get_vertex_format(formats)
+        self.assertTrue(vertexdomain.get_vertex_format(formats) is
+                        vertex_format)
+        for i in range(vertexdomain._vertex_format_cache_size):
+            # Keep the first format in use while filling the cache.
+            vertexdomain.get_vertex_format(formats)
+            vertexdomain.get_vertex_format(('v%df' % (i % 3 + 2),
+                                            '%dg1f' % i))
+        self.assertTrue(vertexdomain.get_vertex_format(formats) is
+                        vertex_format)
+        self.assertTrue(len(vertexdomain._vertex_format_cache) <=
+                        vertexdomain._vertex_format_cache_size)
+
+    @unittest.skipIf(vertexattribute.numpy is None, 'NumPy not available')
+    def test_attribute_view(self):
+        batch = pyglet.graphics.Batch()
+        vertex_lists = batch.add_many(4, 3, GL_QUADS, None,
+                                      ('v2f/none', range(24)),
+                                      ('c4B/static', (1,) * 48),
+                                      ('t3f/static', (0.,) * 36))
+        vertices = vertex_lists[1].get_attribute_view('vertices')
+        self.assertEqual(vertices.shape, (4, 2))
+        vertices += 100
+        self.assertEqual(list(vertex_lists[1].vertices), range(108, 116))
+        self.assertEqual(list(vertex_lists[0].vertices), range(8))
+
+        # Interleaved
+        tex_coords = vertex_lists[2].get_attribute_view('tex_coords')
+        tex_coords[:, 2] = 0.5
+        self.assertEqual(list(vertex_lists[2].tex_coords),
+                         [0., 0., 0.5] * 4)
+        self.assertEqual(list(vertex_lists[1].tex_coords), [0.] * 12)
+        self.assertEqual(list(vertex_lists[2].colors), [1] * 16)
+
+        colors = vertex_lists[0].domain.get_attribute_array('colors')
+        colors[4:8] = (9, 8, 7, 6)
+        self.assertEqual(list(vertex_lists[1].colors), [9, 8, 7, 6] * 4)
+
+    def test_attribute_view_no_numpy(self):
+        numpy = vertexattribute.numpy
+        vertexattribute.numpy = None
+        try:
+            batch = pyglet.graphics.Batch()
+            vertex_lists = batch.add_many(4, 2, GL_QUADS, None,
+                                          ('v2f/none', range(16)),
+                                          ('c4B/none', (1,) * 32),
+                                          ('t3f/static', (0.,) * 24),
+                                          ('n3f/static', (0.,) * 24))
+            colors = vertex_lists[1].get_attribute_view('colors')
+            self.assertEqual(len(colors), 16)
+            colors[4:8] = (9, 8, 7, 6)
+            self.assertEqual(colors[5], 8)
+            self.assertEqual(list(vertex_lists[1].colors),
+                             [1] * 4 + [9, 8, 7, 6] + [1] * 8)
+            self.assertEqual(list(vertex_lists[0].colors), [1] * 16)
+
+            vertices = vertex_lists[1].get_attribute_view('vertices')
+            self.assertEqual(vertices[3], 11.)
+            self.assertEqual(list(vertices), range(8, 16))
+
+            # Interleaved
+            tex_coords = vertex_lists[1].get_attribute_view('tex_coords')
+            self.assertEqual(len(tex_coords), 12)
+            tex_coords[3:6] = (0.5, 0.25, 1.)
+            self.assertEqual(tex_coords[4], 0.25)
+            self.assertEqual(list(vertex_lists[1].tex_coords),
+                             [0.] * 3 + [0.5, 0.25, 1.] + [0.] * 6)
+            self.assertEqual(list(vertex_lists[0].tex_coords), [0.] * 12)
+            self.assertEqual(list(vertex_lists[1].normals), [0.] * 12)
+        finally:
+            vertexattribute.numpy = numpy
+
+    def test_draw_regions(self):
+        batch = pyglet.graphics.Batch()
+        lists = [batch.add(3, GL_TRIANGLES, None, 'v2f/none')
+                 for i in range(3)]
+        domain = lists[0].domain
+
+        def regions():
+            primcount, starts, sizes, _ = domain._get_draw_regions()
+            return list(starts[:primcount]), list(sizes[:primcount])
+
+        self.assertEqual(regions(), ([0], [9]))
+        self.assertTrue(domain._get_draw_regions() is
+                        domain._get_draw_regions())
+        lists[1].delete()
+        self.assertEqual(regions(), ([0, 6], [3, 3]))
+        lists[2].resize(5)
+        self.assertEqual(regions(), ([0, 6], [3, 5]))
+        lists.append(batch.add(3, GL_TRIANGLES, None, 'v2f/none'))
+        self.assertEqual(regions(), ([0], [11]))
+        batch.compact()
+        self.assertEqual(regions(), ([0], [11]))
+
+    def test_client_state(self):
+        batch = pyglet.graphics.Batch()
+        a = batch.add(3, GL_TRIANGLES, None, 'v2f/none', 'c4B/none')
+        b = batch.add(4, GL_QUADS, None, 'c3B/none', 'v3f/none')
+        c = batch.add(4, GL_QUADS, None, 'v2f/none')
+        self.assertEqual(a.domain._client_state, b.domain._client_state)
+        self.assertNotEqual(a.domain._client_state, c.domain._client_state)
+        d = batch.add(4, GL_QUADS, None, 'v2f/none', '0t2f/none')
+        self.assertEqual(d.domain._client_state, None)
+
+    def test_draw_subset(self):
+        batch = pyglet.graphics.Batch()
+        group = pyglet.graphics.OrderedGroup(0)
+        empty_group = pyglet.graphics.OrderedGroup(1)
+        triangles = [batch.add(3, GL_TRIANGLES, group, 'v2f/none')
+                     for i in range(10)]
+        points = [batch.add(1, GL_POINTS, group, 'v2f/none')
+                  for i in range(10)]
+        quads = [batch.add(4, GL_QUADS, empty_group, 'v2f/none')
+                 for i in range(10)]
+
+        commands = []
+        draw_domains = vertexdomain.draw_domains
+        vertexdomain.draw_domains = commands.extend
+        try:
+            batch.draw_subset(triangles[::3] + points[:2] + triangles[1:2])
+        finally:
+            vertexdomain.draw_domains = draw_domains
+
+        self.assertEqual(len(commands), 2)
+        lists = {}
+        for domain, mode, vertex_lists in commands:
+            lists[mode] = vertex_lists
+            self.assertTrue(domain is vertex_lists[0].domain)
+        self.assertEqual(lists[GL_TRIANGLES], triangles[::3] + triangles[1:2])
+        self.assertEqual(lists[GL_POINTS], points[:2])
+
+class FakeTexture(object):
+    def __init__(self, id, target=GL_TEXTURE_2D):
+        self.id = id
+        self.target = target
+
+class BlendTextureGroup(pyglet.graphics.TextureGroup):
+    def __init__(self, texture, blend, parent=None):
+        super(BlendTextureGroup, self).__init__(texture, parent)
+        self.blend = blend
+
+    def get_state(self):
+        return {'texture': (self.texture.target, self.texture.id),
+                'blend': self.blend}
+
+    def __hash__(self):
+        return hash((self.texture.id, self.blend))
+
+    def __eq__(self, other):
+        return (self.__class__ is other.__class__ and
+                self.texture.id == other.texture.id and
+                self.blend == other.blend)
+
+class TestGroupState(unittest.TestCase):
+    def create_batch(self, groups, diff):
+        batch = pyglet.graphics.Batch()
+        batch.diff_group_state = diff
+        for group in groups:
+            batch.add(3, GL_TRIANGLES, group, 'v2f/none')
+        batch._update_draw_list()
+        return batch
+
+    def test_transition(self):
+        a = BlendTextureGroup(FakeTexture(1), (GL_ONE, GL_ZERO))
+        b = BlendTextureGroup(FakeTexture(2), (GL_ONE, GL_ZERO))
+        c = BlendTextureGroup(FakeTexture(1), (GL_SRC_ALPHA, GL_ZERO))
+        self.assertEqual(len(pyglet.graphics._get_state_transition(a, a)), 0)
+        self.assertEqual(len(pyglet.graphics._get_state_transition(a, b)), 1)
+        self.assertEqual(len(pyglet.graphics._get_state_transition(b, c)), 2)
+        t = pyglet.graphics.TextureGroup(FakeTexture(1))
+        self.assertEqual(pyglet.graphics._get_state_transition(a, t), None)
+        o = pyglet.graphics.OrderedGroup(0)
+        self.assertEqual(pyglet.graphics._get_state_transition(o, o), None)
+
+    def test_diff(self):
+        blends = [(GL_ONE, GL_ZERO), (GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)]
+        groups = [BlendTextureGroup(FakeTexture(i % 3), blends[i % 2])
+                  for i in range(6)]
+        batch = self.create_batch(groups, False)
+        self.assertEqual(batch._state_changes, 12)
+        self.assertEqual(batch._state_elided, 0)
+
+        batch = self.create_batch(groups, True)
+        # Sorted by texture: 3 textures each drawn with 2 blend functions.
+        children = batch.top_groups
+        self.assertEqual([g.texture.id for g in children],
+                         [0, 0, 1, 1, 2, 2])
+        # 5 transitions elide 10 calls: 3 change the blend function, 2
+        # change the texture and blend function.
+        self.assertEqual(batch._state_elided, 10)
+        self.assertEqual(batch._state_changes, 2 + 3 + 2 * 2)
+
+    def test_ordered(self):
+        parent = pyglet.graphics.Group()
+        groups = [pyglet.graphics.OrderedGroup(0, parent),
+                  BlendTextureGroup(FakeTexture(2), (GL_ONE, GL_ZERO), parent),
+                  BlendTextureGroup(FakeTexture(1), (GL_ONE, GL_ZERO), parent),
+                  pyglet.graphics.OrderedGroup(1, parent)]
+        batch = self.create_batch(groups, True)
+        children = batch.group_children[parent]
+        self.assertTrue(children.index(groups[0]) <
+                        children.index(groups[3]))
+
+    def test_counters(self):
+        counters = pyglet.graphics.state_counters
+        batch = pyglet.graphics.Batch()
+        counters.reset()
+        batch._state_changes = 5
+        batch._state_elided = 2
+        batch._draw_list = []
+        batch.draw()
+        batch.draw()
+        self.assertEqual((counters.changes, counters.elided), (10, 4))
+        counters.reset()
+        self.assertEqual((counters.changes, counters.elided), (0, 0))
+
+if __name__ == '__main__':
+    unittest.main()
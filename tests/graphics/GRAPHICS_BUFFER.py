@@ -0,0 +1,56 @@
+#!/usr/bin/python
+# $Id:$
+
+'''Test buffer bookkeeping that does not require an OpenGL context.
+'''
+
+import unittest
+
+from pyglet.graphics import vertexbuffer
+
+__noninteractive = True
+
+class TestDirtyRanges(unittest.TestCase):
+    def coalesce(self, ranges, gap=0, size=1000):
+        return vertexbuffer._coalesce_ranges(list(ranges), gap, size)
+
+    def test_single(self):
+        self.assertEqual(self.coalesce([(10, 20)]), [(10, 20)])
+
+    def test_disjoint(self):
+        self.assertEqual(self.coalesce([(900, 910), (0, 8)]),
+                         [(0, 8), (900, 910)])
+
+    def test_overlapping(self):
+        self.assertEqual(self.coalesce([(10, 20), (0, 8), (15, 30), (8, 9)]),
+                         [(0, 9), (10, 30)])
+
+    def test_gap(self):
+        ranges = [(0, 8), (16, 24), (100, 108)]
+        self.assertEqual(self.coalesce(ranges, gap=8),
+                         [(0, 24), (100, 108)])
+        self.assertEqual(self.coalesce(ranges, gap=100), [(0, 108)])
+
+    def test_clip(self):
+        self.assertEqual(self.coalesce([(0, 8), (90, 120), (200, 300)],
+                                       size=100),
+                         [(0, 8), (90, 100)])
+
+    def test_scattered(self):
+        # Writes too far apart to merge collapse to their span, instead of
+        # being sorted again on each later write.  The buffer is not created,
+        # as that would need a context.
+        buffer = vertexbuffer.MappableVertexBufferObject.__new__(
+            vertexbuffer.MappableVertexBufferObject)
+        buffer.size = 10000000
+        buffer._dirty = []
+        gap = buffer.dirty_merge_gap + 8
+        n = vertexbuffer._max_dirty_ranges + 1
+        for i in range(n):
+            buffer._invalidate_range(i * gap, i * gap + 8)
+        self.assertEqual(buffer._dirty, [(0, (n - 1) * gap + 8)])
+        buffer._invalidate_range(0, 8)
+        self.assertEqual(len(buffer._dirty), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+#!/usr/bin/python
+# $Id:$
+
+import random
+import unittest
+
+import pyglet
+from pyglet.gl import *
+from pyglet.graphics import vertexdomain
+
+__noninteractive = True
+
+class TestCompact(unittest.TestCase):
+    n_lists = 100
+    n_deleted = 80
+
+    def create_lists(self, domain, indexed):
+        vertex_lists = []
+        for i in range(self.n_lists):
+            if indexed:
+                vertex_list = domain.create(4, 6)
+                vertex_list.indices = [vertex_list.start + j
+                                       for j in (0, 1, 2, 0, 2, 3)]
+            else:
+                vertex_list = domain.create(4)
+            vertex_list.vertices = [i] * 8
+            vertex_list.colors = [i] * 16
+            vertex_lists.append(vertex_list)
+
+        random.seed(1)
+        random.shuffle(vertex_lists)
+        for vertex_list in vertex_lists[:self.n_deleted]:
+            vertex_list.delete()
+        return vertex_lists[self.n_deleted:]
+
+    def check_lists(self, vertex_lists, indexed):
+        for vertex_list in vertex_lists:
+            i = int(vertex_list.vertices[0])
+            self.assertEqual(list(vertex_list.vertices), [i] * 8)
+            self.assertEqual(list(vertex_list.colors), [i] * 16)
+            if indexed:
+                self.assertEqual(list(vertex_list.indices),
+                                 [vertex_list.start + j
+                                  for j in (0, 1, 2, 0, 2, 3)])
+
+    def check_compact(self, domain, indexed):
+        vertex_lists = self.create_lists(domain, indexed)
+        capacity = domain.allocator.capacity
+        self.assertTrue(domain._needs_compact(0.5))
+
+        domain.compact()
+
+        self.assertTrue(domain.allocator.capacity < capacity)
+        self.assertEqual(domain.allocator.get_allocated_regions(),
+                         ([0], [4 * len(vertex_lists)]))
+        self.assertEqual(domain.allocator.get_fragmentation(), 0.)
+        self.check_lists(vertex_lists, indexed)
+
+        # Domain remains usable after compaction.
+        vertex_lists[0].delete()
+        vertex_lists = vertex_lists[1:] + \
+            self.create_lists(domain, indexed)
+        self.check_lists(vertex_lists, indexed)
+
+    def test_compact(self):
+        domain = vertexdomain.create_domain('v2f/none', 'c4B/none')
+        self.check_compact(domain, False)
+
+    def test_compact_indexed(self):
+        domain = vertexdomain.create_indexed_domain('v2f/none', 'c4B/none')
+        self.check_compact(domain, True)
+
+    def test_batch_auto_compact(self):
+        batch = pyglet.graphics.Batch()
+        batch.compact_threshold = 0.5
+        vertex_lists = [batch.add(4, GL_QUADS, None, 'v2f/none', 'c4B/none')
+                        for i in range(self.n_lists)]
+        domain = vertex_lists[0].domain
+        for vertex_list in vertex_lists[::2]:
+            vertex_list.delete()
+        batch._auto_compact()
+        self.assertEqual(domain.allocator.get_allocated_regions(),
+                         ([0], [4 * (self.n_lists // 2)]))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,205 @@
+#!/usr/bin/python
+# $Id:$
+
+'''Test the spatial hash and culling of vertex lists outside the viewport.
+Does not require an OpenGL context.
+'''
+
+import random
+import unittest
+
+import pyglet
+from pyglet.gl import *
+from pyglet.graphics import spatialhash, vertexdomain
+
+__noninteractive = True
+
+class TestSpatialHash(unittest.TestCase):
+    def test_query(self):
+        sh = spatialhash.SpatialHash(10)
+        sh.set('a', (0, 0, 5, 5))
+        sh.set('b', (8, 8, 25, 12))
+        sh.set('c', (-15, -15, -11, -11))
+        sh.set('d', None)
+        self.assertEqual(len(sh), 4)
+        self.assertTrue('d' in sh)
+        self.assertEqual(sh.query(0, 0, 100, 100), set(['a', 'b']))
+        self.assertEqual(sh.query(6, 6, 7, 7), set())
+        self.assertEqual(sh.query(20, 0, 30, 10), set(['b']))
+        self.assertEqual(sh.query(-100, -100, 100, 100), set(['a', 'b', 'c']))
+
+        sh.set('a', (1, 1, 6, 6))
+        self.assertEqual(sh.query(6, 6, 7, 7), set(['a']))
+        sh.set('a', (50, 50, 60, 60))
+        self.assertEqual(sh.query(0, 0, 10, 10), set(['b']))
+        sh.remove('b')
+        sh.remove('d')
+        self.assertEqual(sh.query(-100, -100, 100, 100), set(['a', 'c']))
+        sh.remove('a')
+        sh.remove('c')
+        self.assertEqual(sh._cells, {})
+
+    def test_random(self):
+        sh = spatialhash.SpatialHash(16)
+        rnd = random.Random(1)
+        bounds = {}
+        for i in range(300):
+            item = rnd.randrange(100)
+            x, y = rnd.uniform(-200, 200), rnd.uniform(-200, 200)
+            b = (x, y, x + rnd.uniform(0, 50), y + rnd.uniform(0, 50))
+            bounds[item] = b
+            sh.set(item, b)
+            if i % 10 == 0:
+                del bounds[item]
+                sh.remove(item)
+            qx, qy = rnd.uniform(-200, 200), rnd.uniform(-200, 200)
+            q = (qx, qy, qx + rnd.uniform(0, 100), qy + rnd.uniform(0, 100))
+            expected = set(k for k, (x1, y1, x2, y2) in bounds.items()
+                           if x1 <= q[2] and x2 >= q[0] and
+                              y1 <= q[3] and y2 >= q[1])
+            self.assertEqual(sh.query(*q), expected)
+
+class TestDrawRanges(unittest.TestCase):
+    def test_merge(self):
+        regions = [(8, 4), (0, 4), (4, 4), (16, 4)]
+        self.assertEqual(vertexdomain._get_draw_ranges(GL_QUADS, regions),
+                         [(0, 12), (16, 4)])
+
+    def test_strip(self):
+        regions = [(4, 4), (0, 4)]
+        self.assertEqual(
+            vertexdomain._get_draw_ranges(GL_TRIANGLE_STRIP, regions),
+            [(0, 4), (4, 4)])
+
+class TestBatchCulling(unittest.TestCase):
+    def draw(self, batch, viewport):
+        commands = []
+        draw_domains = vertexdomain.draw_domains
+        vertexdomain.draw_domains = commands.extend
+        try:
+            batch.draw(viewport)
+        finally:
+            vertexdomain.draw_domains = draw_domains
+        return commands
+
+    def test_cull(self):
+        batch = pyglet.graphics.Batch()
+        batch.enable_culling(100)
+        group = pyglet.graphics.OrderedGroup(0)
+        quads = [batch.add(4, GL_QUADS, group, 'v2f/none')
+                 for i in range(10)]
+        for i, quad in enumerate(quads):
+            batch.set_bounds(quad, (i * 50, 0, i * 50 + 40, 40))
+        lines = batch.add(2, GL_LINES, None, 'v2f/none')
+
+        commands = self.draw(batch, (0, 0, 120, 100))
+        lists = dict((mode, vertex_lists)
+                     for domain, mode, vertex_lists in commands)
+        self.assertEqual(sorted(lists[GL_QUADS]), sorted(quads[:3]))
+        self.assertEqual(lists[GL_LINES], None)
+
+        # The group of culled vertex lists is not drawn.
+        commands = self.draw(batch, (1000, 0, 100, 100))
+        self.assertEqual([mode for _, mode, _ in commands], [GL_LINES])
+
+        # Vertex lists without bounds are always drawn.
+        batch.clear_bounds(quads[9])
+        commands = self.draw(batch, (210, 0, 10, 10))
+        lists = dict((mode, vertex_lists)
+                     for domain, mode, vertex_lists in commands)
+        self.assertEqual(sorted(lists[GL_QUADS]),
+                         sorted(quads[4:5] + quads[9:]))
+
+        # Without a viewport everything is drawn.
+        commands = self.draw(batch, None)
+        self.assertEqual([lists for _, _, lists in commands], [None, None])
+
+    def test_migrate(self):
+        batch = pyglet.graphics.Batch()
+        other = pyglet.graphics.Batch()
+        group = pyglet.graphics.OrderedGroup(1)
+        quad = batch.add(4, GL_QUADS, None, 'v2f/none')
+        batch.set_bounds(quad, (0, 0, 10, 10))
+        batch.migrate(quad, GL_QUADS, group, batch)
+        self.assertEqual(batch._bounded_domains, {quad.domain: 1})
+        commands = self.draw(batch, (0, 0, 10, 10))
+        self.assertEqual(commands, [(quad.domain, GL_QUADS, [quad])])
+
+        batch.migrate(quad, GL_QUADS, group, other)
+        self.assertEqual(batch._bounded_domains, {})
+        self.assertEqual(len(batch.spatial_hash), 0)
+
+class StateGroup(pyglet.graphics.Group):
+    # Declares a texture and blend state, recording each state change
+    # instead of making it.
+    def __init__(self, log, texture, blend):
+        super(StateGroup, self).__init__()
+        self.log = log
+        self.texture = texture
+        self.blend = blend
+
+    def get_state(self):
+        return {'texture': (GL_TEXTURE_2D, self.texture), 'blend': self.blend}
+
+    def set_state(self):
+        self.log.append(('set', self.texture, self.blend))
+
+    def unset_state(self):
+        self.log.append(('unset', self.texture, self.blend))
+
+class TestCulledGroupState(unittest.TestCase):
+    def setUp(self):
+        self.log = []
+        self.group_states = pyglet.graphics._group_states
+        pyglet.graphics._group_states = [
+            (key, self.record('set', key), self.record('unset', key),
+             self.record('switch', key))
+            for key in ('texture', 'blend')]
+        self.draw_domains = vertexdomain.draw_domains
+        vertexdomain.draw_domains = lambda commands: None
+
+    def tearDown(self):
+        pyglet.graphics._group_states = self.group_states
+        vertexdomain.draw_domains = self.draw_domains
+
+    def record(self, change, key):
+        return lambda *values: self.log.append((change, key) + values)
+
+    def draw(self, draw):
+        counters = pyglet.graphics.state_counters
+        counters.reset()
+        del self.log[:]
+        draw()
+        return (counters.changes, counters.elided), list(self.log)
+
+    def test_diff(self):
+        batch = pyglet.graphics.Batch()
+        batch.diff_group_state = True
+        batch.enable_culling(100)
+        vertex_lists = []
+        for i in range(6):
+            group = StateGroup(self.log, i % 3, (GL_ONE, i % 2))
+            vertex_list = batch.add(4, GL_QUADS, group, 'v2f/none')
+            batch.set_bounds(vertex_list, (i * 50, 0, i * 50 + 40, 40))
+            vertex_lists.append(vertex_list)
+
+        full = self.draw(batch.draw)
+        self.assertEqual(full[0], (2 + 3 + 2 * 2, 10))
+        self.assertEqual(self.draw(lambda: batch.draw((0, 0, 1000, 100))),
+                         full)
+        self.assertEqual(
+            self.draw(lambda: batch.draw_subset(vertex_lists)), full)
+
+        # Groups with no visible vertex lists are left out of the
+        # transitions.
+        (changes, elided), log = self.draw(
+            lambda: batch.draw((0, 0, 140, 100)))
+        self.assertEqual(elided, 4)
+        self.assertEqual(len([l for l in log if l[0] in ('set', 'unset')]),
+                         2)
+        self.assertEqual(
+            self.draw(lambda: batch.draw_subset(vertex_lists[:3])),
+            ((changes, elided), log))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+#!/usr/bin/python
+# $Id:$
+
+'''Test the shared quad index buffer and quad domains, which draw quads as
+indexed triangles.  Does not require an OpenGL context; drawing calls are
+recorded rather than made.
+'''
+
+import ctypes
+import unittest
+
+import pyglet
+from pyglet.gl import *
+from pyglet.graphics import vertexdomain
+
+__noninteractive = True
+
+class TestQuadIndexBuffer(unittest.TestCase):
+    def get_indices(self, buffer):
+        count = buffer.buffer.size // buffer.element_size
+        return list((GLuint * count).from_address(buffer.buffer.ptr))
+
+    def test_reserve(self):
+        buffer = vertexdomain.QuadIndexBuffer()
+        buffer.reserve(8)
+        self.assertEqual(buffer.capacity, 8)
+        self.assertEqual(self.get_indices(buffer),
+                         [0, 1, 2, 0, 2, 3, 4, 5, 6, 4, 6, 7])
+        old = buffer.buffer
+        buffer.reserve(4)
+        self.assertTrue(buffer.buffer is old)
+        buffer.reserve(20)
+        self.assertEqual(buffer.capacity, 32)
+        indices = self.get_indices(buffer)
+        self.assertEqual(len(indices), 48)
+        self.assertEqual(indices[-6:], [28, 29, 30, 28, 30, 31])
+
+class GLInfo(object):
+    def have_version(self, major, minor=0, release=0):
+        return True
+
+class TestQuadDomain(unittest.TestCase):
+    def setUp(self):
+        self.gl_info = vertexdomain.gl_info
+        vertexdomain.gl_info = GLInfo()
+        self.calls = []
+        self.saved = {}
+        for name in ('glDrawElements', 'glMultiDrawElements'):
+            self.saved[name] = getattr(vertexdomain, name)
+            setattr(vertexdomain, name,
+                    (lambda name: lambda *args:
+                        self.calls.append((name,) + args))(name))
+
+    def tearDown(self):
+        vertexdomain.gl_info = self.gl_info
+        for name, func in self.saved.items():
+            setattr(vertexdomain, name, func)
+
+    def create_domain(self):
+        batch = pyglet.graphics.Batch()
+        batch.quads_as_triangles = True
+        lists = [batch.add(4 * n, GL_QUADS, None, 'v2f/none')
+                 for n in (1, 2, 1)]
+        domain = lists[0].domain
+        self.assertTrue(isinstance(domain, vertexdomain.QuadDomain))
+        domain._quad_indices = vertexdomain.QuadIndexBuffer()
+        domain._quad_indices.reserve(domain.allocator.capacity)
+        return batch, domain, lists
+
+    def test_batch(self):
+        batch = pyglet.graphics.Batch()
+        vertex_list = batch.add(4, GL_QUADS, None, 'v2f/none')
+        self.assertFalse(isinstance(vertex_list.domain,
+                                    vertexdomain.QuadDomain))
+        batch.quads_as_triangles = True
+        vertex_list = batch.add(4, GL_QUADS, None, 'v2f/none', 'c3B/none')
+        self.assertTrue(isinstance(vertex_list.domain,
+                                   vertexdomain.QuadDomain))
+        vertex_list = batch.add(3, GL_TRIANGLES, None, 'v2f/none')
+        self.assertFalse(isinstance(vertex_list.domain,
+                                    vertexdomain.QuadDomain))
+        self.assertRaises(AssertionError,
+                          batch.add, 6, GL_QUADS, None, 'v3f/none')
+
+    def test_draw(self):
+        batch, domain, lists = self.create_domain()
+        ptr = domain._quad_indices.buffer.ptr
+        domain._draw(GL_QUADS)
+        self.assertEqual(len(self.calls), 1)
+        name, mode, count, gl_type, offset = self.calls[0]
+        self.assertEqual((name, mode, count, gl_type),
+                         ('glDrawElements', GL_TRIANGLES, 24,
+                          GL_UNSIGNED_INT))
+        self.assertEqual(offset, ptr)
+
+    def test_draw_lists(self):
+        batch, domain, lists = self.create_domain()
+        ptr = domain._quad_indices.buffer.ptr
+        domain._draw_lists(GL_QUADS, lists[2:])
+        name, mode, count, gl_type, offset = self.calls[0]
+        self.assertEqual((mode, count, offset),
+                         (GL_TRIANGLES, 6, ptr + 18 * 4))
+
+        lists[1].delete()
+        del self.calls[:]
+        domain._draw_lists(GL_QUADS, [lists[2], lists[0]])
+        name, mode, sizes, gl_type, starts, primcount = self.calls[0]
+        self.assertEqual(name, 'glMultiDrawElements')
+        self.assertEqual(primcount, 2)
+        self.assertEqual(list(sizes), [6, 6])
+        self.assertEqual([starts[i] for i in range(2)],
+                         [ptr, ptr + 18 * 4])
+
+if __name__ == '__main__':
+    unittest.main()
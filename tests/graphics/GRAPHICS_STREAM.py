@@ -0,0 +1,81 @@
+#!/usr/bin/python
+# $Id:$
+
+'''Test and benchmark ``/stream-ring`` vertex data, which is rewritten and
+drawn every frame.
+
+The benchmark requires an OpenGL context; timings for each usage are
+printed to stderr.
+'''
+
+import random
+import sys
+import time
+import unittest
+
+import pyglet
+from pyglet.gl import *
+from pyglet.graphics import vertexbuffer, vertexdomain
+
+__noninteractive = True
+
+class TestStreamRingUsage(unittest.TestCase):
+    def test_parse(self):
+        attribute, usage, vbo = \
+            vertexdomain.create_attribute_usage('v2f/stream-ring')
+        self.assertEqual(attribute.plural, 'vertices')
+        self.assertEqual(usage, GL_STREAM_DRAW)
+        self.assertEqual(vbo, vertexbuffer.STREAM_RING)
+
+    def test_stream(self):
+        attribute, usage, vbo = \
+            vertexdomain.create_attribute_usage('v2f/stream')
+        self.assertEqual(usage, GL_STREAM_DRAW)
+        self.assertEqual(vbo, True)
+
+class TestStreamRing(unittest.TestCase):
+    n_vertices = 10000
+    n_frames = 200
+
+    def setUp(self):
+        self.window = pyglet.window.Window(visible=False)
+
+    def tearDown(self):
+        self.window.close()
+
+    def stream(self, usage):
+        n = self.n_vertices
+        batch = pyglet.graphics.Batch()
+        vertex_list = batch.add(n, GL_POINTS, None,
+                                'v2f/%s' % usage, 'c4B/%s' % usage)
+        data = [random.random() * 100 for i in range(n * 2)]
+
+        t = time.time()
+        for i in range(self.n_frames):
+            vertex_list.vertices[:] = data
+            batch.draw()
+        glFinish()
+        return time.time() - t
+
+    def test_stream_ring(self):
+        times = []
+        for usage in ('dynamic', 'stream', 'stream-ring'):
+            times.append('%s %.3fs' % (usage, self.stream(usage)))
+        print >> sys.stderr, '%d frames of %d vertices: %s' % \
+            (self.n_frames, self.n_vertices, ', '.join(times))
+
+    def test_data(self):
+        batch = pyglet.graphics.Batch()
+        vertex_list = batch.add(4, GL_POINTS, None, 'v2f/stream-ring')
+        for i in range(5):
+            vertex_list.vertices[:] = [i] * 8
+            batch.draw()
+            self.assertEqual(list(vertex_list.vertices), [i] * 8)
+        vertex_list.resize(100)
+        vertex_list.vertices[:] = range(200)
+        batch.draw()
+        self.assertEqual(list(vertex_list.vertices), range(200))
+        vertex_list.delete()
+
+if __name__ == '__main__':
+    unittest.main()
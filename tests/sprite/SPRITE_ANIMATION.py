@@ -0,0 +1,159 @@
+#!/usr/bin/python
+# $Id:$
+
+'''Test that animated sprites are advanced by a single clock callback, and
+change frame at the right time.  Does not require an OpenGL context.
+'''
+
+import unittest
+
+import pyglet
+from pyglet import clock
+from pyglet import image
+from pyglet import sprite
+
+from sprite_common import *
+
+__noninteractive = True
+
+class TestAnimation(unittest.TestCase):
+    def setUp(self):
+        self.time = 0.
+        self.clock = clock.Clock(time_function=lambda: self.time)
+        self.default_clock = clock.get_default()
+        clock.set_default(self.clock)
+        self.frames = [FakeTexture(16, 16, u=u) for u in (0, .25, .5)]
+        self.batch = pyglet.graphics.Batch()
+        self.sprites = []
+        self.ended = []
+
+    def tearDown(self):
+        for s in self.sprites:
+            if s._vertex_list is not None:
+                s.delete()
+        clock.set_default(self.default_clock)
+
+    def tick(self, time):
+        self.time = time
+        self.clock.tick()
+
+    def create_sprites(self, animation, n, tex_coord_type='t3f'):
+        sprites = []
+        for i in range(n):
+            s = sprite.Sprite(animation, batch=self.batch, usage='none',
+                              tex_coord_type=tex_coord_type)
+            s.push_handlers(on_animation_end=
+                            lambda s=s: self.ended.append(s))
+            sprites.append(s)
+        self.sprites.extend(sprites)
+        return sprites
+
+    def check_frames(self, sprites, index):
+        for s in sprites:
+            self.assertEqual(s._frame_index, index)
+            tex_coords = self.frames[index].tex_coords
+            if s._tex_coord_type == 't2f':
+                tex_coords = tuple(c for i, c in enumerate(tex_coords)
+                                   if i % 3 != 2)
+            self.assertEqual(tuple(s._vertex_list.tex_coords), tex_coords)
+
+    def test_loop(self):
+        animation = image.Animation.from_image_sequence(self.frames, .1)
+        sprites = self.create_sprites(animation, 50)
+        self.assertEqual(len(sprite._animator._tracks), 1)
+        self.assertEqual(len(self.clock._schedule_interval_items), 1)
+
+        self.tick(.05)
+        self.check_frames(sprites, 0)
+        self.tick(.15)
+        self.check_frames(sprites, 1)
+        self.tick(.25)
+        self.check_frames(sprites, 2)
+        self.assertEqual(self.ended, [])
+        self.tick(.32)
+        self.check_frames(sprites, 0)
+        self.assertEqual(len(self.ended), 50)
+        self.tick(.42)
+        self.check_frames(sprites, 1)
+        self.assertEqual(len(self.clock._schedule_interval_items), 1)
+
+        # A sprite started later has its own phase.
+        self.tick(.45)
+        late = self.create_sprites(animation, 1)
+        self.assertEqual(len(sprite._animator._tracks), 2)
+        self.tick(.51)
+        self.check_frames(sprites, 2)
+        self.check_frames(late, 0)
+        self.tick(.56)
+        self.check_frames(late, 1)
+
+        for s in sprites + late:
+            s.delete()
+        self.assertEqual(len(sprite._animator._tracks), 0)
+        self.assertEqual(len(self.clock._schedule_interval_items), 0)
+
+    def test_stop(self):
+        animation = image.Animation.from_image_sequence(self.frames, .1,
+                                                        loop=False)
+        sprites = self.create_sprites(animation, 5)
+        self.tick(.15)
+        self.check_frames(sprites, 1)
+        self.tick(.25)
+        self.check_frames(sprites, 2)
+        self.assertEqual(len(self.ended), 5)
+        self.assertEqual(len(sprite._animator._tracks), 0)
+        self.tick(.35)
+        self.check_frames(sprites, 2)
+        self.assertEqual(len(self.ended), 5)
+
+    def test_delete_in_handler(self):
+        animation = image.Animation.from_image_sequence(self.frames, .1)
+        sprites = self.create_sprites(animation, 3)
+        sprites[1].push_handlers(on_animation_end=sprites[2].delete)
+        self.tick(.31)
+        self.assertEqual(self.ended, [sprites[0], sprites[1]])
+        self.check_frames(sprites[:2], 0)
+
+    def test_tex_coord_types(self):
+        animation = image.Animation.from_image_sequence(self.frames, .1)
+        sprites = (self.create_sprites(animation, 2, 't2f') +
+                   self.create_sprites(animation, 2, 't3f'))
+        self.assertEqual(len(sprite._animator._tracks), 1)
+        self.check_frames(sprites, 0)
+        self.tick(.15)
+        self.check_frames(sprites, 1)
+        self.tick(.25)
+        self.check_frames(sprites, 2)
+
+    def test_set_image(self):
+        animation = image.Animation.from_image_sequence(self.frames, .1)
+        s, = self.create_sprites(animation, 1)
+        s.image = self.frames[1]
+        self.assertEqual(len(sprite._animator._tracks), 0)
+        s.image = animation
+        self.tick(.15)
+        self.check_frames([s], 1)
+        s.delete()
+
+    def test_set_default_clock(self):
+        animation = image.Animation.from_image_sequence(self.frames, .1)
+        sprites = self.create_sprites(animation, 2)
+        self.tick(.15)
+        self.check_frames(sprites, 1)
+
+        # The animation moves to a new default clock, keeping its phase.
+        self.clock.time = lambda: .15
+        self.time = 10.
+        self.clock = clock.Clock(time_function=lambda: self.time)
+        clock.set_default(self.clock)
+        late = self.create_sprites(animation, 1)
+        self.assertEqual(len(self.clock._schedule_interval_items), 1)
+        self.tick(10.05)
+        self.check_frames(sprites, 2)
+        self.check_frames(late, 0)
+        self.tick(10.17)
+        self.check_frames(sprites, 0)
+        self.check_frames(late, 1)
+
+if __name__ == '__main__':
+    unittest.main()
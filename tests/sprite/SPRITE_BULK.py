@@ -0,0 +1,110 @@
+#!/usr/bin/python
+# $Id:$
+
+'''Test that moving many sprites with `set_positions` and `translate` gives
+the same vertices as moving each sprite, with and without NumPy.  Does not
+require an OpenGL context.
+'''
+
+import array
+import unittest
+
+import pyglet
+from pyglet import sprite
+
+from sprite_common import *
+
+__noninteractive = True
+
+class TestBulkPositions(unittest.TestCase):
+    def setUp(self):
+        self.numpy = sprite.numpy
+        self.textures = [FakeTexture(16, 8, 4, 2),
+                         FakeTexture(10, 20, u=.5)]
+
+    def tearDown(self):
+        sprite.numpy = self.numpy
+
+    def create_sprites(self, batch):
+        sprites = []
+        for i in range(12):
+            s = sprite.Sprite(self.textures[i % 2], batch=batch,
+                              usage='none',
+                              vertex_type=('v2i', 'v2f', 'v3f')[i % 3])
+            s.update(rotation=(i % 4) * 30, scale=1 + (i % 5) * .25,
+                     scale_y=2)
+            s.z = i
+            sprites.append(s)
+        sprites[5].visible = False
+        return sprites
+
+    def check_vertices(self, sprites, expected_sprites):
+        for s, e in zip(sprites, expected_sprites):
+            self.assertEqual((s.x, s.y), (e.x, e.y))
+            for a, b in zip(s._vertex_list.vertices,
+                            e._vertex_list.vertices):
+                self.assertAlmostEqual(a, b, 3)
+
+    def run_bulk(self):
+        batch = pyglet.graphics.Batch()
+        batch.enable_culling()
+        sprites = self.create_sprites(batch)
+        expected = self.create_sprites(pyglet.graphics.Batch())
+
+        # Every other sprite; the rest stay where they are.
+        xs = array.array('f', [i * 10.5 for i in range(6)])
+        ys = [-i * 3.25 for i in range(6)]
+        sprite.set_positions(sprites[::2], xs, ys)
+        for s, x, y in zip(expected[::2], xs, ys):
+            s.position = x, y
+        self.check_vertices(sprites, expected)
+
+        sprite.translate(sprites[3:], 7.5, 1)
+        for s in expected[3:]:
+            s.position = s.x + 7.5, s.y + 1
+        self.check_vertices(sprites, expected)
+
+        hash = batch.spatial_hash
+        for s in sprites:
+            v = s._vertex_list
+            if s.visible:
+                bounds = hash.get_bounds(v)
+                s._flush_position()
+                for a, b in zip(bounds, hash.get_bounds(v)):
+                    self.assertAlmostEqual(a, b, 3)
+            else:
+                self.assertEqual(hash.get_bounds(v), None)
+
+    def run_negative(self):
+        # Unrotated v2i sprites at negative fractional positions keep their
+        # size, as when moved one at a time.
+        batch = pyglet.graphics.Batch()
+        sprites = [sprite.Sprite(self.textures[1], batch=batch, usage='none')
+                   for i in range(2)]
+        sprites[1].scale = 1.5
+        sprite.set_positions(sprites, [-5.5, -5.5], [-3.25, -3.25])
+        sprite.translate(sprites, -.5, 0)
+        for s in sprites:
+            self.assertEqual(list(s._vertex_list.vertices),
+                             s._get_vertices()[0])
+        self.assertEqual(list(sprites[0]._vertex_list.vertices),
+                         [-6, -3, 4, -3, 4, 17, -6, 17])
+
+    @unittest.skipIf(sprite.numpy is None, 'NumPy not available')
+    def test_numpy(self):
+        self.run_bulk()
+
+    @unittest.skipIf(sprite.numpy is None, 'NumPy not available')
+    def test_numpy_negative(self):
+        self.run_negative()
+
+    def test_array_negative(self):
+        sprite.numpy = None
+        self.run_negative()
+
+    def test_array(self):
+        sprite.numpy = None
+        self.run_bulk()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+#!/usr/bin/python
+# $Id:$
+
+'''Test that sprites keep their bounds up to date in a batch with culling
+enabled.  Does not require an OpenGL context.
+'''
+
+import unittest
+
+import pyglet
+from pyglet import sprite
+
+from sprite_common import *
+
+__noninteractive = True
+
+class TestSpriteCulling(unittest.TestCase):
+    def setUp(self):
+        self.texture = FakeTexture(16, 8)
+        self.batch = pyglet.graphics.Batch()
+        self.batch.enable_culling(64)
+
+    def visible(self, x, y, width, height):
+        return self.batch.spatial_hash.query(x, y, x + width, y + height)
+
+    def test_bounds(self):
+        sprites = [sprite.Sprite(self.texture, x=i * 100, batch=self.batch,
+                                 usage='none') for i in range(10)]
+        hash = self.batch.spatial_hash
+        self.assertEqual(len(hash), 10)
+        self.assertEqual(hash.get_bounds(sprites[1]._vertex_list),
+                         (100, 0, 116, 8))
+        self.assertEqual(self.visible(0, 0, 150, 10),
+                         set(s._vertex_list for s in sprites[:2]))
+
+        sprites[0].x = 1000
+        sprites[1].rotation = 90
+        for a, b in zip(hash.get_bounds(sprites[1]._vertex_list),
+                        (100, -16, 108, 0)):
+            self.assertAlmostEqual(a, b)
+        sprites[2].visible = False
+        self.assertEqual(self.visible(0, 0, 250, 10),
+                         set([sprites[1]._vertex_list]))
+
+        sprites[3].delete()
+        self.assertEqual(len(hash), 9)
+        sprites[4].batch = pyglet.graphics.Batch()
+        self.assertEqual(len(hash), 8)
+        self.assertEqual(len(sprites[4].batch._bounded_lists), 0)
+
+    def test_defer(self):
+        self.batch.defer_updates = True
+        s = sprite.Sprite(self.texture, batch=self.batch, usage='none')
+        s.x = 500
+        self.batch.flush_updates()
+        self.assertEqual(self.batch.spatial_hash.get_bounds(s._vertex_list),
+                         (500, 0, 516, 8))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+#!/usr/bin/python
+# $Id:$
+
+'''Test that sprite vertex updates are coalesced by `Sprite.update` and by
+batches deferring updates.  Does not require an OpenGL context.
+'''
+
+import unittest
+
+import pyglet
+from pyglet import sprite
+
+from sprite_common import *
+
+__noninteractive = True
+
+class CountingSprite(sprite.Sprite):
+    position_updates = 0
+
+    def _flush_position(self):
+        self.position_updates += 1
+        super(CountingSprite, self)._flush_position()
+
+class TestDeferredUpdates(unittest.TestCase):
+    def setUp(self):
+        self.texture = FakeTexture(16, 8)
+        self.batch = pyglet.graphics.Batch()
+
+    def create_sprite(self):
+        s = CountingSprite(self.texture, batch=self.batch, usage='none')
+        s.position_updates = 0
+        return s
+
+    def test_update(self):
+        s = self.create_sprite()
+        s.update(x=10, y=20, scale=2)
+        self.assertEqual(s.position_updates, 1)
+        self.assertEqual((s.x, s.y, s.scale, s.rotation), (10, 20, 2, 0))
+        self.assertEqual(list(s._vertex_list.vertices),
+                         [10, 20, 42, 20, 42, 36, 10, 36])
+
+    def test_defer(self):
+        self.batch.defer_updates = True
+        sprites = [self.create_sprite() for i in range(3)]
+        for i, s in enumerate(sprites):
+            s.x = 10 * i
+            s.y = 5
+            s.scale = 2
+            s.opacity = 128
+        self.assertEqual([s.position_updates for s in sprites], [0, 0, 0])
+        self.assertEqual(list(sprites[1]._vertex_list.vertices), [0] * 8)
+
+        self.batch.flush_updates()
+        self.assertEqual([s.position_updates for s in sprites], [1, 1, 1])
+        self.assertEqual(list(sprites[1]._vertex_list.vertices),
+                         [10, 5, 42, 5, 42, 21, 10, 21])
+        self.assertEqual(list(sprites[1]._vertex_list.colors),
+                         [255, 255, 255, 128] * 4)
+
+        self.batch.flush_updates()
+        self.assertEqual([s.position_updates for s in sprites], [1, 1, 1])
+
+    def test_defer_delete(self):
+        self.batch.defer_updates = True
+        s = self.create_sprite()
+        s.x = 10
+        s.delete()
+        # The deferred update is ignored.
+        self.batch.flush_updates()
+        self.assertEqual(s._vertex_list, None)
+
+    def test_draw_flushes(self):
+        batch = pyglet.graphics.Batch()
+        calls = []
+        batch.defer_update(lambda: calls.append(1))
+        batch.draw()
+        batch.draw()
+        self.assertEqual(calls, [1])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+#!/usr/bin/python
+# $Id:$
+
+'''Test that sprites share interned groups, and that a batch reports its
+groups and domains.  Does not require an OpenGL context.
+'''
+
+import unittest
+
+import pyglet
+from pyglet.gl import *
+from pyglet import sprite
+
+from sprite_common import *
+
+__noninteractive = True
+
+class OtherTexture(FakeTexture):
+    id = 2
+
+class TestSpriteGroup(unittest.TestCase):
+    def setUp(self):
+        self.texture = FakeTexture(16, 16)
+        self.batch = pyglet.graphics.Batch()
+        self.sprites = []
+
+    def tearDown(self):
+        for s in self.sprites:
+            s.delete()
+
+    def create_sprite(self, img, **kwargs):
+        s = sprite.Sprite(img, batch=self.batch, usage='none', **kwargs)
+        self.sprites.append(s)
+        return s
+
+    def test_intern(self):
+        parent = pyglet.graphics.OrderedGroup(1)
+        a = self.create_sprite(self.texture)
+        b = self.create_sprite(FakeTexture(8, 8, u=.5))
+        c = self.create_sprite(self.texture, group=parent)
+        d = self.create_sprite(self.texture, blend_dest=GL_ONE)
+        e = self.create_sprite(OtherTexture(16, 16))
+        self.assertTrue(a._group is b._group)
+        self.assertFalse(a._group is c._group)
+        self.assertTrue(c._group.parent is parent)
+        self.assertFalse(a._group is d._group)
+        self.assertFalse(a._group is e._group)
+        self.assertTrue(sprite.get_sprite_group(self.texture, GL_SRC_ALPHA,
+            GL_ONE_MINUS_SRC_ALPHA) is a._group)
+
+    def test_set_frame(self):
+        s = self.create_sprite(self.texture)
+        group = s._group
+        domain = s._vertex_list.domain
+        s.image = FakeTexture(16, 16, u=.25)
+        self.assertTrue(s._group is group)
+        self.assertTrue(s._vertex_list.domain is domain)
+        self.assertEqual(s._vertex_list.tex_coords[0], .25)
+
+    def test_set_texture(self):
+        s = self.create_sprite(self.texture, x=10)
+        vertex_list = s._vertex_list
+        s.image = OtherTexture(8, 8, u=.5)
+        self.assertTrue(s._vertex_list is vertex_list)
+        self.assertEqual(s._group.texture.id, OtherTexture.id)
+        self.assertEqual(s._vertex_list.tex_coords[0], .5)
+        self.assertEqual(list(s._vertex_list.vertices),
+                         [10, 0, 18, 0, 18, 8, 10, 8])
+
+    def test_report(self):
+        report = self.batch.get_report()
+        self.assertEqual((report.groups, report.domains,
+                          report.vertex_lists), (0, 0, 0))
+        for i in range(4):
+            self.create_sprite(self.texture)
+        self.create_sprite(OtherTexture(16, 16))
+        self.batch.add(2, GL_LINES, None, 'v2f/none')
+        report = self.batch.get_report()
+        self.assertEqual((report.groups, report.domains,
+                          report.vertex_lists), (3, 3, 6))
+        self.assertEqual(report.group_classes,
+                         {'SpriteGroup': 2, 'NullGroup': 1})
+        str(report)
+
+if __name__ == '__main__':
+    unittest.main()
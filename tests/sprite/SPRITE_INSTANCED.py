@@ -0,0 +1,105 @@
+#!/usr/bin/python
+# $Id:$
+
+'''Test the per-sprite instance records packed by a sprite system for
+instanced drawing, with and without NumPy, and that a system falls back to
+drawing quads when instancing is not available.
+
+`TestInstancedDraw` requires an OpenGL context, and compares the pixels
+drawn with and without instancing.
+'''
+
+import unittest
+import warnings
+
+import pyglet
+from pyglet.gl import *
+from pyglet.gl import gl_info
+from pyglet import sprite
+
+from sprite_common import *
+
+__noninteractive = True
+
+class TestInstancePacking(unittest.TestCase):
+    def setUp(self):
+        self.numpy = sprite.numpy
+        self.frames = [FakeTexture(16, 8, 4, 2),
+                       FakeTexture(10, 20, u=.5)]
+
+    def tearDown(self):
+        sprite.numpy = self.numpy
+
+    def run_pack(self):
+        system = sprite.SpriteSystem(self.frames, usage='none',
+                                     batch=pyglet.graphics.Batch(),
+                                     instanced=True)
+        self.assertFalse(system.is_instanced)
+        system.add(1, 2, frame=1, rotation=30, scale=2, opacity=10,
+                   color=(1, 2, 3))
+        system.add(3, 4)
+        system.add(5, 6, frame=0, color=(7, 8, 9))
+        system.visible[1] = False
+
+        # Corners and texture region of each frame, looked up by the shader.
+        self.assertEqual(list(system._frame_instances),
+            [-4, -2, 12, 6, 0, 0, .5, 1,
+             0, 0, 10, 20, .5, 0, 1, 1])
+
+        count, floats, colors = system._pack_instances(3)
+        self.assertEqual(count, 2)
+        self.assertEqual(list(floats), [1, 2, 30, 2, 1, 5, 6, 0, 1, 0])
+        self.assertEqual(list(colors), [1, 2, 3, 10, 7, 8, 9, 255])
+
+        system.visible[0] = system.visible[2] = False
+        count, floats, colors = system._pack_instances(3)
+        self.assertEqual((count, len(floats), len(colors)), (0, 0, 0))
+
+    @unittest.skipIf(sprite.numpy is None, 'NumPy not available')
+    def test_numpy(self):
+        self.run_pack()
+
+    def test_array(self):
+        sprite.numpy = None
+        self.run_pack()
+
+    @unittest.skipIf(gl_info.have_context(), 'A GL context exists')
+    def test_no_context(self):
+        # GL is not queried without a context.
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            self.assertFalse(sprite._have_instancing())
+        self.assertEqual(caught, [])
+
+class TestInstancedDraw(unittest.TestCase):
+    def setUp(self):
+        self.window = pyglet.window.Window(64, 64, visible=False)
+
+    def tearDown(self):
+        self.window.close()
+
+    def render(self, instanced):
+        img = pyglet.image.SolidColorImagePattern((255, 255, 255, 255))
+        texture = img.create_image(8, 8).get_texture()
+        system = sprite.SpriteSystem(texture, instanced=instanced)
+        if instanced and not system.is_instanced:
+            return None
+        for i in range(5):
+            system.add(i * 12 + 4, 20, rotation=i * 20,
+                       color=(255, i * 50, 0))
+        glClear(GL_COLOR_BUFFER_BIT)
+        system.draw()
+        system.delete()
+        buffer = pyglet.image.get_buffer_manager().get_color_buffer()
+        return buffer.get_image_data().get_data('RGBA', 64 * 4)
+
+    def test_draw(self):
+        quads = self.render(False)
+        instances = self.render(True)
+        if instances is None:
+            return # Instancing not supported by this driver.
+        differences = sum(a != b for a, b in zip(quads, instances))
+        self.assertTrue(differences < len(quads) // 100)
+
+if __name__ == '__main__':
+    unittest.main()
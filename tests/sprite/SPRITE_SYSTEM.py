@@ -0,0 +1,99 @@
+#!/usr/bin/python
+# $Id:$
+
+'''Test that a sprite system computes the same vertices as individual sprites,
+with and without NumPy.  Does not require an OpenGL context.
+'''
+
+import math
+import unittest
+
+import pyglet
+from pyglet.gl import *
+from pyglet import sprite
+
+from sprite_common import *
+
+__noninteractive = True
+
+def get_quad(texture, x, y, rotation=0, scale=1):
+    '''Corners of a sprite, as computed by Sprite._update_position but
+    without rounding.'''
+    x1 = -texture.anchor_x * scale
+    y1 = -texture.anchor_y * scale
+    x2 = x1 + texture.width * scale
+    y2 = y1 + texture.height * scale
+    r = -math.radians(rotation)
+    cr = math.cos(r)
+    sr = math.sin(r)
+    quad = []
+    for cx, cy in ((x1, y1), (x2, y1), (x2, y2), (x1, y2)):
+        quad.extend([cx * cr - cy * sr + x, cx * sr + cy * cr + y])
+    return quad
+
+class TestSpriteSystem(unittest.TestCase):
+    def setUp(self):
+        self.numpy = sprite.numpy
+        self.frames = [FakeTexture(16, 8, 4, 2),
+                       FakeTexture(10, 20, u=.5)]
+
+    def tearDown(self):
+        sprite.numpy = self.numpy
+
+    def check(self, system, specs):
+        vertices = system._vertex_list.vertices
+        colors = system._vertex_list.colors
+        tex_coords = system._vertex_list.tex_coords
+        for i, spec in specs:
+            if spec is None:
+                self.assertEqual(list(vertices[8 * i:8 * i + 8]), [0] * 8)
+                continue
+            frame, x, y, rotation, scale, color = spec
+            expected = get_quad(self.frames[frame], x, y, rotation, scale)
+            for e, v in zip(expected, vertices[8 * i:8 * i + 8]):
+                self.assertAlmostEqual(e, v, 3)
+            self.assertEqual(list(colors[16 * i:16 * i + 16]),
+                             list(color) * 4)
+            self.assertEqual(list(tex_coords[12 * i:12 * i + 12]),
+                             list(self.frames[frame].tex_coords))
+
+    def run_system(self):
+        system = sprite.SpriteSystem(self.frames, usage='none',
+                                     batch=pyglet.graphics.Batch())
+        specs = []
+        for i in range(40):
+            frame = i % 2
+            x, y = i * 3.5, -i
+            rotation = (i % 3) * 30
+            scale = 1 + (i % 4) * .5
+            color = (i, 255 - i, 2 * i, 100 + i)
+            index = system.add(x, y, frame, rotation, scale, color[3],
+                               color[:3])
+            self.assertEqual(index, i)
+            specs.append((index, (frame, x, y, rotation, scale, color)))
+        self.assertEqual(len(system), 40)
+
+        system.remove(3)
+        system.remove(5)
+        self.assertEqual(len(system), 38)
+        specs[3] = (3, None)
+        index = system.add(1, 2)
+        self.assertEqual(index, 5)
+        specs[5] = (5, (0, 1, 2, 0, 1, (255, 255, 255, 255)))
+
+        system.x[7] += 10
+        specs[7] = (7, (specs[7][1][0], specs[7][1][1] + 10) +
+                       specs[7][1][2:])
+        system.update()
+        self.check(system, specs)
+
+    @unittest.skipIf(sprite.numpy is None, 'NumPy not available')
+    def test_numpy(self):
+        self.run_system()
+
+    def test_array(self):
+        sprite.numpy = None
+        self.run_system()
+
+if __name__ == '__main__':
+    unittest.main()
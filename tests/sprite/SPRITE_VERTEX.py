@@ -0,0 +1,89 @@
+#!/usr/bin/python
+# $Id:$
+
+'''Test the vertices of sprites with each vertex type and texture coordinate
+type, and separate horizontal and vertical scales.  Does not require an
+OpenGL context.
+'''
+
+import unittest
+
+import pyglet
+from pyglet import sprite
+
+from sprite_common import *
+
+__noninteractive = True
+
+class TestSpriteVertices(unittest.TestCase):
+    def setUp(self):
+        self.texture = FakeTexture(16, 8, anchor_x=8, anchor_y=4)
+        self.batch = pyglet.graphics.Batch()
+
+    def create_sprite(self, **kwargs):
+        return sprite.Sprite(self.texture, batch=self.batch, usage='none',
+                             **kwargs)
+
+    def check_vertices(self, s, expected):
+        vertices = list(s._vertex_list.vertices)
+        self.assertEqual(len(vertices), len(expected))
+        for a, b in zip(vertices, expected):
+            self.assertAlmostEqual(a, b, 5)
+
+    def test_v2i(self):
+        s = self.create_sprite(x=10.75, y=20.5)
+        self.check_vertices(s, [2, 16, 18, 16, 18, 24, 2, 24])
+
+    def test_v2i_negative(self):
+        # The size is kept at negative fractional positions.
+        s = self.create_sprite(x=-5.5, y=-3.5)
+        self.check_vertices(s, [-13, -7, 3, -7, 3, 1, -13, 1])
+        s.scale = 1.5
+        self.check_vertices(s, [-17, -9, 7, -9, 7, 3, -17, 3])
+
+    def test_v2f(self):
+        s = self.create_sprite(x=10.75, y=20.5, vertex_type='v2f')
+        self.check_vertices(s,
+            [2.75, 16.5, 18.75, 16.5, 18.75, 24.5, 2.75, 24.5])
+        s.rotation = 90
+        self.check_vertices(s,
+            [6.75, 28.5, 6.75, 12.5, 14.75, 12.5, 14.75, 28.5])
+
+    def test_v3f(self):
+        s = self.create_sprite(vertex_type='v3f')
+        s.z = -2
+        self.check_vertices(s, [-8, -4, -2, 8, -4, -2, 8, 4, -2, -8, 4, -2])
+        s.visible = False
+        self.check_vertices(s, [0] * 12)
+
+    def test_t2f(self):
+        s = self.create_sprite(tex_coord_type='t2f')
+        t = self.create_sprite()
+        size = lambda s: sum(a.size for a in s._vertex_list.domain.attributes)
+        self.assertEqual(size(s), size(t) - 4)
+        self.assertEqual(tuple(s._vertex_list.tex_coords),
+                         (0, 0, .5, 0, .5, 1, 0, 1))
+        s.image = FakeTexture(4, 4, u=.5)
+        self.assertEqual(tuple(s._vertex_list.tex_coords),
+                         (.5, 0, 1, 0, 1, 1, .5, 1))
+
+    def test_scale_xy(self):
+        s = self.create_sprite(vertex_type='v2f')
+        s.update(scale=2, scale_x=.5, scale_y=3)
+        self.assertEqual((s.width, s.height), (16, 48))
+        self.check_vertices(s, [-8, -24, 8, -24, 8, 24, -8, 24])
+
+    def test_anchor(self):
+        s = self.create_sprite()
+        self.texture.anchor_x = 0
+        self.texture.anchor_y = 0
+        s.image = self.texture
+        self.check_vertices(s, [0, 0, 16, 0, 16, 8, 0, 8])
+
+        # Changing to an image of another size in the same texture moves the
+        # corners.
+        s.image = FakeTexture(4, 4, u=.5)
+        self.check_vertices(s, [0, 0, 4, 0, 4, 4, 0, 4])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,23 @@
+#!/usr/bin/env python
+
+'''Helpers for sprite tests that do not require an OpenGL context.
+'''
+
+__docformat__ = 'restructuredtext'
+__version__ = '$Id: $'
+
+from pyglet.gl import *
+from pyglet import image
+
+class FakeTexture(image.AbstractImage):
+    target = GL_TEXTURE_2D
+    id = 1
+
+    def __init__(self, width, height, anchor_x=0, anchor_y=0, u=0):
+        super(FakeTexture, self).__init__(width, height)
+        self.anchor_x = anchor_x
+        self.anchor_y = anchor_y
+        self.tex_coords = (u, 0, 0, u + .5, 0, 0, u + .5, 1, 0, u, 1, 0)
+
+    def get_texture(self, rectangle=False, force_rectangle=False):
+        return self